@@ -3,12 +3,16 @@
 from datetime import (
     timedelta,
 )
+from odmantic import (
+    AIOEngine,
+)
 from odmantic.session import (
     AIOSession,
 )
 from typing import (
     Any,
     Dict,
+    Union,
 )
 
 from app.auth import (
@@ -23,14 +27,15 @@ from app.wallets import (
 
 
 async def find_existed_wallet(
-    classic_address: str, session: AIOSession
+    classic_address: str, session: Union[AIOEngine, AIOSession]
 ) -> wallets_models.Wallet:
     """
     A method to check if the wallet exists in the database.
 
     Args:
         classic_address (str) : A wallet classic address.
-        session (odmantic.session.AIOSession) : Odmantic session object.
+        session (Union[odmantic.AIOEngine, odmantic.session.AIOSession]) : Odmantic
+            engine or session object.
 
     Returns:
         wallets_models.Wallet: A wallet model object.
@@ -41,18 +46,18 @@ async def find_existed_wallet(
     return wallet
 
 
-async def wallet_login(classic_address: str, session: AIOSession) -> Dict[str, Any]:
+async def wallet_login(classic_address: str, engine: AIOEngine) -> Dict[str, Any]:
     """
     A method to fetch and return serialized token info upon logging in.
 
     Args:
         classic_address (str) : A wallet classic address.
-        session (odmantic.session.AIOSession) : Odmantic session object.
+        engine (odmantic.AIOEngine) : Odmantic read-only engine object.
 
     Returns:
         Dict[str, Any]: a dict object that contains info about a given wallet.
     """
-    wallet_obj = await find_existed_wallet(classic_address, session)
+    wallet_obj = await find_existed_wallet(classic_address, engine)
     if not wallet_obj:
         return {"status_code": 404, "message": "Wallet not found!"}
     wallet = auth_schemas.TokenData(classic_address=wallet_obj.classic_address)
@@ -4,8 +4,8 @@ from fastapi import (
     APIRouter,
     Depends,
 )
-from odmantic.session import (
-    AIOSession,
+from odmantic import (
+    AIOEngine,
 )
 from typing import (
     Any,
@@ -49,10 +49,10 @@ router = APIRouter(prefix="/api/v1")
 )
 async def login(
     wallet: auth_schemas.TokenData,
-    session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    engine: AIOEngine = Depends(dependencies.get_db_read_engine),
 ) -> Dict[str, Any]:
     """
     Authenticate a wallet.
     """
-    result = await auth_crud.wallet_login(wallet.classic_address, session)
+    result = await auth_crud.wallet_login(wallet.classic_address, engine)
     return result
@@ -24,11 +24,57 @@ class Settings(BaseSettings):
         MONGODB_USERNAME (str) : MONGODB username.
         MONGODB_PASSWORD (str) : MONGODB password.
         MONGODB_DATABASE (str) : MONGODB database name.
+        MONGODB_READ_PREFERENCE (str) : Read preference of the read-only routes.
+        MONGODB_READ_CONCERN (str) : Read concern level of the read-only routes.
         JWT_SECRET_KEY (str) : A secure app jwt secret key.
         DEBUG (str) : A variable used to separate testing env from production env.
         CORS_ORIGINS (str) : A string that contains comma separated urls for cors origins.
         PINATA_API_KEY (str) : You Pinata api key.
         PINATA_API_SECRET (str) : You Pinata api secret.
+        PINATA_TIMEOUT (float) : Pinata requests timeout in seconds.
+        UPLOAD_MAX_BYTES (int) : Max size of an uploaded image in bytes.
+        UPLOAD_CHUNK_SIZE (int) : Size of the chunks streamed to Pinata in bytes.
+        AUTH_CACHE_TTL (float) : Max seconds a verified token is cached.
+        AUTH_CACHE_SIZE (int) : Max number of cached verified tokens.
+        LEDGER_CONCURRENCY (int) : Max number of concurrent per-account ledger queries.
+        LEDGER_POOL_SIZE (int) : Max number of open connections to the ledger node.
+        LEDGER_KEEPALIVE_CONNECTIONS (int) : Max number of idle keep-alive connections.
+        LEDGER_KEEPALIVE_EXPIRY (float) : Seconds an idle connection is kept open.
+        LEDGER_TIMEOUT (float) : Ledger requests timeout in seconds.
+        LEDGER_PAGE_LIMIT (int) : Page size of the paginated ledger requests.
+        IPFS_TIMEOUT (float) : IPFS gateway requests timeout in seconds.
+        IPFS_CACHE_MAX_BYTES (int) : In-memory IPFS metadata cache budget in bytes.
+        IPFS_CACHE_DIR (str) : On-disk IPFS metadata cache directory, "" disables it.
+        CATALOG_SYNC_INTERVAL (float) : Seconds between two NFT catalog syncs.
+        LISTING_PAGE_SIZE (int) : Default number of NFTs per listing page.
+        LISTING_MAX_PAGE_SIZE (int) : Max number of NFTs per listing page.
+        LEADERBOARD_SIZE (int) : Number of wallets in the top creators leaderboard.
+        JOB_WORKERS (int) : Number of jobs run concurrently by each server process.
+        JOB_POLL_INTERVAL (float) : Seconds a job worker waits when the queue is empty.
+        JOB_STALE_AFTER (float) : Seconds after which a running job is considered interrupted.
+        MINT_BATCH_MAX_ITEMS (int) : Max number of NFTs minted by a single batch, each one needs two tickets.
+        SIGNING_WORKERS (int) : Number of signing processes, 0 signs on the event loop.
+        SIGNING_KEY_CACHE_SIZE (int) : Max number of cached wallet keypairs.
+        SIGNING_KEY_CACHE_TTL (float) : Seconds a derived wallet keypair stays cached.
+        LEDGER_WATCH_INTERVAL (float) : Seconds between two reads of the validated ledger index.
+        ETAG_STALE_TTL (float) : Seconds a cached listing response can be served while it is refreshed.
+        CACHE_BACKEND (str) : Cache backend, memory (per process) or redis (shared by every replica).
+        CACHE_MAX_ENTRIES (int) : Max number of entries of the memory cache backend.
+        CACHE_KEY_PREFIX (str) : Prefix of the keys stored in the redis cache backend.
+        REDIS_URL (str) : URL of the Redis protocol server of the redis cache backend.
+        REDIS_POOL_SIZE (int) : Max number of open connections to the Redis protocol server.
+        REDIS_TIMEOUT (float) : Redis protocol commands timeout in seconds.
+        SLOW_REQUEST_THRESHOLD (float) : Seconds a request takes before it is logged with its timing spans.
+        SLOW_REQUEST_SAMPLE_RATE (float) : Fraction of the slow requests that are logged.
+        PROFILING_TOKEN (str) : Profiling admin token, off when empty or with the memory CACHE_BACKEND.
+        PROFILING_INTERVAL (float) : Seconds between the stack samples of a profiled request.
+        PROFILE_TTL (float) : Seconds a request profile is stored.
+        MONGODB_URL (str) : mongodb:// URL used instead of the MongoDB Atlas credentials when set.
+        XRPL_JSON_RPC_URL (str) : XRPL JSON RPC server URL.
+        PINATA_API_URL (str) : Pinata API base URL.
+        IPFS_GATEWAY_URL (str) : IPFS gateway base URL of the pinned files.
+        LOOP_LAG_INTERVAL (float) : Seconds between two event loop lag samples, 0 disables them.
+        BLOCKING_CALL_THRESHOLD (float) : Seconds the loop may block before its stack is logged if DEBUG=info.
 
 
     Example:
@@ -36,22 +82,118 @@ class Settings(BaseSettings):
         >>> MONGODB_USERNAME=admin
         >>> MONGODB_PASSWORD=51R0NGPO$$W0RD
         >>> MONGODB_DATABASE=tinder
+        >>> MONGODB_READ_PREFERENCE=primaryPreferred
+        >>> MONGODB_READ_CONCERN=local
         >>> JWT_SECRET_KEY=123SDA23sa
         >>> DEBUG="" # "" means production, "test" means testing, "info" means development.
         >>> CORS_ORIGINS="https://app-name.herokuapp.com,http://app-name.pages.dev"
         >>> PINATA_API_SECRET=12312dSDJHJSBA
         >>> PINATA_API_SECRET=12312d12341asdSDJHJSBA
+        >>> PINATA_TIMEOUT=60
+        >>> UPLOAD_MAX_BYTES=10485760
+        >>> UPLOAD_CHUNK_SIZE=65536
+        >>> AUTH_CACHE_TTL=30
+        >>> AUTH_CACHE_SIZE=1024
+        >>> LEDGER_CONCURRENCY=16
+        >>> LEDGER_POOL_SIZE=30
+        >>> LEDGER_KEEPALIVE_CONNECTIONS=10
+        >>> LEDGER_KEEPALIVE_EXPIRY=30
+        >>> LEDGER_TIMEOUT=10
+        >>> LEDGER_PAGE_LIMIT=400
+        >>> IPFS_TIMEOUT=30
+        >>> IPFS_CACHE_MAX_BYTES=16777216
+        >>> IPFS_CACHE_DIR=/tmp/moerphous-ipfs
+        >>> CATALOG_SYNC_INTERVAL=60
+        >>> LISTING_PAGE_SIZE=50
+        >>> LISTING_MAX_PAGE_SIZE=200
+        >>> LEADERBOARD_SIZE=9
+        >>> JOB_WORKERS=4
+        >>> JOB_POLL_INTERVAL=1
+        >>> JOB_STALE_AFTER=300
+        >>> MINT_BATCH_MAX_ITEMS=50
+        >>> SIGNING_WORKERS=2
+        >>> SIGNING_KEY_CACHE_SIZE=1024
+        >>> SIGNING_KEY_CACHE_TTL=300
+        >>> LEDGER_WATCH_INTERVAL=1
+        >>> ETAG_STALE_TTL=30
+        >>> CACHE_BACKEND=memory
+        >>> CACHE_MAX_ENTRIES=4096
+        >>> CACHE_KEY_PREFIX=moerphous:
+        >>> REDIS_URL=redis://localhost:6379/0
+        >>> REDIS_POOL_SIZE=10
+        >>> REDIS_TIMEOUT=2
+        >>> SLOW_REQUEST_THRESHOLD=1
+        >>> SLOW_REQUEST_SAMPLE_RATE=1
+        >>> PROFILING_TOKEN=
+        >>> PROFILING_INTERVAL=0.005
+        >>> PROFILE_TTL=3600
+        >>> MONGODB_URL=
+        >>> XRPL_JSON_RPC_URL=https://s.altnet.rippletest.net:51234
+        >>> PINATA_API_URL=https://api.pinata.cloud
+        >>> IPFS_GATEWAY_URL=https://ipfs.io/ipfs
+        >>> LOOP_LAG_INTERVAL=0.5
+        >>> BLOCKING_CALL_THRESHOLD=0.1
     """
 
     MONGODB_HOST: str = os.getenv("MONGODB_HOST")  # type: ignore
     MONGODB_USERNAME: str = os.getenv("MONGODB_USERNAME")  # type: ignore
     MONGODB_PASSWORD: str = os.getenv("MONGODB_PASSWORD")  # type: ignore
     MONGODB_DATABASE: str = os.getenv("MONGODB_DATABASE")  # type: ignore
+    MONGODB_READ_PREFERENCE: str = os.getenv("MONGODB_READ_PREFERENCE", "primary")
+    MONGODB_READ_CONCERN: str = os.getenv("MONGODB_READ_CONCERN", "local")
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY")  # type: ignore
     DEBUG: str = os.getenv("DEBUG")  # type: ignore
     CORS_ORIGINS: str = os.getenv("CORS_ORIGINS")  # type: ignore
     PINATA_API_KEY: str = os.getenv("PINATA_API_KEY")  # type: ignore
     PINATA_API_SECRET: str = os.getenv("PINATA_API_SECRET")  # type: ignore
+    PINATA_TIMEOUT: float = float(os.getenv("PINATA_TIMEOUT", "60"))
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", "10485760"))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", "65536"))
+    AUTH_CACHE_TTL: float = float(os.getenv("AUTH_CACHE_TTL", "30"))
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+    LEDGER_CONCURRENCY: int = int(os.getenv("LEDGER_CONCURRENCY", "16"))
+    LEDGER_POOL_SIZE: int = int(os.getenv("LEDGER_POOL_SIZE", "30"))
+    LEDGER_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("LEDGER_KEEPALIVE_CONNECTIONS", "10")
+    )
+    LEDGER_KEEPALIVE_EXPIRY: float = float(os.getenv("LEDGER_KEEPALIVE_EXPIRY", "30"))
+    LEDGER_TIMEOUT: float = float(os.getenv("LEDGER_TIMEOUT", "10"))
+    LEDGER_PAGE_LIMIT: int = int(os.getenv("LEDGER_PAGE_LIMIT", "400"))
+    IPFS_TIMEOUT: float = float(os.getenv("IPFS_TIMEOUT", "30"))
+    IPFS_CACHE_MAX_BYTES: int = int(os.getenv("IPFS_CACHE_MAX_BYTES", "16777216"))
+    IPFS_CACHE_DIR: str = os.getenv("IPFS_CACHE_DIR", "")
+    CATALOG_SYNC_INTERVAL: float = float(os.getenv("CATALOG_SYNC_INTERVAL", "60"))
+    LISTING_PAGE_SIZE: int = int(os.getenv("LISTING_PAGE_SIZE", "50"))
+    LISTING_MAX_PAGE_SIZE: int = int(os.getenv("LISTING_MAX_PAGE_SIZE", "200"))
+    LEADERBOARD_SIZE: int = int(os.getenv("LEADERBOARD_SIZE", "9"))
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+    JOB_STALE_AFTER: float = float(os.getenv("JOB_STALE_AFTER", "300"))
+    MINT_BATCH_MAX_ITEMS: int = int(os.getenv("MINT_BATCH_MAX_ITEMS", "50"))
+    SIGNING_WORKERS: int = int(os.getenv("SIGNING_WORKERS", "2"))
+    SIGNING_KEY_CACHE_SIZE: int = int(os.getenv("SIGNING_KEY_CACHE_SIZE", "1024"))
+    SIGNING_KEY_CACHE_TTL: float = float(os.getenv("SIGNING_KEY_CACHE_TTL", "300"))
+    LEDGER_WATCH_INTERVAL: float = float(os.getenv("LEDGER_WATCH_INTERVAL", "1"))
+    ETAG_STALE_TTL: float = float(os.getenv("ETAG_STALE_TTL", "30"))
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "4096"))
+    CACHE_KEY_PREFIX: str = os.getenv("CACHE_KEY_PREFIX", "moerphous:")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_POOL_SIZE: int = int(os.getenv("REDIS_POOL_SIZE", "10"))
+    REDIS_TIMEOUT: float = float(os.getenv("REDIS_TIMEOUT", "2"))
+    SLOW_REQUEST_THRESHOLD: float = float(os.getenv("SLOW_REQUEST_THRESHOLD", "1"))
+    SLOW_REQUEST_SAMPLE_RATE: float = float(os.getenv("SLOW_REQUEST_SAMPLE_RATE", "1"))
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_INTERVAL: float = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+    PROFILE_TTL: float = float(os.getenv("PROFILE_TTL", "3600"))
+    MONGODB_URL: str = os.getenv("MONGODB_URL", "")
+    XRPL_JSON_RPC_URL: str = os.getenv(
+        "XRPL_JSON_RPC_URL", "https://s.altnet.rippletest.net:51234"
+    )
+    PINATA_API_URL: str = os.getenv("PINATA_API_URL", "https://api.pinata.cloud")
+    IPFS_GATEWAY_URL: str = os.getenv("IPFS_GATEWAY_URL", "https://ipfs.io/ipfs")
+    LOOP_LAG_INTERVAL: float = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+    BLOCKING_CALL_THRESHOLD: float = float(os.getenv("BLOCKING_CALL_THRESHOLD", "0.1"))
 
     class Config:  # pylint: disable=R0903
         """
@@ -73,7 +215,9 @@ class Settings(BaseSettings):
             str: The assembled database URL.
         """
 
-        if self.DEBUG == "test":
+        if self.MONGODB_URL:
+            mongodb_database_url = self.MONGODB_URL
+        elif self.DEBUG == "test":
             mongodb_database_url = (
                 "mongodb+srv://"
                 + self.MONGODB_USERNAME
@@ -109,16 +253,16 @@ class Settings(BaseSettings):
     @property
     def json_rpc_url(self) -> str:
         """
-        return ripple testnet URL.
+        return the XRPL JSON RPC URL, the ripple testnet by default.
 
         Args:
             self ( _obj_ ) : object reference.
 
         Returns:
-            str: The testnet URL.
+            str: The JSON RPC URL.
         """
 
-        return "https://s.altnet.rippletest.net:51234"
+        return self.XRPL_JSON_RPC_URL
 
     @property
     def cors_origins(self) -> List[str]:
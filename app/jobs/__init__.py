@@ -0,0 +1,13 @@
+"""
+jobs package.
+"""
+
+from app.jobs import (
+    crud,
+    models,
+    router,
+    schemas,
+    worker,
+)
+
+__all__ = ["crud", "models", "router", "schemas", "worker"]
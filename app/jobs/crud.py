@@ -0,0 +1,173 @@
+"""The jobs crud module"""
+
+from bson import (
+    ObjectId,
+)
+from bson.errors import (
+    InvalidId,
+)
+from datetime import (
+    datetime,
+    timedelta,
+)
+from odmantic import (
+    AIOEngine,
+)
+from pymongo import (
+    ASCENDING,
+    ReturnDocument,
+)
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+from app.jobs import (
+    models as jobs_models,
+)
+
+
+async def enqueue_job(
+    kind: str, classic_address: str, payload: Dict[str, Any], engine: AIOEngine
+) -> jobs_models.Job:
+    """
+    A method to queue a job for the job workers.
+
+    Args:
+        kind (str) : The job kind, a key of JobWorkerPool.handlers.
+        classic_address (str) : The classic address of the wallet owning the job.
+        payload (Dict[str, Any]) : The job arguments.
+        engine (odmantic.AIOEngine) : odmantic engine object.
+    Returns:
+        app.jobs.models.Job: The queued job.
+    """
+    return await engine.save(
+        jobs_models.Job(kind=kind, classic_address=classic_address, payload=payload)
+    )
+
+
+def job_to_dict(job: jobs_models.Job) -> Dict[str, Any]:
+    """
+    Serialize a job to the job response format.
+
+    Args:
+        job (app.jobs.models.Job) : A job.
+    Returns:
+        Dict[str, Any]: A dict that represents the job progress.
+    """
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "status": job.status.value,
+        "step": job.step,
+        "nftoken_id": job.nftoken_id,
+        "error": job.error,
+        "results": job.results,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+async def get_job(
+    job_id: str, classic_address: str, engine: AIOEngine
+) -> Dict[str, Any]:
+    """
+    A method to fetch the progress of a job owned by a wallet.
+
+    Args:
+        job_id (str) : A job id.
+        classic_address (str) : A wallet classic address.
+        engine (odmantic.AIOEngine) : odmantic engine object.
+    Returns:
+        Dict[str, Any]: A dict that contains the job.
+    """
+    try:
+        object_id = ObjectId(job_id)
+    except (InvalidId, TypeError):
+        return {"status_code": 404, "message": "Job not found!"}
+    job = await engine.find_one(
+        jobs_models.Job,
+        jobs_models.Job.id == object_id,
+        jobs_models.Job.classic_address == classic_address,
+    )
+    if job is None:
+        return {"status_code": 404, "message": "Job not found!"}
+    return {"status_code": 200, "job": job_to_dict(job)}
+
+
+async def claim_next_job(engine: AIOEngine) -> Optional[jobs_models.Job]:
+    """
+    A method to atomically claim the oldest queued job.
+
+    Args:
+        engine (odmantic.AIOEngine) : odmantic engine object.
+    Returns:
+        Optional[app.jobs.models.Job]: The claimed job, None if the queue is
+            empty.
+    """
+    doc = await engine.get_collection(jobs_models.Job).find_one_and_update(
+        {"status": jobs_models.JobStatus.QUEUED.value},
+        {
+            "$set": {
+                "status": jobs_models.JobStatus.RUNNING.value,
+                "updated_at": datetime.utcnow(),
+            }
+        },
+        sort=[("created_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is None:
+        return None
+    return jobs_models.Job.parse_doc(doc)
+
+
+async def update_job(job_id: ObjectId, engine: AIOEngine, **fields: Any) -> None:
+    """
+    A method to record the progress of a job.
+
+    Args:
+        job_id (bson.ObjectId) : A job id.
+        engine (odmantic.AIOEngine) : odmantic engine object.
+        fields (Any) : The job fields to set.
+    """
+    await engine.get_collection(jobs_models.Job).update_one(
+        {"_id": job_id}, {"$set": {**fields, "updated_at": datetime.utcnow()}}
+    )
+
+
+async def fail_stale_jobs(engine: AIOEngine, stale_after: float) -> None:
+    """
+    A method to fail the running jobs of workers that stopped updating them.
+
+    Ledger transactions are not idempotent, so an interrupted job is failed
+    instead of being run again.
+
+    Args:
+        engine (odmantic.AIOEngine) : odmantic engine object.
+        stale_after (float) : The number of seconds after which a running job
+            is considered interrupted.
+    """
+    await engine.get_collection(jobs_models.Job).update_many(
+        {
+            "status": jobs_models.JobStatus.RUNNING.value,
+            "updated_at": {"$lt": datetime.utcnow() - timedelta(seconds=stale_after)},
+        },
+        {
+            "$set": {
+                "status": jobs_models.JobStatus.FAILED.value,
+                "error": "The job has been interrupted!",
+                "updated_at": datetime.utcnow(),
+            }
+        },
+    )
+
+
+__all__ = [
+    "claim_next_job",
+    "enqueue_job",
+    "fail_stale_jobs",
+    "get_job",
+    "job_to_dict",
+    "update_job",
+]
@@ -0,0 +1,72 @@
+"""The jobs models module"""
+
+from datetime import (
+    datetime,
+)
+from enum import Enum
+from odmantic import (
+    Field,
+    Index,
+    Model,
+)
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+
+class JobStatus(str, Enum):
+    """
+    The lifecycle of a job.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Model):
+    """
+    The Job model, a ledger operation run by the job workers.
+
+    Args:
+        Model (odmantic.Model): Odmantic base model.
+    """
+
+    kind: str
+    classic_address: str = Field(index=True)
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    status: JobStatus = Field(default=JobStatus.QUEUED)
+    step: Optional[str] = Field(default=None)
+    nftoken_id: Optional[str] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    results: List[Dict[str, Any]] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:  # pylint: disable=R0903
+        """
+        A class used to set the jobs collection name and indexes.
+        """
+
+        collection = "jobs"
+
+        @staticmethod
+        def indexes() -> Iterable[Any]:
+            """
+            Build the compound indexes of the jobs collection.
+
+            Returns:
+                Iterable[Any]: compound indexes used to claim the oldest job.
+            """
+            yield Index(Job.status, Job.created_at)
+
+
+__all__ = [
+    "Job",
+    "JobStatus",
+]
@@ -0,0 +1,46 @@
+"""The jobs router module"""
+
+from fastapi import (
+    APIRouter,
+    Depends,
+)
+from odmantic import (
+    AIOEngine,
+)
+from typing import (
+    Any,
+    Dict,
+)
+
+from app.jobs import (
+    crud as jobs_crud,
+    schemas as jobs_schemas,
+)
+from app.utils import (
+    dependencies,
+    jwt,
+)
+
+router = APIRouter(prefix="/api/v1")
+
+
+@router.get(
+    "/jobs/{job_id}",
+    name="jobs:get-job",
+    response_model=jobs_schemas.JobResponseSchema,
+    responses={
+        200: {
+            "model": jobs_schemas.JobResponseSchema,
+            "description": "A response object that contains the progress of a job.",
+        },
+    },
+)
+async def fetch_job(
+    job_id: str,
+    current_wallet: Any = Depends(jwt.get_current_active_wallet),
+    engine: AIOEngine = Depends(dependencies.get_db_read_engine),
+) -> Dict[str, Any]:
+    """
+    Fetch the progress of a job queued by the authenticated wallet.
+    """
+    return await jobs_crud.get_job(job_id, current_wallet.classic_address, engine)
@@ -0,0 +1,74 @@
+"""The jobs schemas module"""
+
+from datetime import (
+    datetime,
+)
+from pydantic import (
+    BaseModel,
+    Field,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+
+class JobAcceptedSchema(BaseModel):
+    """
+    A Pydantic class that defines the response schema of a queued job.
+    """
+
+    status_code: int = Field(..., example=202)
+    message: str = Field(..., example="The NFT will be minted shortly!")
+    job_id: str = Field(..., example="63a1e4c4f1a2b3c4d5e6f789")
+    rejected: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        example=[
+            {
+                "index": 3,
+                "image_url": "IPFS url of the NFT image.",
+                "status": "duplicate",
+            }
+        ],
+    )
+
+
+class JobObjectSchema(BaseModel):
+    """
+    A Pydantic class that defines the job schema.
+    """
+
+    id: str = Field(..., example="63a1e4c4f1a2b3c4d5e6f789")
+    kind: str = Field(..., example="mint")
+    status: str = Field(..., example="running")
+    step: Optional[str] = Field(None, example="creating_offer")
+    nftoken_id: Optional[str] = Field(
+        None, example="000800006203F49C21D5D6E022CB16DE3538F248662FC73C00000001"
+    )
+    error: Optional[str] = Field(None, example=None)
+    results: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        example=[
+            {
+                "index": 0,
+                "image_url": "IPFS url of the NFT image.",
+                "nftoken_id": "000800006203F49C21D5D6E022CB16DE3538F248662FC73C00000001",
+                "error": None,
+                "status": "succeeded",
+            }
+        ],
+    )
+    created_at: datetime = Field(..., example="2022-12-20T16:30:00")
+    updated_at: datetime = Field(..., example="2022-12-20T16:30:05")
+
+
+class JobResponseSchema(BaseModel):
+    """
+    A Pydantic class that defines the response schema of a job status.
+    """
+
+    status_code: int = Field(..., example=200)
+    job: Optional[JobObjectSchema] = Field(None)
+    message: Optional[str] = Field(None, example="Job not found!")
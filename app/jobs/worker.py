@@ -0,0 +1,247 @@
+"""The jobs worker module"""
+
+import asyncio
+from fastapi import (
+    FastAPI,
+)
+import logging
+from odmantic import (
+    AIOEngine,
+)
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+)
+from xrpl.asyncio.clients import (
+    AsyncJsonRpcClient,
+)
+
+from app.config import (
+    settings,
+)
+from app.jobs import (
+    crud as jobs_crud,
+    models as jobs_models,
+)
+from app.nfts import (
+    crud as nfts_crud,
+    metadata as nfts_metadata,
+)
+from app.utils import (
+    pinning,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorkerPool:
+    """
+    A pool of background tasks that run the queued jobs.
+
+    Every uvicorn worker runs a pool, jobs are claimed atomically so each
+    job runs exactly once across all of them.
+
+    Args:
+        engine (odmantic.AIOEngine) : odmantic engine object.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
+        pinning_client (app.utils.pinning.PinataClient) : A Pinata client.
+        size (int) : The number of jobs run concurrently.
+        poll_interval (float) : The number of seconds to wait when the queue
+            is empty.
+        stale_after (float) : The number of seconds after which a running job
+            is considered interrupted.
+    """
+
+    def __init__(
+        self,
+        engine: AIOEngine,
+        client: AsyncJsonRpcClient,
+        pinning_client: pinning.PinataClient,
+        size: int,
+        poll_interval: float,
+        stale_after: float,
+    ) -> None:
+        self.engine = engine
+        self.client = client
+        self.pinning_client = pinning_client
+        self.size = size
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.tasks: List["asyncio.Task[None]"] = []
+        self.handlers: Dict[str, Callable[[jobs_models.Job], Awaitable[None]]] = {
+            "mint": self.mint,
+            "mint_batch": self.mint_batch,
+        }
+
+    async def mint(self, job: jobs_models.Job) -> None:
+        """
+        Mint a listing nft token with a sell offer.
+
+        Args:
+            job (app.jobs.models.Job) : A mint job, its payload contains the
+                meta_data and image_url to mint.
+        """
+
+        async def on_minted(nftoken_id: str) -> None:
+            await jobs_crud.update_job(
+                job.id, self.engine, step="creating_offer", nftoken_id=nftoken_id
+            )
+
+        await jobs_crud.update_job(job.id, self.engine, step="minting")
+        session = self.engine.session()
+        await session.start()
+        try:
+            await nfts_crud.mint_nft_token(
+                job.classic_address,
+                job.payload["meta_data"],
+                nfts_metadata.NFTKind.LISTING,
+                session,
+                self.client,
+                True,
+                on_minted,
+            )
+        except Exception:
+            await self.pinning_client.release_mint(job.payload["image_url"])
+            raise
+        finally:
+            await session.end()
+
+    async def mint_batch(self, job: jobs_models.Job) -> None:
+        """
+        Mint a batch of nft tokens with their sell offers.
+
+        Args:
+            job (app.jobs.models.Job) : A batch mint job, its payload contains
+                the items to mint.
+        """
+        items = job.payload["items"]
+
+        async def on_step(step: str) -> None:
+            await jobs_crud.update_job(job.id, self.engine, step=step)
+
+        session = self.engine.session()
+        await session.start()
+        try:
+            results = await nfts_crud.mint_nft_batch(
+                job.classic_address, items, session, self.client, on_step
+            )
+        except Exception:
+            for item in items:
+                await self.pinning_client.release_mint(item["image_url"])
+            raise
+        finally:
+            await session.end()
+        for result in results:
+            if result["status"] != "succeeded":
+                await self.pinning_client.release_mint(result["image_url"])
+        await jobs_crud.update_job(
+            job.id,
+            self.engine,
+            results=[
+                {"index": item["index"], **result}
+                for item, result in zip(items, results)
+            ],
+        )
+
+    async def run_job(self, job: jobs_models.Job) -> None:
+        """
+        Run a claimed job and record its outcome.
+
+        Args:
+            job (app.jobs.models.Job) : A claimed job.
+        """
+        try:
+            await self.handlers[job.kind](job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            logger.error(repr(err))
+            await jobs_crud.update_job(
+                job.id,
+                self.engine,
+                status=jobs_models.JobStatus.FAILED.value,
+                error=str(err),
+            )
+            return
+        await jobs_crud.update_job(
+            job.id,
+            self.engine,
+            status=jobs_models.JobStatus.SUCCEEDED.value,
+            step=None,
+        )
+
+    async def run(self) -> None:
+        """
+        Claim and run jobs forever.
+        """
+        while True:
+            try:
+                await jobs_crud.fail_stale_jobs(self.engine, self.stale_after)
+                job = await jobs_crud.claim_next_job(self.engine)
+                if job is not None:
+                    await self.run_job(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                logger.error(repr(err))
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """
+        Start the worker tasks.
+        """
+        loop = asyncio.get_event_loop()
+        self.tasks = [loop.create_task(self.run()) for _ in range(self.size)]
+
+    async def stop(self) -> None:
+        """
+        Cancel the worker tasks.
+        """
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+
+async def init_job_workers(app: FastAPI) -> None:
+    """
+    Creates the jobs collection indexes and starts the job workers.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    app_settings = settings()
+
+    await app.state.engine.configure_database([jobs_models.Job])
+    pool = JobWorkerPool(
+        app.state.engine,
+        app.state.ledger_client,
+        app.state.pinning_client,
+        app_settings.JOB_WORKERS,
+        app_settings.JOB_POLL_INTERVAL,
+        app_settings.JOB_STALE_AFTER,
+    )
+    pool.start()
+    app.state.job_workers = pool
+
+
+async def close_job_workers(app: FastAPI) -> None:
+    """
+    Stops the job workers.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    pool = getattr(app.state, "job_workers", None)
+    if pool is not None:
+        await pool.stop()
+
+
+__all__ = [
+    "JobWorkerPool",
+    "close_job_workers",
+    "init_job_workers",
+]
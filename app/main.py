@@ -25,11 +25,30 @@ from app.auth import (
 from app.config import (
     settings,
 )
+from app.jobs import (
+    router as jobs_router,
+    worker as jobs_worker,
+)
 from app.nfts import (
+    indexer as nfts_indexer,
     router as nfts_router,
 )
+from app.profiling import (
+    router as profiling_router,
+)
 from app.utils import (
+    cache,
     engine,
+    etag,
+    ipfs,
+    jwt,
+    ledger,
+    loopmonitor,
+    metrics,
+    pinning,
+    profiling,
+    signing,
+    timing,
 )
 from app.wallets import (
     router as wallets_router,
@@ -75,21 +94,73 @@ def get_app() -> FastAPI:
 
     origins.extend(app_settings.cors_origins)
 
+    # polled by the frontends, cached until the validated ledger moves
+    app.add_middleware(
+        etag.ConditionalGetMiddleware,
+        paths=["/api/v1/nft/get-all", "/api/v1/wallet/all"],
+        authenticated_paths=["/api/v1/nft/get-wallet-nfts", "/api/v1/wallet"],
+        authorize=jwt.authorize_request,
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=origins,
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # opt-in, nothing is added without an admin token, and the profiles must
+    # be stored in a cache shared by every worker, any of them can serve them
+    profiling_enabled = bool(app_settings.PROFILING_TOKEN)
+    if profiling_enabled and app_settings.CACHE_BACKEND == "memory":
+        logger.warning("Profiling is disabled, it requires a shared CACHE_BACKEND!")
+        profiling_enabled = False
+    if profiling_enabled:
+        app.add_middleware(profiling.ProfilingMiddleware)
+    app.add_middleware(timing.ServerTimingMiddleware)
+    app.add_middleware(metrics.MetricsMiddleware)
 
     @app.on_event("startup")
     async def startup() -> None:
         logger.info("Connecting to MongoDB...")
         await engine.init_engine_app(app)
         logger.info("Connected to MongoDB!")
+        await cache.init_cache_backend(app)
+        logger.info("Created the cache backend!")
+        await ledger.init_ledger_client(app)
+        logger.info("Created the pooled ledger client!")
+        await ledger.init_ledger_watcher(app)
+        logger.info("Started the validated ledger watcher!")
+        await ipfs.init_ipfs_fetcher(app)
+        logger.info("Created the IPFS metadata fetcher!")
+        await pinning.init_pinning_client(app)
+        logger.info("Created the Pinata client!")
+        await signing.init_signing_pool(app)
+        logger.info("Started the transaction signing processes!")
+        await nfts_indexer.init_catalog_indexer(app)
+        logger.info("Started the NFT catalog indexer!")
+        await jobs_worker.init_job_workers(app)
+        logger.info("Started the job workers!")
+        await loopmonitor.init_loop_monitor(app)
+        logger.info("Started the event loop monitor!")
 
     @app.on_event("shutdown")
     async def shutdown() -> None:
+        try:
+            await loopmonitor.close_loop_monitor(app)
+        except Exception as err:
+            logger.error(repr(err))
+        logger.info("Stopped the event loop monitor!")
+        logger.info("Stopping the job workers...")
+        try:
+            await jobs_worker.close_job_workers(app)
+        except Exception as err:
+            logger.error(repr(err))
+        logger.info("Stopped the job workers!")
+        logger.info("Stopping the NFT catalog indexer...")
+        try:
+            await nfts_indexer.close_catalog_indexer(app)
+        except Exception as err:
+            logger.error(repr(err))
+        logger.info("Stopped the NFT catalog indexer!")
         logger.info("Closing connection with MongoDB...")
         # bug: TypeError: object NoneType can't be used in 'await' expression
         try:
@@ -97,14 +168,54 @@ def get_app() -> FastAPI:
         except Exception as err:
             logger.error(repr(err))
         logger.info("Closed connection with MongoDB!")
+        try:
+            await ledger.close_ledger_watcher(app)
+        except Exception as err:
+            logger.error(repr(err))
+        logger.info("Stopped the validated ledger watcher!")
+        logger.info("Closing the pooled ledger client...")
+        try:
+            await ledger.close_ledger_client(app)
+        except Exception as err:
+            logger.error(repr(err))
+        logger.info("Closed the pooled ledger client!")
+        try:
+            await ipfs.close_ipfs_fetcher(app)
+        except Exception as err:
+            logger.error(repr(err))
+        logger.info("Closed the IPFS metadata fetcher!")
+        try:
+            await cache.close_cache_backend(app)
+        except Exception as err:
+            logger.error(repr(err))
+        logger.info("Closed the cache backend!")
+        try:
+            await pinning.close_pinning_client(app)
+        except Exception as err:
+            logger.error(repr(err))
+        logger.info("Closed the Pinata client!")
+        try:
+            await signing.close_signing_pool(app)
+        except Exception as err:
+            logger.error(repr(err))
+        logger.info("Stopped the transaction signing processes!")
+        try:
+            await metrics.close_metrics(app)
+        except Exception as err:
+            logger.error(repr(err))
 
     @app.get("/api")
     async def root() -> Dict[str, str]:
         return {"message": "Welcome to Moerphous's Server."}
 
+    app.add_route("/metrics", metrics.metrics_response, include_in_schema=False)
+
     app.include_router(auth_router.router, tags=["auth"])
     app.include_router(wallets_router.router, tags=["wallets"])
     app.include_router(nfts_router.router, tags=["nfts"])
+    app.include_router(jobs_router.router, tags=["jobs"])
+    if profiling_enabled:
+        app.include_router(profiling_router.router, tags=["profiling"])
 
     # change openapi auth method to bearer token instead of user and password
     def custom_openapi() -> Any:
@@ -4,8 +4,11 @@ nfts package.
 
 from app.nfts import (
     crud,
+    indexer,
+    metadata,
+    models,
     router,
     schemas,
 )
 
-__all__ = ["crud", "router", "schemas"]
+__all__ = ["crud", "indexer", "metadata", "models", "router", "schemas"]
@@ -1,27 +1,31 @@
 """The nfts crud module"""
 
+import logging
+from odmantic import (
+    AIOEngine,
+)
 from odmantic.session import (
     AIOSession,
 )
 from typing import (
     Any,
+    Awaitable,
+    Callable,
     Dict,
+    List,
     Optional,
 )
-from xrpl.asyncio.account import (
-    get_account_info,
-)
 from xrpl.asyncio.clients import (
     AsyncJsonRpcClient,
 )
 from xrpl.asyncio.transaction import (
-    safe_sign_and_autofill_transaction,
-    send_reliable_submission,
+    XRPLReliableSubmissionException,
 )
-from xrpl.models.requests import (
-    AccountNFTs,
+from xrpl.models.response import (
+    Response,
 )
 from xrpl.models.transactions import (
+    AccountSet,
     AccountSetFlag,
     NFTokenBurn,
     NFTokenCreateOffer,
@@ -29,87 +33,303 @@ from xrpl.models.transactions import (
     NFTokenMint,
 )
 from xrpl.utils import (
-    hex_to_str,
     str_to_hex,
 )
-from xrpl.wallet import (
-    Wallet,
-)
 
 from app.auth import (
     crud as auth_crud,
 )
-from app.config import (
-    settings,
+from app.nfts import (
+    indexer as nfts_indexer,
+    metadata as nfts_metadata,
+    models as nfts_models,
 )
-from app.wallets import (
-    models as wallets_models,
+from app.utils import (
+    fanout,
+    pinning,
+    sequencer,
+    txmeta,
 )
 
+logger = logging.getLogger(__name__)
+
+
+async def add_to_catalog(
+    classic_address: str,
+    nftoken_id: str,
+    nft_metadata: nfts_metadata.NFTMetadata,
+    session: AIOSession,
+) -> None:
+    """
+    A method to list a just minted nft in the catalog, instead of waiting for
+    the next indexer run. A failure is only logged, the indexer corrects the
+    catalog on its next run.
+
+    Args:
+        classic_address (str) : A wallet classic address.
+        nftoken_id (str) : The minted token id.
+        nft_metadata (app.nfts.metadata.NFTMetadata) : The listing metadata.
+        session (odmantic.session.AIOSession) : odmantic session object.
+    """
+    try:
+        await nfts_indexer.add_listing(
+            session.engine, classic_address, nftoken_id, nft_metadata
+        )
+    except Exception as err:
+        logger.error(repr(err))
+
+
+async def remove_from_catalog(
+    classic_address: str, nftoken_id: str, session: AIOSession
+) -> None:
+    """
+    A method to unlist a just burnt nft from the catalog, instead of waiting
+    for the next indexer run. A failure is only logged, the indexer corrects
+    the catalog on its next run.
+
+    Args:
+        classic_address (str) : A wallet classic address.
+        nftoken_id (str) : The burnt token id.
+        session (odmantic.session.AIOSession) : odmantic session object.
+    """
+    try:
+        await nfts_indexer.remove_listing(session.engine, classic_address, nftoken_id)
+    except Exception as err:
+        logger.error(repr(err))
+
 
 async def mint_nft_token(
     classic_address: str,
     meta_data: str,
+    kind: nfts_metadata.NFTKind,
     session: AIOSession,
+    client: AsyncJsonRpcClient,
     has_offer: Optional[bool] = False,
+    on_minted: Optional[Callable[[str], Awaitable[None]]] = None,
 ) -> Dict[str, Any]:
     """
     A method to fetch wallet info.
 
     Args:
         classic_address (str) : A wallet classic address.
-        meta_data (str) : A comma separated string of values that represents the data to be minted.
+        meta_data (str) : The metadata to be minted, encoded by
+            app.nfts.metadata.encode_metadata.
+        kind (app.nfts.metadata.NFTKind) : The nft kind, minted as its taxon.
         session (odmantic.session.AIOSession) : odmantic session object.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
         has_offer (bool) : A bool that indicates whether or not the nft has a sell offer.
+        on_minted (Callable[[str], Awaitable[None]]) : An optional callback awaited
+            with the minted token id, before the sell offer is created.
     Returns:
         Dict[str, Any]: A dict that represents the account info object.
     """
-    client = AsyncJsonRpcClient(settings().json_rpc_url)
-    account_info = await get_account_info(classic_address, client, "validated")
-    sequence = account_info.result["account_data"]["Sequence"]
+    # the offer price is read before minting, so a token isn't minted without it
+    nft_metadata = nfts_metadata.decode_metadata(kind, meta_data)
+    price = nft_metadata.fields.get("price") if nft_metadata is not None else None
+    if has_offer and price is None:
+        raise ValueError("The nft metadata has no price!")
     wallet = await auth_crud.find_existed_wallet(
         classic_address=classic_address, session=session
     )
-    wallet = Wallet(sequence=sequence, seed=wallet.seed)
     tx_settings = NFTokenMint(
         account=classic_address,
-        nftoken_taxon=0,
+        nftoken_taxon=nfts_metadata.TAXONS[kind],
         uri=str_to_hex(meta_data),
         flags=AccountSetFlag.ASF_DEFAULT_RIPPLE,  # Enable rippling on this account.
     )
-    tx_settings_prepared = await safe_sign_and_autofill_transaction(
-        transaction=tx_settings,
-        wallet=wallet,
-        client=client,
+    response = await sequencer.sequencer.submit(tx_settings, wallet.seed, client)
+    # the minted token id is read from the validated transaction metadata
+    nftoken_id = txmeta.get_minted_nftoken_id(response.result["meta"])
+    try:
+        if has_offer:
+            if nftoken_id is None:
+                raise XRPLReliableSubmissionException(
+                    response.result["meta"]["TransactionResult"]
+                )
+            if on_minted is not None:
+                await on_minted(nftoken_id)
+            # create an offer for that token
+            tx_settings = NFTokenCreateOffer(
+                account=classic_address,
+                amount=str(price),
+                nftoken_id=nftoken_id,
+                flags=NFTokenCreateOfferFlag.TF_SELL_NFTOKEN,
+            )
+            response = await sequencer.sequencer.submit(
+                tx_settings, wallet.seed, client
+            )
+    finally:
+        # listed from the minted token id once the offer is submitted, the
+        # token is listed even if the offer fails
+        if (
+            kind == nfts_metadata.NFTKind.LISTING
+            and nftoken_id is not None
+            and nft_metadata is not None
+        ):
+            await add_to_catalog(classic_address, nftoken_id, nft_metadata, session)
+    return response
+
+
+async def claim_unique_mint(
+    image_url: str, engine: AIOEngine, pinning_client: pinning.PinataClient
+) -> bool:
+    """
+    A method to reserve the minting of an image, unless it has already been
+    minted.
+
+    It runs before any ledger transaction is submitted, the reservation must
+    be released with pinning_client.release_mint if the mint fails.
+
+    Args:
+        image_url (str) : The IPFS url of the nft image.
+        engine (odmantic.AIOEngine) : odmantic engine object.
+        pinning_client (app.utils.pinning.PinataClient) : A Pinata client.
+    Returns:
+        bool: False if the image has already been minted.
+    """
+    listed = await engine.find_one(
+        nfts_models.NFTCatalogItem, nfts_models.NFTCatalogItem.image_url == image_url
+    )
+    if listed is not None:
+        return False
+    return await pinning_client.claim_mint(image_url)
+
+
+def transaction_succeeded(response: Response) -> bool:
+    """
+    Check whether a validated transaction has been applied.
+
+    Args:
+        response (xrpl.models.response.Response) : A validated transaction.
+    Returns:
+        bool: True if the transaction result is tesSUCCESS.
+    """
+    return response.result["meta"]["TransactionResult"] == "tesSUCCESS"
+
+
+async def mint_nft_batch(
+    classic_address: str,
+    items: List[Dict[str, str]],
+    session: AIOSession,
+    client: AsyncJsonRpcClient,
+    on_step: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    A method to mint a batch of nft tokens with their sell offers.
+
+    A single TicketCreate reserves a ticket for every mint and offer, all the
+    mints, then all the offers, are submitted concurrently against them.
+    Tickets left unused by failed items are consumed before returning, so
+    they don't lock the owner reserve.
+
+    Args:
+        classic_address (str) : A wallet classic address.
+        items (List[Dict[str, str]]) : The listings to mint, with their
+            encoded meta_data, image_url and price.
+        session (odmantic.session.AIOSession) : odmantic session object.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
+        on_step (Callable[[str], Awaitable[None]]) : An optional callback awaited
+            with the name of each step.
+    Returns:
+        List[Dict[str, Any]]: The per-item results, in the items order.
+    """
+
+    async def report(step: str) -> None:
+        if on_step is not None:
+            await on_step(step)
+
+    stored_wallet = await auth_crud.find_existed_wallet(
+        classic_address=classic_address, session=session
+    )
+    results: List[Dict[str, Any]] = [
+        {"image_url": item["image_url"], "nftoken_id": None, "error": None}
+        for item in items
+    ]
+    await report("creating_tickets")
+    tickets = await sequencer.create_tickets(
+        classic_address, 2 * len(items), stored_wallet.seed, client
     )
-    response = await send_reliable_submission(tx_settings_prepared, client)
-    if has_offer:
-        # get the recently created token id
-        response = await client.request(
-            AccountNFTs(
+    used_tickets = set()
+
+    await report("minting")
+    submitter = await sequencer.TicketedSubmitter.create(stored_wallet.seed, client)
+    mints = await fanout.fan_out(
+        list(range(len(items))),
+        lambda index: submitter.submit(
+            NFTokenMint(
                 account=classic_address,
+                nftoken_taxon=nfts_metadata.TAXONS[nfts_metadata.NFTKind.LISTING],
+                uri=str_to_hex(items[index]["meta_data"]),
+                flags=AccountSetFlag.ASF_DEFAULT_RIPPLE,
+            ),
+            tickets[index],
+        ),
+    )
+    minted = []
+    for mint in mints:
+        if mint.error is not None:
+            results[mint.item]["error"] = repr(mint.error)
+            continue
+        used_tickets.add(tickets[mint.item])
+        nftoken_id = txmeta.get_minted_nftoken_id(mint.value.result["meta"])
+        if nftoken_id is not None:
+            results[mint.item]["nftoken_id"] = nftoken_id
+            minted.append(mint.item)
+            nft_metadata = nfts_metadata.decode_metadata(
+                nfts_metadata.NFTKind.LISTING, items[mint.item]["meta_data"]
             )
+            if nft_metadata is not None:
+                await add_to_catalog(classic_address, nftoken_id, nft_metadata, session)
+        else:
+            results[mint.item]["error"] = mint.value.result["meta"]["TransactionResult"]
+
+    await report("creating_offers")
+    submitter = await sequencer.TicketedSubmitter.create(stored_wallet.seed, client)
+    offers = await fanout.fan_out(
+        minted,
+        lambda index: submitter.submit(
+            NFTokenCreateOffer(
+                account=classic_address,
+                amount=items[index]["price"],
+                nftoken_id=results[index]["nftoken_id"],
+                flags=NFTokenCreateOfferFlag.TF_SELL_NFTOKEN,
+            ),
+            tickets[len(items) + index],
+        ),
+    )
+    for offer in offers:
+        if offer.error is not None:
+            results[offer.item]["error"] = repr(offer.error)
+            continue
+        used_tickets.add(tickets[len(items) + offer.item])
+        if not transaction_succeeded(offer.value):
+            results[offer.item]["error"] = offer.value.result["meta"][
+                "TransactionResult"
+            ]
+
+    unused_tickets = [ticket for ticket in tickets if ticket not in used_tickets]
+    if unused_tickets:
+        await report("releasing_tickets")
+        submitter = await sequencer.TicketedSubmitter.create(stored_wallet.seed, client)
+        releases = await fanout.fan_out(
+            unused_tickets,
+            lambda ticket: submitter.submit(
+                AccountSet(account=classic_address), ticket
+            ),
         )
-        account_nfts = response.result["account_nfts"]
-        nftoken_id = account_nfts[-1]["NFTokenID"]
-        # create an offer for that token
-        tx_settings = NFTokenCreateOffer(
-            account=classic_address,
-            amount=meta_data.split(",")[-1],
-            nftoken_id=nftoken_id,
-            flags=NFTokenCreateOfferFlag.TF_SELL_NFTOKEN,
-        )
-        tx_settings_prepared = await safe_sign_and_autofill_transaction(
-            transaction=tx_settings,
-            wallet=wallet,
-            client=client,
-        )
-        response = await send_reliable_submission(tx_settings_prepared, client)
-    return response
+        for failure in fanout.failures(releases, "ticket"):
+            logger.warning("Ticket release failed: %s", failure)
+    return [
+        {**result, "status": "succeeded" if result["error"] is None else "failed"}
+        for result in results
+    ]
 
 
 async def burn_nft_token(
-    classic_address: str, nftoken_id: str, session: AIOSession
+    classic_address: str,
+    nftoken_id: str,
+    session: AIOSession,
+    client: AsyncJsonRpcClient,
 ) -> Dict[str, Any]:
     """
     A method to burn an nft token.
@@ -118,93 +338,114 @@ async def burn_nft_token(
         classic_address (str) : A wallet classic address.
         nftoken_id (str) : A token id to be burnt.
         session (odmantic.session.AIOSession) : odmantic session object.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
     Returns:
         Dict[str, Any]: A dict that represents the account info object.
     """
-    client = AsyncJsonRpcClient(settings().json_rpc_url)
-    account_info = await get_account_info(classic_address, client, "validated")
-    sequence = account_info.result["account_data"]["Sequence"]
     wallet = await auth_crud.find_existed_wallet(
         classic_address=classic_address, session=session
     )
-    wallet = Wallet(sequence=sequence, seed=wallet.seed)
     tx_settings = NFTokenBurn(
         account=classic_address,
         nftoken_id=nftoken_id,
     )
-    tx_settings_prepared = await safe_sign_and_autofill_transaction(
-        transaction=tx_settings,
-        wallet=wallet,
-        client=client,
-    )
-    response = await send_reliable_submission(tx_settings_prepared, client)
+    response = await sequencer.sequencer.submit(tx_settings, wallet.seed, client)
+    if transaction_succeeded(response):
+        await remove_from_catalog(classic_address, nftoken_id, session)
     return response
 
 
-async def get_all_nfts(classic_address: str) -> Dict[str, Any]:
+def catalog_item_to_dict(item: nfts_models.NFTCatalogItem) -> Dict[str, Any]:
+    """
+    Serialize a catalog item to the listing response format.
+
+    Args:
+        item (nfts_models.NFTCatalogItem) : A catalog item.
+    Returns:
+        Dict[str, Any]: A dict that represents a marketplace listing.
+    """
+    return {
+        "id": item.nftoken_id,
+        "author_avatar": item.author_avatar,
+        "image_url": item.image_url,
+        "title": item.title,
+        "price": item.price,
+    }
+
+
+async def get_catalog_page(
+    engine: AIOEngine,
+    limit: int,
+    cursor: Optional[str] = None,
+    classic_address: Optional[str] = None,
+) -> Dict[str, Any]:
     """
-    A method to fetch all nfts from the ledger for a given account.
+    A method to fetch a page of the ledger-synced catalog, ordered by token id.
+
+    Args:
+        engine (odmantic.AIOEngine) : odmantic read-only engine object.
+        limit (int) : The max number of nfts in the page.
+        cursor (str) : The last token id of the previous page.
+        classic_address (str) : An optional wallet classic address filter.
+    Returns:
+        Dict[str, Any]: A dict that contains the page nfts and the next cursor.
+    """
+    queries = []
+    if classic_address is not None:
+        queries.append(nfts_models.NFTCatalogItem.classic_address == classic_address)
+    if cursor:
+        queries.append(nfts_models.NFTCatalogItem.nftoken_id > cursor)
+    catalog_items = await engine.find(
+        nfts_models.NFTCatalogItem,
+        *queries,
+        sort=nfts_models.NFTCatalogItem.nftoken_id,
+        limit=limit + 1,
+    )
+    next_cursor = None
+    if len(catalog_items) > limit:
+        catalog_items = catalog_items[:limit]
+        next_cursor = catalog_items[-1].nftoken_id
+    return {
+        "status_code": 200,
+        "results": [catalog_item_to_dict(item) for item in catalog_items],
+        "next_cursor": next_cursor,
+    }
+
+
+async def get_all_nfts(
+    classic_address: str,
+    engine: AIOEngine,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    A method to fetch a page of the nfts of a given account from the
+    ledger-synced catalog.
 
     Args:
         classic_address (str) : A wallet classic address.
+        engine (odmantic.AIOEngine) : odmantic read-only engine object.
+        limit (int) : The max number of nfts in the page.
+        cursor (str) : The last token id of the previous page.
     Returns:
         Dict[str, Any]: A dict that represents the account info object.
     """
-    client = AsyncJsonRpcClient(settings().json_rpc_url)
-    results = []
-    response = await client.request(
-        AccountNFTs(
-            account=classic_address,
-        )
-    )
-    account_nfts = response.result["account_nfts"]
-    for nft_token in account_nfts:
-        nftokens_list = hex_to_str(nft_token["URI"]).split(",")
-        if len(nftokens_list) == 4:
-            author_avatar, picture, title, price = nftokens_list
-            results.append(
-                {
-                    "id": nft_token["NFTokenID"],
-                    "author_avatar": author_avatar,
-                    "image_url": picture,
-                    "title": title,
-                    "price": price,
-                }
-            )
-    return {"status_code": 200, "results": results}
+    return await get_catalog_page(engine, limit, cursor, classic_address)
 
 
-async def get_all_wallets_nfts(session: AIOSession) -> Dict[str, Any]:
+async def get_all_wallets_nfts(
+    engine: AIOEngine, limit: int, cursor: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    A method to fetch all nfts from the ledger for all accounts.
+    A method to fetch a page of the nfts of all accounts from the ledger-synced
+    catalog.
 
     Args:
-        session (odmantic.session.AIOSession) : odmantic session object.
+        engine (odmantic.AIOEngine) : odmantic read-only engine object.
+        limit (int) : The max number of nfts in the page.
+        cursor (str) : The last token id of the previous page.
 
     Returns:
         Dict[str, Any]: A dict that represents all info about all nfts.
     """
-    client = AsyncJsonRpcClient(settings().json_rpc_url)
-    all_registered_wallets = await session.find(wallets_models.Wallet)
-    results = []
-    for wallet in all_registered_wallets:
-        response = await client.request(
-            AccountNFTs(
-                account=wallet.classic_address,
-            )
-        )
-        account_nfts = response.result["account_nfts"]
-        for nft_token in account_nfts:
-            modified_nftokens_list = hex_to_str(nft_token["URI"]).split(",")
-            if len(modified_nftokens_list) == 4:
-                author_avatar, picture, title, price = modified_nftokens_list
-                results.append(
-                    {
-                        "id": nft_token["NFTokenID"],
-                        "author_avatar": author_avatar,
-                        "image_url": picture,
-                        "title": title,
-                        "price": price,
-                    }
-                )
-    return {"status_code": 200, "results": results}
+    return await get_catalog_page(engine, limit, cursor)
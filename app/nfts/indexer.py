@@ -0,0 +1,371 @@
+"""The nfts indexer module"""
+
+import asyncio
+from datetime import (
+    datetime,
+    timedelta,
+)
+from fastapi import (
+    FastAPI,
+)
+import logging
+from odmantic import (
+    AIOEngine,
+)
+from pymongo import (
+    UpdateOne,
+)
+from pymongo.errors import (
+    DuplicateKeyError,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+import uuid
+from xrpl.asyncio.clients import (
+    AsyncJsonRpcClient,
+)
+
+from app.config import (
+    settings,
+)
+from app.nfts import (
+    metadata as nfts_metadata,
+    models as nfts_models,
+)
+from app.utils import (
+    fanout,
+    ipfs,
+    ledger,
+)
+from app.wallets import (
+    models as wallets_models,
+)
+
+logger = logging.getLogger(__name__)
+
+LEASES_COLLECTION = "leases"
+CATALOG_LEASE_ID = "nft_catalog_indexer"
+
+
+def _listing(
+    nftoken_id: str, nft_metadata: nfts_metadata.NFTMetadata
+) -> Dict[str, Any]:
+    return {
+        "nftoken_id": nftoken_id,
+        **nft_metadata.fields,
+        "author_avatar": nft_metadata.fields["author_avatar"] or "",
+    }
+
+
+def parse_listing(nft_token: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Parse a marketplace listing out of an AccountNFTs token.
+
+    Args:
+        nft_token (Dict[str, Any]) : A token object returned by AccountNFTs.
+
+    Returns:
+        Optional[Dict[str, Any]]: The listing fields, None if the token is
+            not a marketplace listing.
+    """
+    nft_metadata = nfts_metadata.parse_nft_token(nft_token)
+    if nft_metadata is None or nft_metadata.kind != nfts_metadata.NFTKind.LISTING:
+        return None
+    return _listing(nft_token["NFTokenID"], nft_metadata)
+
+
+async def add_listing(
+    engine: AIOEngine,
+    classic_address: str,
+    nftoken_id: str,
+    nft_metadata: nfts_metadata.NFTMetadata,
+) -> None:
+    """
+    Add a just minted listing to the catalog, and count it in the wallet
+    nb_items unless the indexer already listed it.
+
+    Args:
+        engine (odmantic.AIOEngine) : odmantic engine object.
+        classic_address (str) : The wallet classic address owning the token.
+        nftoken_id (str) : The minted token id.
+        nft_metadata (app.nfts.metadata.NFTMetadata) : The listing metadata.
+    """
+    result = await engine.get_collection(nfts_models.NFTCatalogItem).update_one(
+        {"nftoken_id": nftoken_id},
+        {
+            "$set": {
+                **_listing(nftoken_id, nft_metadata),
+                "classic_address": classic_address,
+                "synced_at": datetime.utcnow(),
+            }
+        },
+        upsert=True,
+    )
+    if result.upserted_id is not None:
+        await engine.get_collection(wallets_models.Wallet).update_one(
+            {"classic_address": classic_address}, {"$inc": {"nb_items": 1}}
+        )
+
+
+async def remove_listing(
+    engine: AIOEngine, classic_address: str, nftoken_id: str
+) -> None:
+    """
+    Remove a burnt token from the catalog, and uncount it from the wallet
+    nb_items if it was listed.
+
+    Args:
+        engine (odmantic.AIOEngine) : odmantic engine object.
+        classic_address (str) : The wallet classic address owning the token.
+        nftoken_id (str) : The burnt token id.
+    """
+    result = await engine.get_collection(nfts_models.NFTCatalogItem).delete_one(
+        {"nftoken_id": nftoken_id, "classic_address": classic_address}
+    )
+    if result.deleted_count:
+        await engine.get_collection(wallets_models.Wallet).update_one(
+            {"classic_address": classic_address}, {"$inc": {"nb_items": -1}}
+        )
+
+
+async def sync_account(
+    engine: AIOEngine,
+    client: AsyncJsonRpcClient,
+    classic_address: str,
+    fetcher: Optional[ipfs.IPFSFetcher] = None,
+) -> int:
+    """
+    Sync the catalog listings and the leaderboard profile of a single account
+    with the ledger.
+
+    Args:
+        engine (odmantic.AIOEngine) : odmantic engine object.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
+        classic_address (str) : A wallet classic address.
+        fetcher (app.utils.ipfs.IPFSFetcher) : An optional IPFS metadata fetcher,
+            the first name and bio of profiles that aren't minted inline are
+            only synced when provided.
+
+    Returns:
+        int: The number of listings the account currently holds.
+    """
+    listings = []
+    profile: Dict[str, Any] = {"profile_picture": None}
+    profiles = []
+    async for nft_token in ledger.iter_account_nfts(classic_address, client):
+        nft_metadata = nfts_metadata.parse_nft_token(nft_token)
+        if nft_metadata is None:
+            continue
+        if nft_metadata.kind == nfts_metadata.NFTKind.LISTING:
+            listings.append(_listing(nft_token["NFTokenID"], nft_metadata))
+        elif nft_metadata.kind == nfts_metadata.NFTKind.AVATAR:
+            profile["profile_picture"] = nft_metadata.fields["image_url"]
+        elif nft_metadata.kind == nfts_metadata.NFTKind.PROFILE:
+            profiles.append(nft_metadata)
+    for nft_metadata in profiles:
+        try:
+            profile_fields = await nfts_metadata.read_profile(nft_metadata, fetcher)
+        except Exception as err:
+            logger.warning("Profile metadata fetch failed: %s", repr(err))
+            continue
+        if profile_fields is not None:
+            profile.update(profile_fields)
+    collection = engine.get_collection(nfts_models.NFTCatalogItem)
+    synced_at = datetime.utcnow()
+    if listings:
+        await collection.bulk_write(
+            [
+                UpdateOne(
+                    {"nftoken_id": listing["nftoken_id"]},
+                    {
+                        "$set": {
+                            **listing,
+                            "classic_address": classic_address,
+                            "synced_at": synced_at,
+                        }
+                    },
+                    upsert=True,
+                )
+                for listing in listings
+            ],
+            ordered=False,
+        )
+    await collection.delete_many(
+        {
+            "classic_address": classic_address,
+            "nftoken_id": {"$nin": [listing["nftoken_id"] for listing in listings]},
+        }
+    )
+    # the leaderboard reads the precomputed count through the nb_items index
+    await engine.get_collection(wallets_models.Wallet).update_one(
+        {"classic_address": classic_address},
+        {"$set": {**profile, "nb_items": len(listings)}},
+    )
+    return len(listings)
+
+
+class CatalogIndexer:
+    """
+    A background task that keeps the nft_catalog collection in sync with
+    the ledger for every registered wallet.
+
+    Every uvicorn worker runs an indexer, a lease stored in MongoDB makes
+    sure a single one of them scans the ledger per sync interval.
+
+    Args:
+        engine (odmantic.AIOEngine) : odmantic engine object.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
+        fetcher (app.utils.ipfs.IPFSFetcher) : IPFS metadata fetcher.
+        interval (float) : The number of seconds between two syncs.
+    """
+
+    def __init__(
+        self,
+        engine: AIOEngine,
+        client: AsyncJsonRpcClient,
+        fetcher: ipfs.IPFSFetcher,
+        interval: float,
+    ) -> None:
+        self.engine = engine
+        self.client = client
+        self.fetcher = fetcher
+        self.interval = interval
+        self.owner = uuid.uuid4().hex
+        self.task: Optional["asyncio.Task[None]"] = None
+
+    async def acquire_lease(self) -> bool:
+        """
+        Try to acquire the indexer lease for one sync interval.
+
+        Returns:
+            bool: True if this indexer owns the lease.
+        """
+        now = datetime.utcnow()
+        leases = self.engine.database[LEASES_COLLECTION]
+        try:
+            await leases.update_one(
+                {
+                    "_id": CATALOG_LEASE_ID,
+                    "$or": [{"expires_at": {"$lt": now}}, {"owner": self.owner}],
+                },
+                {
+                    "$set": {
+                        "owner": self.owner,
+                        "expires_at": now + timedelta(seconds=self.interval),
+                    }
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def sync(self) -> List[fanout.FanOutResult]:
+        """
+        Sync the catalog of every registered wallet.
+
+        Returns:
+            List[FanOutResult]: The per-wallet sync results.
+        """
+        all_registered_wallets = await self.engine.find(wallets_models.Wallet)
+        results = await fanout.fan_out(
+            all_registered_wallets,
+            lambda wallet: sync_account(
+                self.engine, self.client, wallet.classic_address, self.fetcher
+            ),
+        )
+        for failure in fanout.failures(results, "classic_address"):
+            logger.warning("Catalog sync failed: %s", failure)
+        await self.engine.get_collection(nfts_models.NFTCatalogItem).delete_many(
+            {
+                "classic_address": {
+                    "$nin": [
+                        wallet.classic_address for wallet in all_registered_wallets
+                    ]
+                }
+            }
+        )
+        return results
+
+    async def run(self) -> None:
+        """
+        Sync the catalog forever, once per interval.
+        """
+        while True:
+            try:
+                if await self.acquire_lease():
+                    await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                logger.error(repr(err))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Start the indexer background task.
+        """
+        self.task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Cancel the indexer background task.
+        """
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+async def init_catalog_indexer(app: FastAPI) -> None:
+    """
+    Creates the catalog and wallets collections indexes and starts the indexer.
+
+    This function configures the nft_catalog and wallet collections, creates
+    a catalog indexer, stores it in the application's state property and
+    starts it.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    await app.state.engine.configure_database(
+        [nfts_models.NFTCatalogItem, wallets_models.Wallet]
+    )
+    indexer = CatalogIndexer(
+        app.state.engine,
+        app.state.ledger_client,
+        app.state.ipfs_fetcher,
+        settings().CATALOG_SYNC_INTERVAL,
+    )
+    indexer.start()
+    app.state.catalog_indexer = indexer
+
+
+async def close_catalog_indexer(app: FastAPI) -> None:
+    """
+    Stops the catalog indexer.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    indexer = getattr(app.state, "catalog_indexer", None)
+    if indexer is not None:
+        await indexer.stop()
+
+
+__all__ = [
+    "CatalogIndexer",
+    "add_listing",
+    "close_catalog_indexer",
+    "init_catalog_indexer",
+    "parse_listing",
+    "remove_listing",
+    "sync_account",
+]
@@ -0,0 +1,278 @@
+"""The nfts metadata module"""
+
+from enum import Enum
+import json
+from typing import (
+    Any,
+    Dict,
+    NamedTuple,
+    Optional,
+)
+from xrpl.utils import (
+    hex_to_str,
+)
+
+from app.utils import (
+    ipfs,
+    pinning,
+)
+
+METADATA_VERSION = 1
+# tokens minted before the versioned format all share this taxon
+LEGACY_TAXON = 0
+# the ledger limit of an NFTokenMint URI
+MAX_URI_BYTES = 256
+IPFS_SCHEME = "ipfs://"
+
+
+class NFTKind(str, Enum):
+    """
+    The kinds of nft minted by the marketplace.
+    """
+
+    PROFILE = "profile"
+    AVATAR = "avatar"
+    LISTING = "listing"
+
+
+# every kind is minted with its own nftoken_taxon, so the AccountNFTs
+# results are classified without reading the tokens content
+TAXONS = {
+    NFTKind.PROFILE: 1,
+    NFTKind.AVATAR: 2,
+    NFTKind.LISTING: 3,
+}
+KINDS = {taxon: kind for kind, taxon in TAXONS.items()}
+# the encoded values of each kind, in order
+FIELDS = {
+    NFTKind.PROFILE: ("first_name", "bio", "metadata_url"),
+    NFTKind.AVATAR: ("image_url",),
+    NFTKind.LISTING: ("author_avatar", "image_url", "title", "price"),
+}
+URL_FIELDS = ("metadata_url", "image_url", "author_avatar")
+
+
+class MetadataTooLargeError(ValueError):
+    """
+    Raised when encoded metadata exceeds the NFTokenMint URI limit.
+    """
+
+
+class NFTMetadata(NamedTuple):
+    """
+    The metadata of a marketplace nft.
+
+    Args:
+        kind (NFTKind) : The nft kind.
+        version (int) : The metadata format version, 0 for the comma format.
+        fields (Dict[str, Optional[str]]) : The metadata values of the kind.
+    """
+
+    kind: NFTKind
+    version: int
+    fields: Dict[str, Optional[str]]
+
+
+def compact_url(url: Optional[str]) -> Optional[str]:
+    """
+    Shorten an IPFS gateway url to an ipfs:// url.
+
+    Args:
+        url (Optional[str]) : A url.
+
+    Returns:
+        Optional[str]: The ipfs:// url, the url itself if it isn't an IPFS url.
+    """
+    parsed_url = ipfs.parse_ipfs_url(url) if url else None
+    if parsed_url is None:
+        return url
+    content_id, path = parsed_url
+    return f"{IPFS_SCHEME}{content_id}/{path}" if path else IPFS_SCHEME + content_id
+
+
+def expand_url(url: Optional[str]) -> Optional[str]:
+    """
+    Expand an ipfs:// url to an IPFS gateway url.
+
+    Args:
+        url (Optional[str]) : A url.
+
+    Returns:
+        Optional[str]: The gateway url, the url itself if it isn't an ipfs:// url.
+    """
+    if url is None or not url.startswith(IPFS_SCHEME):
+        return url
+    return f"{pinning.IPFS_GATEWAY_URL}/{url[len(IPFS_SCHEME):]}"
+
+
+def encode_metadata(kind: NFTKind, **fields: Optional[str]) -> str:
+    """
+    Encode the metadata of an nft in the versioned format.
+
+    The metadata is a compact JSON array holding the format version followed
+    by the values of the kind, IPFS urls are stored as ipfs:// urls.
+
+    Args:
+        kind (NFTKind) : The nft kind.
+        fields (Optional[str]) : The metadata values of the kind, missing
+            ones are encoded as null.
+
+    Raises:
+        MetadataTooLargeError: if the encoded metadata doesn't fit in a URI.
+
+    Returns:
+        str: The encoded metadata, to be minted as the token URI.
+    """
+    values = [
+        compact_url(fields.get(name)) if name in URL_FIELDS else fields.get(name)
+        for name in FIELDS[kind]
+    ]
+    meta_data = json.dumps(
+        [METADATA_VERSION, *values], separators=(",", ":"), ensure_ascii=False
+    )
+    if len(meta_data.encode()) > MAX_URI_BYTES:
+        raise MetadataTooLargeError(
+            f"The {kind.value} metadata exceeds {MAX_URI_BYTES} bytes!"
+        )
+    return meta_data
+
+
+def decode_metadata(kind: NFTKind, meta_data: str) -> Optional[NFTMetadata]:
+    """
+    Decode metadata minted in the versioned format.
+
+    Args:
+        kind (NFTKind) : The nft kind, given by its taxon.
+        meta_data (str) : The decoded URI of a token.
+
+    Returns:
+        Optional[NFTMetadata]: The nft metadata, None if the URI isn't in the
+            versioned format.
+    """
+    try:
+        values = json.loads(meta_data)
+    except ValueError:
+        return None
+    names = FIELDS[kind]
+    if (
+        not isinstance(values, list)
+        or len(values) != len(names) + 1
+        or values[0] != METADATA_VERSION
+        or not all(value is None or isinstance(value, str) for value in values[1:])
+    ):
+        return None
+    return NFTMetadata(
+        kind,
+        values[0],
+        {
+            name: expand_url(value) if name in URL_FIELDS else value
+            for name, value in zip(names, values[1:])
+        },
+    )
+
+
+def parse_legacy_metadata(meta_data: str) -> Optional[NFTMetadata]:
+    """
+    Parse metadata minted in the comma format.
+
+    Listings hold four comma separated values, or three without the author
+    avatar for the ones minted by the former /nft/mint-offer, avatars are
+    image urls ending with .png, and profiles are IPFS urls of a
+    "first_name,bio" file, so their values are only known once the file is
+    fetched.
+
+    Args:
+        meta_data (str) : The decoded URI of a token.
+
+    Returns:
+        Optional[NFTMetadata]: The nft metadata, None if the URI isn't
+            marketplace metadata.
+    """
+    meta_data_array = meta_data.split(",")
+    if len(meta_data_array) == 4:
+        return NFTMetadata(
+            NFTKind.LISTING, 0, dict(zip(FIELDS[NFTKind.LISTING], meta_data_array))
+        )
+    if len(meta_data_array) == 3:
+        return NFTMetadata(
+            NFTKind.LISTING,
+            0,
+            dict(zip(FIELDS[NFTKind.LISTING], [None, *meta_data_array])),
+        )
+    if len(meta_data_array) > 1:
+        return None
+    if "png" in meta_data:
+        return NFTMetadata(NFTKind.AVATAR, 0, {"image_url": meta_data[:-4]})
+    if ipfs.parse_ipfs_url(meta_data) is not None:
+        return NFTMetadata(
+            NFTKind.PROFILE,
+            0,
+            {"first_name": None, "bio": None, "metadata_url": meta_data},
+        )
+    return None
+
+
+def parse_nft_token(nft_token: Dict[str, Any]) -> Optional[NFTMetadata]:
+    """
+    Classify and parse an AccountNFTs token, without any IPFS fetch.
+
+    Args:
+        nft_token (Dict[str, Any]) : A token object returned by AccountNFTs.
+
+    Returns:
+        Optional[NFTMetadata]: The nft metadata, None if the token wasn't
+            minted by the marketplace.
+    """
+    taxon = nft_token.get("NFTokenTaxon", LEGACY_TAXON)
+    meta_data = hex_to_str(nft_token.get("URI", ""))
+    if taxon == LEGACY_TAXON:
+        return parse_legacy_metadata(meta_data)
+    if taxon in KINDS:
+        return decode_metadata(KINDS[taxon], meta_data)
+    return None
+
+
+async def read_profile(
+    nft_metadata: NFTMetadata, fetcher: Optional[ipfs.IPFSFetcher] = None
+) -> Optional[Dict[str, str]]:
+    """
+    Read the first name and bio of a profile nft.
+
+    They are minted inline unless they don't fit in a URI, only then are
+    they read from the IPFS metadata file.
+
+    Args:
+        nft_metadata (NFTMetadata) : The metadata of a profile nft.
+        fetcher (app.utils.ipfs.IPFSFetcher) : An optional IPFS metadata
+            fetcher, profiles that aren't minted inline are skipped without it.
+
+    Returns:
+        Optional[Dict[str, str]]: The first_name and bio, None if they can't
+            be read.
+    """
+    fields = nft_metadata.fields
+    if fields["first_name"] is not None and fields["bio"] is not None:
+        return {"first_name": fields["first_name"], "bio": fields["bio"]}
+    if fields["metadata_url"] is None or fetcher is None:
+        return None
+    meta_data_array = (await fetcher.fetch_text(fields["metadata_url"])).split(",")
+    if len(meta_data_array) != 2:
+        return None
+    first_name, bio = meta_data_array
+    return {"first_name": first_name, "bio": bio}
+
+
+__all__ = [
+    "KINDS",
+    "MetadataTooLargeError",
+    "NFTKind",
+    "NFTMetadata",
+    "TAXONS",
+    "compact_url",
+    "decode_metadata",
+    "encode_metadata",
+    "expand_url",
+    "parse_legacy_metadata",
+    "parse_nft_token",
+    "read_profile",
+]
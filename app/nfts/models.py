@@ -0,0 +1,56 @@
+"""The nfts models module"""
+
+from datetime import (
+    datetime,
+)
+from odmantic import (
+    Field,
+    Index,
+    Model,
+)
+from typing import (
+    Any,
+    Iterable,
+    Optional,
+)
+
+
+class NFTCatalogItem(Model):
+    """
+    The NFT catalog item model, a marketplace listing synced from the ledger.
+
+    Args:
+        Model (odmantic.Model): Odmantic base model.
+    """
+
+    nftoken_id: str = Field(unique=True)
+    classic_address: str
+    author_avatar: str
+    image_url: str
+    title: str
+    price: str
+    synced_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+    class Config:  # pylint: disable=R0903
+        """
+        A class used to set the catalog collection name and indexes.
+        """
+
+        collection = "nft_catalog"
+
+        @staticmethod
+        def indexes() -> Iterable[Any]:
+            """
+            Build the compound indexes of the catalog collection.
+
+            Returns:
+                Iterable[Any]: compound indexes used by the listing queries,
+                    and the image_url index used by the duplicate mint check.
+            """
+            yield Index(NFTCatalogItem.classic_address, NFTCatalogItem.nftoken_id)
+            yield Index(NFTCatalogItem.image_url)
+
+
+__all__ = [
+    "NFTCatalogItem",
+]
@@ -1,25 +1,26 @@
 """The nfts router module"""
 
-import base64
+import binascii
 from fastapi import (
     APIRouter,
     Depends,
     File,
+    Form,
+    Query,
+    Response,
     UploadFile,
 )
+import httpx
+from odmantic import (
+    AIOEngine,
+)
 from odmantic.session import (
     AIOSession,
 )
-import os
-from pinatapy import (
-    PinataPy,
-)
-from tempfile import (
-    NamedTemporaryFile,
-)
 from typing import (
     Any,
     Dict,
+    Optional,
     Union,
 )
 
@@ -29,47 +30,118 @@ from app.auth import (
 from app.config import (
     settings,
 )
+from app.jobs import (
+    crud as jobs_crud,
+    schemas as jobs_schemas,
+)
 from app.nfts import (
     crud as nfts_crud,
+    metadata as nfts_metadata,
     schemas as nfts_schemas,
 )
 from app.utils import (
     dependencies,
     jwt,
+    pinning,
 )
 from app.wallets import (
+    models as wallets_models,
     schemas as wallets_schemas,
 )
 
 router = APIRouter(prefix="/api/v1")
-pinata = PinataPy(settings().PINATA_API_KEY, settings().PINATA_API_SECRET)
+
+
+async def queue_mint(
+    response: Response,
+    classic_address: str,
+    author_avatar: Optional[str],
+    image_url: str,
+    title: str,
+    price: str,
+    engine: AIOEngine,
+    pinning_client: pinning.PinataClient,
+) -> Dict[str, Any]:
+    """
+    Queue a job minting an nft with a sell offer, unless its image has
+    already been minted.
+    """
+    try:
+        meta_data = nfts_metadata.encode_metadata(
+            nfts_metadata.NFTKind.LISTING,
+            author_avatar=author_avatar,
+            image_url=image_url,
+            title=title,
+            price=price,
+        )
+    except nfts_metadata.MetadataTooLargeError as err:
+        response.status_code = 400
+        return {"status_code": 400, "message": str(err)}
+    if not await nfts_crud.claim_unique_mint(image_url, engine, pinning_client):
+        response.status_code = 409
+        return {"status_code": 409, "message": "This NFT has already been minted!"}
+    job = await jobs_crud.enqueue_job(
+        "mint",
+        classic_address,
+        {"meta_data": meta_data, "image_url": image_url},
+        engine,
+    )
+    return {
+        "status_code": 202,
+        "message": "The NFT will be minted shortly!",
+        "job_id": str(job.id),
+    }
 
 
 @router.post(
     "/nft/mint-offer",
     name="nft:mint-nft-with-offer",
-    response_model=auth_schemas.ResponseSchema,
+    status_code=202,
+    response_model=Union[jobs_schemas.JobAcceptedSchema, auth_schemas.ResponseSchema],
     responses={
-        200: {
+        202: {
+            "model": jobs_schemas.JobAcceptedSchema,
+            "description": "A response object that contains the id of the job"
+            " minting the nft.",
+        },
+        400: {
             "model": auth_schemas.ResponseSchema,
-            "description": "A response object that indicates an nft"
-            " has been minted successfully!",
+            "description": "A response object that indicates the nft"
+            " metadata is too large!",
+        },
+        409: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the nft"
+            " has already been minted!",
         },
     },
 )
 async def mint_nft_token_with_offer(
     nft_info: nfts_schemas.NFTObjectSchema,
+    response: Response,
     current_wallet: Any = Depends(jwt.get_current_active_wallet),
     session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    pinning_client: pinning.PinataClient = Depends(dependencies.get_pinning_client),
 ) -> Dict[str, Any]:
     """
     mint an nft token and create a sell offer.
     """
-    meta_data = f"{nft_info.picture},{nft_info.title},{nft_info.price}"
-    await nfts_crud.mint_nft_token(
-        current_wallet.classic_address, meta_data, session, True
+    # the authenticated wallet may be cached, the avatar is read from the
+    # database so a just uploaded one is used
+    wallet = await session.engine.find_one(
+        wallets_models.Wallet,
+        wallets_models.Wallet.classic_address == current_wallet.classic_address,
+    )
+    return await queue_mint(
+        response,
+        current_wallet.classic_address,
+        wallet.profile_picture if wallet is not None else None,
+        nft_info.picture,
+        nft_info.title,
+        nft_info.price,
+        session.engine,
+        pinning_client,
     )
-    return {"status_code": 200, "message": "NFT minted successfully!"}
 
 
 @router.post(
@@ -83,6 +155,15 @@ async def mint_nft_token_with_offer(
             "model": auth_schemas.ResponseSchema,
             "description": "A response object that indicates something went wrong!",
         },
+        413: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the image is too large!",
+        },
+        502: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the image"
+            " couldn't be pinned!",
+        },
         200: {
             "model": nfts_schemas.UploadImageResponseSchema,
             "description": "A response object that contains an ipfs url of the image.",
@@ -90,64 +171,238 @@ async def mint_nft_token_with_offer(
     },
 )
 async def upload_nft_image(
+    response: Response,
     file: UploadFile = File(...),
     current_wallet: wallets_schemas.WalletObjectSchema = Depends(
         jwt.get_current_active_wallet
     ),
+    pinning_client: pinning.PinataClient = Depends(dependencies.get_pinning_client),
 ) -> Dict[str, Any]:
     """
     Upload nft image to ipfs.
     """
     try:
-        file_bytes = file.file.read()
-        temp = NamedTemporaryFile(delete=False)
-        with temp as temp_file:
-            temp_file.write(file_bytes)
-        result = pinata.pin_file_to_ipfs(temp.name)
-        image_url = (
-            f"https://ipfs.io/ipfs/{result['IpfsHash']}/{temp.name.split('/')[-1]}"
-        )
-        return {"status_code": "200", "url": image_url}
+        image_url = await pinning_client.pin(lambda: pinning.iter_upload_file(file))
+        return {"status_code": 200, "url": image_url}
+    except pinning.UploadTooLargeError as err:
+        response.status_code = 413
+        return {"status_code": 413, "message": str(err)}
+    except (pinning.PinningError, httpx.HTTPError):
+        response.status_code = 502
+        return {"status_code": 502, "message": "The image couldn't be pinned!"}
     except Exception:
+        response.status_code = 400
         return {"status_code": 400, "message": "Something went wrong!"}
-    finally:
-        os.remove(temp.name)
 
 
 @router.post(
     "/nft/upload-mint-nft",
     name="nft:upload-mint-nft",
-    response_model=auth_schemas.ResponseSchema,
+    status_code=202,
+    response_model=Union[jobs_schemas.JobAcceptedSchema, auth_schemas.ResponseSchema],
     responses={
-        200: {
+        202: {
+            "model": jobs_schemas.JobAcceptedSchema,
+            "description": "A response object that contains the id of the job"
+            " minting the nft.",
+        },
+        400: {
             "model": auth_schemas.ResponseSchema,
-            "description": "A response object that indicates an nft"
-            " has been minted successfully!",
+            "description": "A response object that indicates the nft"
+            " metadata is too large!",
+        },
+        409: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the nft"
+            " has already been minted!",
+        },
+        413: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the image is too large!",
+        },
+        502: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the image"
+            " couldn't be pinned!",
         },
     },
 )
 async def upload_nft_image_and_mint_nft(
     nft_info: nfts_schemas.NFTBase64ObjectSchema,
+    response: Response,
     current_wallet: Any = Depends(jwt.get_current_active_wallet),
     session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    pinning_client: pinning.PinataClient = Depends(dependencies.get_pinning_client),
 ) -> Dict[str, Any]:
     """
     Upload a base64 encoded image to ipfs and mint it
     """
-    base64_bytes = nft_info.picture.encode("ascii")
-    file_bytes = base64.b64decode(base64_bytes)
-    temp = NamedTemporaryFile(delete=False)
-    with temp as temp_file:
-        temp_file.write(file_bytes)
-    result = pinata.pin_file_to_ipfs(temp.name)
-    image_url = f"https://ipfs.io/ipfs/{result['IpfsHash']}/{temp.name.split('/')[-1]}"
-    meta_data = (
-        f"{nft_info.author_avatar},{image_url},{nft_info.title},{nft_info.price}"
+    try:
+        image_url = await pinning_client.pin(
+            lambda: pinning.iter_base64(nft_info.picture)
+        )
+    except pinning.UploadTooLargeError as err:
+        response.status_code = 413
+        return {"status_code": 413, "message": str(err)}
+    except binascii.Error:
+        response.status_code = 400
+        return {"status_code": 400, "message": "Invalid base64 image!"}
+    except (pinning.PinningError, httpx.HTTPError):
+        response.status_code = 502
+        return {"status_code": 502, "message": "The image couldn't be pinned!"}
+    return await queue_mint(
+        response,
+        current_wallet.classic_address,
+        nft_info.author_avatar,
+        image_url,
+        nft_info.title,
+        nft_info.price,
+        session.engine,
+        pinning_client,
+    )
+
+
+@router.post(
+    "/nft/upload-mint-nft/binary",
+    name="nft:upload-mint-nft-binary",
+    status_code=202,
+    response_model=Union[jobs_schemas.JobAcceptedSchema, auth_schemas.ResponseSchema],
+    responses={
+        202: {
+            "model": jobs_schemas.JobAcceptedSchema,
+            "description": "A response object that contains the id of the job"
+            " minting the nft.",
+        },
+        400: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the nft"
+            " metadata is too large!",
+        },
+        409: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the nft"
+            " has already been minted!",
+        },
+        413: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the image is too large!",
+        },
+        502: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the image"
+            " couldn't be pinned!",
+        },
+    },
+)
+async def upload_nft_binary_image_and_mint_nft(
+    response: Response,
+    file: UploadFile = File(...),
+    author_avatar: str = Form(...),
+    title: str = Form(...),
+    price: str = Form(...),
+    current_wallet: Any = Depends(jwt.get_current_active_wallet),
+    session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    pinning_client: pinning.PinataClient = Depends(dependencies.get_pinning_client),
+) -> Dict[str, Any]:
+    """
+    Upload a multipart image to ipfs and mint it
+    """
+    try:
+        image_url = await pinning_client.pin(lambda: pinning.iter_upload_file(file))
+    except pinning.UploadTooLargeError as err:
+        response.status_code = 413
+        return {"status_code": 413, "message": str(err)}
+    except (pinning.PinningError, httpx.HTTPError):
+        response.status_code = 502
+        return {"status_code": 502, "message": "The image couldn't be pinned!"}
+    return await queue_mint(
+        response,
+        current_wallet.classic_address,
+        author_avatar,
+        image_url,
+        title,
+        price,
+        session.engine,
+        pinning_client,
     )
-    await nfts_crud.mint_nft_token(
-        current_wallet.classic_address, meta_data, session, True
+
+
+@router.post(
+    "/nft/mint-batch",
+    name="nft:mint-batch",
+    status_code=202,
+    response_model=Union[jobs_schemas.JobAcceptedSchema, auth_schemas.ResponseSchema],
+    responses={
+        202: {
+            "model": jobs_schemas.JobAcceptedSchema,
+            "description": "A response object that contains the id of the job"
+            " minting the nfts, and the items rejected as duplicates or"
+            " too large.",
+        },
+        409: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates every nft"
+            " has been rejected!",
+        },
+    },
+)
+async def mint_nft_batch(
+    nft_batch: nfts_schemas.NFTBatchSchema,
+    response: Response,
+    current_wallet: Any = Depends(jwt.get_current_active_wallet),
+    session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    pinning_client: pinning.PinataClient = Depends(dependencies.get_pinning_client),
+) -> Dict[str, Any]:
+    """
+    Mint a batch of nfts with their sell offers, follow the returned job id to
+    get the per-item results.
+    """
+    items = []
+    rejected = []
+    for index, item in enumerate(nft_batch.items):
+        try:
+            meta_data = nfts_metadata.encode_metadata(
+                nfts_metadata.NFTKind.LISTING,
+                author_avatar=nft_batch.author_avatar,
+                image_url=item.picture,
+                title=item.title,
+                price=item.price,
+            )
+        except nfts_metadata.MetadataTooLargeError:
+            rejected.append(
+                {"index": index, "image_url": item.picture, "status": "too_large"}
+            )
+            continue
+        if await nfts_crud.claim_unique_mint(
+            item.picture, session.engine, pinning_client
+        ):
+            items.append(
+                {
+                    "index": index,
+                    "image_url": item.picture,
+                    "meta_data": meta_data,
+                    "price": item.price,
+                }
+            )
+        else:
+            rejected.append(
+                {"index": index, "image_url": item.picture, "status": "duplicate"}
+            )
+    if not items:
+        response.status_code = 409
+        return {
+            "status_code": 409,
+            "message": "These NFTs have already been minted, or are too large!",
+        }
+    job = await jobs_crud.enqueue_job(
+        "mint_batch", current_wallet.classic_address, {"items": items}, session.engine
     )
-    return {"status_code": 200, "message": "NFT minted successfully!"}
+    return {
+        "status_code": 202,
+        "message": "The NFTs will be minted shortly!",
+        "job_id": str(job.id),
+        "rejected": rejected,
+    }
 
 
 @router.get(
@@ -163,12 +418,20 @@ async def upload_nft_image_and_mint_nft(
     },
 )
 async def fetch_all_nfts(
+    limit: int = Query(
+        settings().LISTING_PAGE_SIZE, ge=1, le=settings().LISTING_MAX_PAGE_SIZE
+    ),
+    cursor: Optional[str] = None,
     current_wallet: Any = Depends(jwt.get_current_active_wallet),
+    engine: AIOEngine = Depends(dependencies.get_db_read_engine),
 ) -> Dict[str, Any]:
     """
-    Fetch all nfts for the authenticated wallet.
+    Fetch a page of nfts for the authenticated wallet, pass the returned
+    next_cursor as the cursor query param to get the next page.
     """
-    results = await nfts_crud.get_all_nfts(current_wallet.classic_address)
+    results = await nfts_crud.get_all_nfts(
+        current_wallet.classic_address, engine, limit, cursor
+    )
     return results
 
 
@@ -185,10 +448,15 @@ async def fetch_all_nfts(
     },
 )
 async def fetch_all_wallets_nfts(
-    session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    limit: int = Query(
+        settings().LISTING_PAGE_SIZE, ge=1, le=settings().LISTING_MAX_PAGE_SIZE
+    ),
+    cursor: Optional[str] = None,
+    engine: AIOEngine = Depends(dependencies.get_db_read_engine),
 ) -> Dict[str, Any]:
     """
-    Fetch all nfts for all registered wallets
+    Fetch a page of nfts for all registered wallets, pass the returned
+    next_cursor as the cursor query param to get the next page.
     """
-    results = await nfts_crud.get_all_wallets_nfts(session)
+    results = await nfts_crud.get_all_wallets_nfts(engine, limit, cursor)
     return results
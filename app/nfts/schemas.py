@@ -11,6 +11,10 @@ from typing import (
     Optional,
 )
 
+from app.config import (
+    settings,
+)
+
 
 class NFTObjectSchema(BaseModel):
     """
@@ -33,6 +37,17 @@ class NFTBase64ObjectSchema(BaseModel):
     price: str = Field(..., example="Your NFT price in XRP.")
 
 
+class NFTBatchSchema(BaseModel):
+    """
+    A Pydantic class that defines the schema of a batch of nfts to mint.
+    """
+
+    author_avatar: str = Field(..., example="Owner profile picture.")
+    items: List[NFTObjectSchema] = Field(
+        ..., min_items=1, max_items=settings().MINT_BATCH_MAX_ITEMS
+    )
+
+
 class ResponseSchema(BaseModel):
     """
     A Pydantic class that defines the wallet schema for fetching wallet info.
@@ -42,6 +57,10 @@ class ResponseSchema(BaseModel):
     results: List[Optional[Dict[str, Any]]] = Field(
         ..., example="Owner profile picture."
     )
+    next_cursor: Optional[str] = Field(
+        None,
+        example="000800006203F49C21D5D6E022CB16DE3538F248662FC73C00000001",
+    )
 
 
 class UploadImageResponseSchema(BaseModel):
@@ -0,0 +1,10 @@
+"""
+profiling package.
+"""
+
+from app.profiling import (
+    router,
+    schemas,
+)
+
+__all__ = ["router", "schemas"]
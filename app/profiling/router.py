@@ -0,0 +1,87 @@
+"""The profiling router module"""
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+)
+import os
+from starlette.responses import (
+    PlainTextResponse,
+)
+from typing import (
+    Any,
+    Dict,
+)
+
+from app.profiling import (
+    schemas as profiling_schemas,
+)
+from app.utils import (
+    profiling,
+)
+
+router = APIRouter(
+    prefix="/api/v1/profiling",
+    dependencies=[Depends(profiling.verify_profiling_token)],
+)
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    name="profiling:get-profile",
+    response_class=PlainTextResponse,
+)
+async def fetch_profile(profile_id: str, request: Request) -> PlainTextResponse:
+    """
+    Fetch the collapsed stacks of a profiled request.
+    """
+    profile = await request.app.state.cache_backend.get(f"profile:{profile_id}")
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found!")
+    return PlainTextResponse(profile)
+
+
+@router.post(
+    "/tracemalloc/start",
+    name="profiling:start-tracemalloc",
+    response_model=profiling_schemas.TracingResponseSchema,
+)
+async def start_tracemalloc(frames: int = Query(1, ge=1, le=64)) -> Dict[str, Any]:
+    """
+    Start tracing the allocations of the worker process handling the request.
+    """
+    profiling.allocations.start(frames)
+    return {"pid": os.getpid(), "tracing": True}
+
+
+@router.post(
+    "/tracemalloc/stop",
+    name="profiling:stop-tracemalloc",
+    response_model=profiling_schemas.TracingResponseSchema,
+)
+async def stop_tracemalloc() -> Dict[str, Any]:
+    """
+    Stop tracing the allocations of the worker process handling the request.
+    """
+    profiling.allocations.stop()
+    return {"pid": os.getpid(), "tracing": False}
+
+
+@router.get(
+    "/tracemalloc/snapshot",
+    name="profiling:get-tracemalloc-snapshot",
+    response_model=profiling_schemas.SnapshotResponseSchema,
+)
+async def fetch_tracemalloc_snapshot(
+    limit: int = Query(20, ge=1, le=200)
+) -> Dict[str, Any]:
+    """
+    Take a snapshot of the allocations of the worker process handling the
+    request, and compare it with the previous one.
+    """
+    if not profiling.allocations.is_tracing():
+        raise HTTPException(status_code=409, detail="Tracemalloc isn't started!")
+    return profiling.allocations.snapshot(limit)
@@ -0,0 +1,45 @@
+"""The profiling schemas module"""
+
+from pydantic import (
+    BaseModel,
+    Field,
+)
+from typing import (
+    List,
+)
+
+
+class AllocationSchema(BaseModel):
+    """
+    A Pydantic class that defines the allocations of a source line.
+    """
+
+    location: str = Field(..., example="/app/app/nfts/crud.py:120")
+    line: str = Field(..., example="nfts.append(nft)")
+    size: int = Field(..., example=524288)
+    count: int = Field(..., example=1024)
+    size_diff: int = Field(..., example=65536)
+    count_diff: int = Field(..., example=128)
+
+
+class SnapshotResponseSchema(BaseModel):
+    """
+    A Pydantic class that defines the response schema of a tracemalloc
+    snapshot.
+    """
+
+    pid: int = Field(..., example=42)
+    current: int = Field(..., example=10485760)
+    peak: int = Field(..., example=20971520)
+    top: List[AllocationSchema]
+    diff: List[AllocationSchema]
+
+
+class TracingResponseSchema(BaseModel):
+    """
+    A Pydantic class that defines the response schema of the tracemalloc
+    state changes.
+    """
+
+    pid: int = Field(..., example=42)
+    tracing: bool = Field(..., example=True)
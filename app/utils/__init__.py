@@ -3,13 +3,45 @@ utils package.
 """
 
 from app.utils import (
+    cache,
+    cid,
     dependencies,
     engine,
+    etag,
+    fanout,
+    ipfs,
     jwt,
+    ledger,
+    loopmonitor,
+    metrics,
+    pinning,
+    profiling,
+    resp,
+    sequencer,
+    signing,
+    singleflight,
+    timing,
+    txmeta,
 )
 
 __all__ = [
+    "cache",
+    "cid",
     "dependencies",
     "engine",
+    "etag",
+    "fanout",
+    "ipfs",
     "jwt",
+    "ledger",
+    "loopmonitor",
+    "metrics",
+    "pinning",
+    "profiling",
+    "resp",
+    "sequencer",
+    "signing",
+    "singleflight",
+    "timing",
+    "txmeta",
 ]
@@ -0,0 +1,304 @@
+"""The utils cache module."""
+
+from collections import (
+    OrderedDict,
+)
+from fastapi import (
+    FastAPI,
+)
+import logging
+import time
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from app.config import (
+    settings,
+)
+from app.utils import (
+    metrics,
+    resp,
+)
+
+logger = logging.getLogger(__name__)
+
+ValueType = TypeVar("ValueType")
+
+
+class TTLCache(Generic[ValueType]):
+    """
+    A bounded in-process LRU cache whose entries expire at a given time.
+
+    Args:
+        max_size (int) : The max number of entries, the least recently used
+            entry is evicted first.
+        clock (Callable[[], float]) : The clock used for expiry times.
+    """
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.time) -> None:
+        self.max_size = max_size
+        self.clock = clock
+        self.entries: "OrderedDict[Hashable, Tuple[float, ValueType]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[ValueType]:
+        """
+        Get a cached value.
+
+        Args:
+            key (Hashable) : The entry key.
+
+        Returns:
+            Optional[ValueType]: The cached value, None if missing or expired.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: ValueType, expires_at: float) -> None:
+        """
+        Cache a value until a given time.
+
+        Args:
+            key (Hashable) : The entry key.
+            value (ValueType) : The value to cache.
+            expires_at (float) : The entry expiry time, as returned by the clock.
+        """
+        if self.max_size <= 0:
+            return
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove an entry.
+
+        Args:
+            key (Hashable) : The entry key.
+        """
+        self.entries.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Any], bool]) -> None:
+        """
+        Remove every entry whose value matches a predicate.
+
+        Args:
+            predicate (Callable[[Any], bool]) : A function called with each value.
+        """
+        for key in [
+            key for key, (_, value) in self.entries.items() if predicate(value)
+        ]:
+            del self.entries[key]
+
+    def clear(self) -> None:
+        """
+        Remove every entry.
+        """
+        self.entries.clear()
+
+
+class CacheBackend:
+    """
+    The interface of the caches shared by the request handlers.
+
+    Values are bytes, so any backend can store them, and the reads are
+    counted in the cache_requests_total metric.
+
+    Args:
+        name (str) : The backend name, the label of its metrics.
+        shared (bool) : True if the cache is shared by every server process.
+    """
+
+    def __init__(self, name: str, shared: bool) -> None:
+        self.name = name
+        self.shared = shared
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached value.
+
+        Args:
+            key (str) : The entry key.
+
+        Returns:
+            Optional[bytes]: The cached value, None if missing or expired.
+        """
+        value = await self._get(key)
+        metrics.CACHE_REQUESTS.labels(
+            self.name, "miss" if value is None else "hit"
+        ).inc()
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        Cache a value.
+
+        Args:
+            key (str) : The entry key.
+            value (bytes) : The value to cache.
+            ttl (Optional[float]) : The number of seconds the entry is kept,
+                forever if None.
+        """
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        """
+        Remove an entry.
+
+        Args:
+            key (str) : The entry key.
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """
+        Release the backend resources.
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    A cache backend private to the server process.
+
+    Args:
+        max_size (int) : The max number of entries.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        super().__init__("memory", shared=False)
+        self.entries: TTLCache[bytes] = TTLCache(max_size)
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else float("inf")
+        self.entries.set(key, value, expires_at)
+
+    async def delete(self, key: str) -> None:
+        self.entries.delete(key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    A cache backend shared by every server process, stored in a server
+    speaking the Redis protocol.
+
+    The cache is an optimization, so an unreachable server is counted as a
+    miss and an error, and logged instead of failing the request.
+
+    Args:
+        client (app.utils.resp.RESPClient) : A RESP client.
+        prefix (str) : The prefix of every key.
+    """
+
+    def __init__(self, client: resp.RESPClient, prefix: str) -> None:
+        super().__init__("redis", shared=True)
+        self.client = client
+        self.prefix = prefix
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.client.execute("GET", self.prefix + key)
+        except Exception as err:
+            metrics.CACHE_ERRORS.labels(self.name, "read").inc()
+            logger.warning("Cache read failed: %s", repr(err))
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        args: Tuple[Any, ...] = ("SET", self.prefix + key, value)
+        if ttl is not None:
+            args += ("PX", max(1, int(ttl * 1000)))
+        try:
+            await self.client.execute(*args)
+        except Exception as err:
+            metrics.CACHE_ERRORS.labels(self.name, "write").inc()
+            logger.warning("Cache write failed: %s", repr(err))
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.client.execute("DEL", self.prefix + key)
+        except Exception as err:
+            metrics.CACHE_ERRORS.labels(self.name, "delete").inc()
+            logger.warning("Cache delete failed: %s", repr(err))
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def create_cache_backend() -> CacheBackend:
+    """
+    Create the cache backend selected by the CACHE_BACKEND setting.
+
+    Raises:
+        ValueError: if the setting names an unknown backend.
+
+    Returns:
+        CacheBackend: A memory or redis cache backend.
+    """
+    app_settings = settings()
+
+    if app_settings.CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(app_settings.CACHE_MAX_ENTRIES)
+    if app_settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(
+            resp.RESPClient.from_url(
+                app_settings.REDIS_URL,
+                max_connections=app_settings.REDIS_POOL_SIZE,
+                timeout=app_settings.REDIS_TIMEOUT,
+            ),
+            app_settings.CACHE_KEY_PREFIX,
+        )
+    raise ValueError(f"Unknown cache backend: {app_settings.CACHE_BACKEND}")
+
+
+async def init_cache_backend(app: FastAPI) -> None:
+    """
+    Creates the cache backend.
+
+    This function creates the configured cache backend, and stores it
+    in the application's state property.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    app.state.cache_backend = create_cache_backend()
+
+
+async def close_cache_backend(app: FastAPI) -> None:
+    """
+    Closes the cache backend connections.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    cache_backend = getattr(app.state, "cache_backend", None)
+    if cache_backend is not None:
+        await cache_backend.close()
+
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "RedisCacheBackend",
+    "TTLCache",
+    "close_cache_backend",
+    "create_cache_backend",
+    "init_cache_backend",
+]
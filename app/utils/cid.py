@@ -0,0 +1,149 @@
+"""The utils cid module."""
+
+import hashlib
+from typing import (
+    AsyncIterator,
+    List,
+    Tuple,
+)
+
+# go-ipfs and Pinata defaults for a CIDv0 file import: fixed size chunks,
+# balanced dag-pb layout and UnixFS leaves
+CHUNK_SIZE = 262144
+MAX_LINKS = 174
+UNIXFS_FILE = 2
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def _varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _field(number: int, value: bytes) -> bytes:
+    return _varint(number << 3 | 2) + _varint(len(value)) + value
+
+
+def _uint_field(number: int, value: int) -> bytes:
+    return _varint(number << 3) + _varint(value)
+
+
+def _base58(data: bytes) -> str:
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = BASE58_ALPHABET[remainder] + encoded
+    padding = len(data) - len(data.lstrip(b"\0"))
+    return BASE58_ALPHABET[0] * padding + encoded
+
+
+def _unixfs_file(data: bytes, file_size: int, block_sizes: List[int]) -> bytes:
+    return (
+        _uint_field(1, UNIXFS_FILE)
+        + (_field(2, data) if data else b"")
+        + _uint_field(3, file_size)
+        + b"".join(_uint_field(4, block_size) for block_size in block_sizes)
+    )
+
+
+# a node is summarised as (multihash, cumulative dag size, file size)
+Node = Tuple[bytes, int, int]
+
+
+def _node(links: List[Node], unixfs: bytes) -> Node:
+    block = b"".join(
+        _field(
+            2,
+            _field(1, multihash) + _field(2, b"") + _uint_field(3, dag_size),
+        )
+        for multihash, dag_size, _ in links
+    ) + _field(1, unixfs)
+    multihash = b"\x12\x20" + hashlib.sha256(block).digest()
+    return (
+        multihash,
+        len(block) + sum(dag_size for _, dag_size, _ in links),
+        sum(file_size for _, _, file_size in links),
+    )
+
+
+def _leaf(chunk: bytes) -> Node:
+    multihash, dag_size, _ = _node([], _unixfs_file(chunk, len(chunk), []))
+    return multihash, dag_size, len(chunk)
+
+
+def _parent(children: List[Node]) -> Node:
+    file_size = sum(file_size for _, _, file_size in children)
+    multihash, dag_size, _ = _node(
+        children,
+        _unixfs_file(b"", file_size, [file_size for _, _, file_size in children]),
+    )
+    return multihash, dag_size, file_size
+
+
+class CIDBuilder:
+    """
+    Computes the CIDv0 that IPFS assigns to a file, chunk by chunk.
+
+    Only the hashes of the 256KiB leaves are kept in memory, so a file of
+    any size can be fed to the builder.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.leaves: List[Node] = []
+
+    def update(self, data: bytes) -> None:
+        """
+        Feed the next bytes of the file.
+
+        Args:
+            data (bytes) : The next bytes of the file.
+        """
+        self.buffer += data
+        while len(self.buffer) >= CHUNK_SIZE:
+            self.leaves.append(_leaf(bytes(self.buffer[:CHUNK_SIZE])))
+            del self.buffer[:CHUNK_SIZE]
+
+    def cid(self) -> str:
+        """
+        Compute the CID of the bytes fed so far.
+
+        Returns:
+            str: The base58 encoded CIDv0.
+        """
+        nodes = list(self.leaves)
+        if self.buffer or not nodes:
+            nodes.append(_leaf(bytes(self.buffer)))
+        while len(nodes) > 1:
+            nodes = [
+                _parent(nodes[start : start + MAX_LINKS])  # noqa: E203
+                for start in range(0, len(nodes), MAX_LINKS)
+            ]
+        return _base58(nodes[0][0])
+
+
+async def compute_cid(chunks: AsyncIterator[bytes]) -> str:
+    """
+    Compute the CIDv0 of a streamed file.
+
+    Args:
+        chunks (AsyncIterator[bytes]) : The file content chunks.
+
+    Returns:
+        str: The base58 encoded CIDv0.
+    """
+    builder = CIDBuilder()
+    async for chunk in chunks:
+        builder.update(chunk)
+    return builder.cid()
+
+
+__all__ = [
+    "CIDBuilder",
+    "compute_cid",
+]
@@ -1,5 +1,8 @@
 """The utils dependencies module."""
 
+from odmantic import (
+    AIOEngine,
+)
 from odmantic.session import (
     AIOSession,
 )
@@ -9,6 +12,14 @@ from starlette.requests import (
 from typing import (
     AsyncGenerator,
 )
+from xrpl.asyncio.clients import (
+    AsyncJsonRpcClient,
+)
+
+from app.utils import (
+    ipfs,
+    pinning,
+)
 
 
 async def get_db_transactional_session(
@@ -28,3 +39,52 @@ async def get_db_transactional_session(
         yield session
     finally:
         await session.end()
+
+
+def get_db_read_engine(request: Request) -> AIOEngine:
+    """
+    Get the read-only engine, for routes that never write.
+
+    Args:
+        request (starlette.requests.Request): current request.
+    Returns:
+        odmantic.AIOEngine: an engine that reads with the configured read
+            preference and read concern.
+    """
+    return request.app.state.read_engine
+
+
+def get_ledger_client(request: Request) -> AsyncJsonRpcClient:
+    """
+    Get the application-scoped pooled ledger client.
+
+    Args:
+        request (starlette.requests.Request): current request.
+    Returns:
+        xrpl.asyncio.clients.AsyncJsonRpcClient: a ledger client.
+    """
+    return request.app.state.ledger_client
+
+
+def get_ipfs_fetcher(request: Request) -> ipfs.IPFSFetcher:
+    """
+    Get the application-scoped IPFS metadata fetcher.
+
+    Args:
+        request (starlette.requests.Request): current request.
+    Returns:
+        app.utils.ipfs.IPFSFetcher: an IPFS metadata fetcher.
+    """
+    return request.app.state.ipfs_fetcher
+
+
+def get_pinning_client(request: Request) -> pinning.PinataClient:
+    """
+    Get the application-scoped Pinata client.
+
+    Args:
+        request (starlette.requests.Request): current request.
+    Returns:
+        app.utils.pinning.PinataClient: a streaming Pinata client.
+    """
+    return request.app.state.pinning_client
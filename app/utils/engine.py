@@ -9,10 +9,20 @@ from motor.motor_asyncio import (
 from odmantic import (
     AIOEngine,
 )
+from pymongo.read_concern import (
+    ReadConcern,
+)
+from pymongo.read_preferences import (
+    make_read_preference,
+    read_pref_mode_from_name,
+)
 
 from app.config import (
     settings,
 )
+from app.utils import (
+    metrics,
+)
 
 
 async def init_engine_app(app: FastAPI) -> None:
@@ -20,17 +30,33 @@ async def init_engine_app(app: FastAPI) -> None:
     Creates database and connections to the database.
 
     This function creates a mongodb client instance,
-    and an odmantic engine and stores them in the
-    application's state property.
+    an odmantic engine and a read-only odmantic engine
+    and stores them in the application's state property.
 
     Args:
         app (fastapi.FastAPI): fastAPI application.
     """
     app_settings = settings()
 
-    client = AsyncIOMotorClient(app_settings.db_url, maxPoolSize=30, minPoolSize=30)
+    client = AsyncIOMotorClient(
+        app_settings.db_url,
+        maxPoolSize=30,
+        minPoolSize=30,
+        event_listeners=[metrics.MongoCommandListener()],
+    )
     database = client.get_default_database()
     assert database.name == app_settings.MONGODB_DATABASE
     engine = AIOEngine(client=client, database="xrpl")
+    # a read-only engine that applies the configured read preference and
+    # read concern, used by the GET routes without any session overhead
+    read_engine = AIOEngine(client=client, database="xrpl")
+    read_engine.database = client.get_database(
+        "xrpl",
+        read_preference=make_read_preference(
+            read_pref_mode_from_name(app_settings.MONGODB_READ_PREFERENCE), None
+        ),
+        read_concern=ReadConcern(app_settings.MONGODB_READ_CONCERN),
+    )
     app.state.client = client
     app.state.engine = engine
+    app.state.read_engine = read_engine
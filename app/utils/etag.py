@@ -0,0 +1,386 @@
+"""The utils etag module."""
+
+import asyncio
+import hashlib
+import json
+import logging
+from starlette.datastructures import (
+    Headers,
+)
+from starlette.types import (
+    ASGIApp,
+    Message,
+    Receive,
+    Scope,
+    Send,
+)
+from typing import (
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from app.config import (
+    settings,
+)
+from app.utils import (
+    cache,
+)
+
+logger = logging.getLogger(__name__)
+
+# headers set by the middleware on every cached response
+OWN_HEADERS = (b"content-length", b"etag", b"cache-control", b"vary")
+
+
+class CachedResponse(NamedTuple):
+    """
+    A cached response and its validator.
+
+    Args:
+        ledger_index (int) : The validated ledger index it was built at.
+        etag (str) : The response ETag.
+        digest (str) : The hash of the response body.
+        headers (List[Tuple[bytes, bytes]]) : The response headers.
+        body (bytes) : The response body.
+    """
+
+    ledger_index: int
+    etag: str
+    digest: str
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the response for a cache backend.
+
+        Returns:
+            bytes: The JSON encoded validator and headers, a newline, then
+                the body.
+        """
+        header = {
+            "ledger_index": self.ledger_index,
+            "etag": self.etag,
+            "digest": self.digest,
+            "headers": [
+                [name.decode("latin-1"), value.decode("latin-1")]
+                for name, value in self.headers
+            ],
+        }
+        return json.dumps(header).encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        """
+        Deserialize a response read from a cache backend.
+
+        Args:
+            data (bytes) : A response serialized by to_bytes.
+
+        Returns:
+            CachedResponse: The cached response.
+        """
+        header, body = data.split(b"\n", 1)
+        fields = json.loads(header)
+        return cls(
+            fields["ledger_index"],
+            fields["etag"],
+            fields["digest"],
+            [
+                (name.encode("latin-1"), value.encode("latin-1"))
+                for name, value in fields["headers"]
+            ],
+            body,
+        )
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check whether an If-None-Match header matches an ETag.
+
+    Args:
+        if_none_match (Optional[str]) : The If-None-Match request header.
+        etag (str) : The current ETag of the resource.
+
+    Returns:
+        bool: True if the client copy is still current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return _opaque_tag(etag) in {_opaque_tag(tag) for tag in if_none_match.split(",")}
+
+
+class ConditionalGetMiddleware:
+    """
+    An ASGI middleware that tags the responses of polled GET endpoints with
+    an ETag, and answers If-None-Match without building them again.
+
+    Responses are cached in the application cache backend, per url and
+    Authorization header, along with the validated ledger index they were
+    built at, so replicas sharing a backend share the responses. While the ledger hasn't moved
+    the cached response is served as is. Once it has, the cached response is
+    still served, for up to stale_ttl seconds after it was built, while a
+    single background request rebuilds it. The ETag of a rebuilt response
+    only changes with its body, so clients keep getting 304 across ledgers
+    that didn't change it.
+
+    Without a cache backend or a validated ledger index, requests go
+    through uncached.
+
+    Cached responses skip the route dependencies, so the requests of the
+    authenticated paths are checked with authorize first. The ones it rejects
+    go through uncached, for the route to answer the error, and evict the
+    response cached for their Authorization header.
+
+    Args:
+        app (starlette.types.ASGIApp) : The wrapped ASGI application.
+        paths (Iterable[str]) : The paths of the cached GET endpoints.
+        stale_ttl (Optional[float]) : The number of seconds a response is
+            cached, defaults to the ETAG_STALE_TTL setting.
+        authenticated_paths (Iterable[str]) : The cached paths requiring an
+            authorized request.
+        authorize (Optional[Callable[[Scope], Awaitable[bool]]]) : Checks
+            the requests of the authenticated paths, required with them.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: Iterable[str],
+        stale_ttl: Optional[float] = None,
+        authenticated_paths: Iterable[str] = (),
+        authorize: Optional[Callable[[Scope], Awaitable[bool]]] = None,
+    ) -> None:
+        self.app = app
+        self.authenticated_paths = frozenset(authenticated_paths)
+        if self.authenticated_paths and authorize is None:
+            raise ValueError("The authenticated paths require authorize!")
+        self.authorize = authorize
+        self.paths = frozenset(paths) | self.authenticated_paths
+        self.stale_ttl = (
+            stale_ttl if stale_ttl is not None else settings().ETAG_STALE_TTL
+        )
+        self.refreshing: Set[str] = set()
+        self.tasks: Set["asyncio.Task[None]"] = set()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        state = scope["app"].state
+        responses = getattr(state, "cache_backend", None)
+        watcher = getattr(state, "ledger_watcher", None)
+        ledger_index = watcher.validated_index if watcher is not None else None
+        if responses is None or ledger_index is None:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = self.cache_key(scope["path"], scope["query_string"], headers)
+        if (
+            scope["path"] in self.authenticated_paths
+            and self.authorize is not None
+            and not await self.authorize(scope)
+        ):
+            await responses.delete(key)
+            await self.app(scope, receive, send)
+            return
+        data = await responses.get(key)
+        cached = CachedResponse.from_bytes(data) if data is not None else None
+        if cached is None:
+            messages = await self.capture(scope, receive)
+            cached = await self.store(responses, key, ledger_index, messages, None)
+            if cached is None:
+                for message in messages:
+                    await send(message)
+                return
+        elif cached.ledger_index < ledger_index and key not in self.refreshing:
+            self.refresh(scope, responses, key, ledger_index, cached)
+        await self.send_cached(cached, headers.get("if-none-match"), send)
+
+    @staticmethod
+    def cache_key(path: str, query_string: bytes, headers: Headers) -> str:
+        """
+        Build the cache key of a request.
+
+        Args:
+            path (str) : The request path.
+            query_string (bytes) : The request query string.
+            headers (starlette.datastructures.Headers) : The request headers.
+
+        Returns:
+            str: The cache key, the Authorization header is hashed so tokens
+                are never stored.
+        """
+        authorization = hashlib.sha256(
+            headers.get("authorization", "").encode()
+        ).hexdigest()
+        return f"etag:{path}?{query_string.decode('latin-1')}:{authorization}"
+
+    async def capture(self, scope: Scope, receive: Receive) -> List[Message]:
+        """
+        Run a request and capture its response.
+
+        Args:
+            scope (starlette.types.Scope) : The request scope.
+            receive (starlette.types.Receive) : The request receive channel.
+
+        Returns:
+            List[starlette.types.Message]: The response messages.
+        """
+        messages: List[Message] = []
+
+        async def send(message: Message) -> None:
+            messages.append(message)
+
+        await self.app(dict(scope), receive, send)
+        return messages
+
+    async def store(
+        self,
+        responses: cache.CacheBackend,
+        key: str,
+        ledger_index: int,
+        messages: List[Message],
+        previous: Optional[CachedResponse],
+    ) -> Optional[CachedResponse]:
+        """
+        Cache a successful response.
+
+        Args:
+            responses (app.utils.cache.CacheBackend) : The cache backend.
+            key (str) : The cache key of the request.
+            ledger_index (int) : The validated ledger index it was built at.
+            messages (List[starlette.types.Message]) : The response messages.
+            previous (Optional[CachedResponse]) : The response it replaces.
+
+        Returns:
+            Optional[CachedResponse]: The cached response, None if the
+                response isn't a 200.
+        """
+        start = messages[0]
+        if start["status"] != 200:
+            return None
+        body = b"".join(
+            message.get("body", b"")
+            for message in messages
+            if message["type"] == "http.response.body"
+        )
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        if previous is not None and previous.digest == digest:
+            etag = previous.etag
+        else:
+            etag = f'"{ledger_index}-{digest}"'
+        cached = CachedResponse(
+            ledger_index,
+            etag,
+            digest,
+            [
+                (name, value)
+                for name, value in start.get("headers", [])
+                if name.lower() not in OWN_HEADERS
+            ],
+            body,
+        )
+        await responses.set(key, cached.to_bytes(), self.stale_ttl)
+        return cached
+
+    def refresh(
+        self,
+        scope: Scope,
+        responses: cache.CacheBackend,
+        key: str,
+        ledger_index: int,
+        previous: CachedResponse,
+    ) -> None:
+        """
+        Rebuild a stale response in the background.
+
+        Args:
+            scope (starlette.types.Scope) : The request scope.
+            responses (app.utils.cache.CacheBackend) : The cache backend.
+            key (str) : The cache key of the request.
+            ledger_index (int) : The current validated ledger index.
+            previous (CachedResponse) : The stale response.
+        """
+        replayed = False
+
+        async def receive() -> Message:
+            nonlocal replayed
+            if replayed:
+                return {"type": "http.disconnect"}
+            replayed = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def rebuild() -> None:
+            try:
+                cached = await self.store(
+                    responses,
+                    key,
+                    ledger_index,
+                    await self.capture(scope, receive),
+                    previous,
+                )
+                if cached is None:
+                    # not served stale, the next request rebuilds it
+                    await responses.delete(key)
+            except Exception as err:
+                logger.warning("Response refresh failed: %s", repr(err))
+            finally:
+                self.refreshing.discard(key)
+
+        self.refreshing.add(key)
+        task = asyncio.get_event_loop().create_task(rebuild())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def send_cached(
+        self, cached: CachedResponse, if_none_match: Optional[str], send: Send
+    ) -> None:
+        """
+        Send a cached response, or a 304 if the client copy is current.
+
+        Args:
+            cached (CachedResponse) : The cached response.
+            if_none_match (Optional[str]) : The If-None-Match request header.
+            send (starlette.types.Send) : The response send channel.
+        """
+        headers = [
+            (b"etag", cached.etag.encode()),
+            (b"cache-control", b"no-cache"),
+            (b"vary", b"Authorization"),
+        ]
+        if etag_matches(if_none_match, cached.etag):
+            await send(
+                {"type": "http.response.start", "status": 304, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers.extend(cached.headers)
+        headers.append((b"content-length", str(len(cached.body)).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": cached.body})
+
+
+__all__ = [
+    "CachedResponse",
+    "ConditionalGetMiddleware",
+    "etag_matches",
+]
@@ -0,0 +1,100 @@
+"""The utils fanout module."""
+
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+from app.config import (
+    settings,
+)
+
+ItemType = TypeVar("ItemType")
+ResultType = TypeVar("ResultType")
+
+
+class FanOutResult(NamedTuple):
+    """
+    The outcome of a single fanned out call.
+
+    Args:
+        item (Any) : The input item the call was made for.
+        value (Any) : The call result, None if it failed.
+        error (Optional[BaseException]) : The raised exception, None on success.
+    """
+
+    item: Any
+    value: Any
+    error: Optional[BaseException]
+
+
+async def fan_out(
+    items: Iterable[ItemType],
+    worker: Callable[[ItemType], Awaitable[ResultType]],
+    concurrency: Optional[int] = None,
+) -> List[FanOutResult]:
+    """
+    Run a worker coroutine for every item with a bounded concurrency.
+
+    The results are returned in the same order as the input items, and a
+    failing item is reported through its result error instead of failing
+    the whole batch.
+
+    Args:
+        items (Iterable[ItemType]) : The items to process.
+        worker (Callable) : An async callable invoked once per item.
+        concurrency (Optional[int]) : The maximum number of in-flight calls,
+            defaults to the LEDGER_CONCURRENCY setting.
+
+    Returns:
+        List[FanOutResult]: A list of per-item results, in input order.
+    """
+    limit = max(1, concurrency or settings().LEDGER_CONCURRENCY)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item: ItemType) -> FanOutResult:
+        async with semaphore:
+            try:
+                return FanOutResult(item, await worker(item), None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                return FanOutResult(item, None, err)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+def failures(results: List[FanOutResult], key: str) -> List[Dict[str, str]]:
+    """
+    Build a serializable list of the failed items of a fan out.
+
+    Args:
+        results (List[FanOutResult]) : The fan out results.
+        key (str) : The item attribute used to identify a failed item.
+
+    Returns:
+        List[Dict[str, str]]: A list of dicts that describe every failure.
+    """
+    return [
+        {
+            key: str(getattr(result.item, key, result.item)),
+            "message": repr(result.error),
+        }
+        for result in results
+        if result.error is not None
+    ]
+
+
+__all__ = [
+    "FanOutResult",
+    "failures",
+    "fan_out",
+]
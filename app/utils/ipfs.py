@@ -0,0 +1,258 @@
+"""The utils ipfs module."""
+
+import asyncio
+from collections import (
+    OrderedDict,
+)
+from fastapi import (
+    FastAPI,
+)
+import hashlib
+import httpx
+import os
+import re
+from typing import (
+    Optional,
+    Tuple,
+)
+
+from app.config import (
+    settings,
+)
+from app.utils import (
+    cache,
+    metrics,
+    singleflight,
+)
+
+IPFS_PATH_REGEX = re.compile(r"/ipfs/(?P<cid>[A-Za-z0-9]+)(?P<path>/[^?#]*)?")
+
+
+def parse_ipfs_url(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Extract the content identifier and the path of an IPFS gateway url.
+
+    Args:
+        url (str) : An IPFS gateway url, e.g. https://ipfs.io/ipfs/<CID>/file.
+
+    Returns:
+        Optional[Tuple[str, str]]: The (CID, path) pair, None if the url is
+            not an IPFS url.
+    """
+    if not url.startswith(("http://", "https://")):
+        return None
+    match = IPFS_PATH_REGEX.search(url)
+    if not match:
+        return None
+    return match.group("cid"), (match.group("path") or "").strip("/")
+
+
+class MetadataCache:
+    """
+    A tiered cache for immutable IPFS content.
+
+    The first tier is an in-memory LRU bounded by a bytes budget, the second
+    one is an optional cache backend shared by every replica, and the last
+    one is an optional directory on disk. IPFS content never changes for a
+    given CID, so entries never expire.
+
+    Args:
+        max_bytes (int) : The in-memory tier bytes budget.
+        directory (Optional[str]) : The on-disk tier directory, disabled if None.
+        shared (Optional[app.utils.cache.CacheBackend]) : The shared tier,
+            disabled if None.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        directory: Optional[str] = None,
+        shared: Optional[cache.CacheBackend] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.shared = shared
+        self.size = 0
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(
+            self.directory or "", hashlib.sha256(key.encode()).hexdigest()
+        )
+
+    def _remember(self, key: str, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        self.entries[key] = content
+        self.size += len(content)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached content.
+
+        Args:
+            key (str) : The content key.
+
+        Returns:
+            Optional[bytes]: The cached content, None on a cache miss.
+        """
+        content = self.entries.get(key)
+        if content is not None:
+            self.entries.move_to_end(key)
+            return content
+        if self.shared is not None:
+            content = await self.shared.get(f"ipfs:{key}")
+            if content is not None:
+                self._remember(key, content)
+                return content
+        if not self.directory:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        content = await asyncio.to_thread(_read_file, path)
+        self._remember(key, content)
+        return content
+
+    async def set(self, key: str, content: bytes) -> None:
+        """
+        Store a content in every cache tier.
+
+        Args:
+            key (str) : The content key.
+            content (bytes) : The content to cache.
+        """
+        self._remember(key, content)
+        if self.shared is not None:
+            await self.shared.set(f"ipfs:{key}", content)
+        if self.directory:
+            await asyncio.to_thread(_write_file, self._disk_path(key), content)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def _write_file(path: str, content: bytes) -> None:
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(content)
+    os.replace(temp_path, path)
+
+
+class IPFSFetcher:
+    """
+    A non-blocking IPFS metadata fetcher backed by a content-addressed cache.
+
+    Concurrent fetches of the same file share a single download.
+
+    Args:
+        http_client (httpx.AsyncClient) : The HTTP client used for fetching.
+        cache (MetadataCache) : The cache of resolved IPFS contents.
+    """
+
+    def __init__(self, http_client: httpx.AsyncClient, cache: MetadataCache) -> None:
+        self.http_client = http_client
+        self.cache = cache
+        self.single_flight = singleflight.SingleFlight()
+
+    async def fetch(self, url: str) -> bytes:
+        """
+        Fetch a file content, IPFS contents are only downloaded once.
+
+        Args:
+            url (str) : The file url.
+
+        Raises:
+            httpx.HTTPError: if the file could not be downloaded.
+
+        Returns:
+            bytes: The file content.
+        """
+        ipfs_path = parse_ipfs_url(url)
+        if ipfs_path is None:
+            return await self.single_flight.do(url, lambda: self._download(url))
+        key = "/".join(ipfs_path)
+        content = await self.cache.get(key)
+        if content is None:
+            content = await self.single_flight.do(key, lambda: self._download(url, key))
+        return content
+
+    async def _download(self, url: str, key: Optional[str] = None) -> bytes:
+        with metrics.track_dependency("ipfs", "fetch"):
+            response = await self.http_client.get(url)
+            response.raise_for_status()
+        if key is not None:
+            await self.cache.set(key, response.content)
+        return response.content
+
+    async def fetch_text(self, url: str) -> str:
+        """
+        Fetch a file content as a text.
+
+        Args:
+            url (str) : The file url.
+
+        Returns:
+            str: The decoded file content.
+        """
+        return (await self.fetch(url)).decode("utf-8", errors="replace")
+
+    async def close(self) -> None:
+        """
+        Close the underlying HTTP client.
+        """
+        await self.http_client.aclose()
+
+
+async def init_ipfs_fetcher(app: FastAPI) -> None:
+    """
+    Creates the IPFS metadata fetcher.
+
+    This function creates an IPFS fetcher and its cache, backed by the
+    application cache backend when it is shared, and stores it in the
+    application's state property.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    app_settings = settings()
+    cache_backend = app.state.cache_backend
+
+    app.state.ipfs_fetcher = IPFSFetcher(
+        httpx.AsyncClient(timeout=app_settings.IPFS_TIMEOUT),
+        MetadataCache(
+            app_settings.IPFS_CACHE_MAX_BYTES,
+            app_settings.IPFS_CACHE_DIR or None,
+            cache_backend if cache_backend.shared else None,
+        ),
+    )
+
+
+async def close_ipfs_fetcher(app: FastAPI) -> None:
+    """
+    Closes the IPFS metadata fetcher connections.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    ipfs_fetcher = getattr(app.state, "ipfs_fetcher", None)
+    if ipfs_fetcher is not None:
+        await ipfs_fetcher.close()
+
+
+__all__ = [
+    "IPFSFetcher",
+    "MetadataCache",
+    "close_ipfs_fetcher",
+    "init_ipfs_fetcher",
+    "parse_ipfs_url",
+]
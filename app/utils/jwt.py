@@ -12,16 +12,26 @@ from fastapi import (
 from fastapi.security import (
     OAuth2PasswordBearer,
 )
+from fastapi.security.utils import (
+    get_authorization_scheme_param,
+)
 import jwt
 from jwt import (
     PyJWTError,
 )
-from odmantic.session import (
-    AIOSession,
+from odmantic import (
+    AIOEngine,
 )
 from pydantic import (
     ValidationError,
 )
+from starlette.datastructures import (
+    Headers,
+)
+from starlette.types import (
+    Scope,
+)
+import time
 from typing import (
     Any,
     Dict,
@@ -37,6 +47,7 @@ from app.config import (
     settings,
 )
 from app.utils import (
+    cache,
     dependencies,
 )
 
@@ -45,6 +56,9 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", scheme_name=
 JWT_SECRET_KEY = settings().JWT_SECRET_KEY
 JWT_ALGORITHM = "HS256"
 
+# verified tokens, mapped to a snapshot of their wallet
+verified_tokens: cache.TTLCache[Any] = cache.TTLCache(settings().AUTH_CACHE_SIZE)
+
 
 def get_token_wallet(token: str = Depends(oauth2_scheme)) -> str:
     """
@@ -88,13 +102,14 @@ async def create_access_token(
 
 async def get_current_wallet(
     token: str = Depends(oauth2_scheme),
-    session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    engine: AIOEngine = Depends(dependencies.get_db_read_engine),
 ) -> Optional[Dict[str, Any]]:
     """
-    This function is used to get the current wallet.
+    This function is used to get the current wallet, verified tokens are
+    cached until the earlier of their expiry or AUTH_CACHE_TTL seconds.
     Args:
         token (str, optional): The token of the wallet. Defaults to None.
-        session (odmantic.session.AIOSession): A MongoDB transactional session.
+        engine (odmantic.AIOEngine): A MongoDB read-only engine.
     Raises:
         credentials_exception: If the token is invalid.
         credentials_exception: If the token is expired.
@@ -108,6 +123,9 @@ async def get_current_wallet(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    cached_wallet = verified_tokens.get(token)
+    if cached_wallet is not None:
+        return cached_wallet.copy()
     try:
         payload = jwt.decode(
             token,
@@ -119,9 +137,7 @@ async def get_current_wallet(
         if not classic_address:
             raise credentials_exception
         token_data = auth_schemas.TokenData(classic_address=classic_address)
-        wallet = await auth_crud.find_existed_wallet(
-            token_data.classic_address, session
-        )
+        wallet = await auth_crud.find_existed_wallet(token_data.classic_address, engine)
         if not wallet:
             raise credentials_exception
         # check token expiration
@@ -129,11 +145,27 @@ async def get_current_wallet(
             raise credentials_exception
         if datetime.utcnow() > datetime.utcfromtimestamp(expires):
             raise credentials_exception
+        verified_tokens.set(
+            token, wallet.copy(), min(expires, time.time() + settings().AUTH_CACHE_TTL)
+        )
         return wallet
     except (PyJWTError, ValidationError):
         raise credentials_exception
 
 
+def invalidate_wallet(classic_address: str) -> None:
+    """
+    Drop the cached tokens of a wallet, it must be called whenever the wallet
+    status changes.
+
+    Args:
+        classic_address (str): The wallet classic address.
+    """
+    verified_tokens.delete_where(
+        lambda wallet: wallet.classic_address == classic_address
+    )
+
+
 def get_current_active_wallet(
     current_wallet: Any = Depends(get_current_wallet),
 ) -> Union[Any, HTTPException]:
@@ -149,3 +181,28 @@ def get_current_active_wallet(
     if current_wallet.wallet_status == 0:
         raise HTTPException(status_code=400, detail="Inactive Wallet!")
     return current_wallet
+
+
+async def authorize_request(scope: Scope) -> bool:
+    """
+    Check the Authorization header of a request the way the
+    get_current_active_wallet dependency does, for the middlewares answering
+    authenticated routes without running them.
+
+    Args:
+        scope (starlette.types.Scope): The request scope.
+    Returns:
+        bool: True if the request holds the token of an active wallet.
+    """
+    scheme, token = get_authorization_scheme_param(
+        Headers(scope=scope).get("authorization")
+    )
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        get_current_active_wallet(
+            await get_current_wallet(token, scope["app"].state.read_engine)
+        )
+    except HTTPException:
+        return False
+    return True
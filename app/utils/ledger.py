@@ -0,0 +1,343 @@
+"""The utils ledger module."""
+
+import asyncio
+from dataclasses import (
+    dataclass,
+)
+from fastapi import (
+    FastAPI,
+)
+import httpx
+import json
+import logging
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    List,
+    Optional,
+    Union,
+)
+from xrpl.asyncio.clients import (
+    AsyncJsonRpcClient,
+    XRPLRequestFailureException,
+)
+from xrpl.asyncio.clients.utils import (
+    json_to_response,
+    request_to_json_rpc,
+)
+from xrpl.asyncio.ledger import (
+    get_latest_validated_ledger_sequence,
+)
+from xrpl.models.requests import (
+    AccountNFTs,
+)
+from xrpl.models.requests.request import (
+    Request,
+)
+from xrpl.models.response import (
+    Response,
+)
+from xrpl.models.utils import (
+    require_kwargs_on_init,
+)
+
+from app.config import (
+    settings,
+)
+from app.utils import (
+    metrics,
+    singleflight,
+)
+
+logger = logging.getLogger(__name__)
+
+# read-only methods, identical concurrent calls are sent once
+COALESCED_METHODS = frozenset(
+    {
+        "account_info",
+        "account_lines",
+        "account_nfts",
+        "account_objects",
+        "fee",
+        "ledger",
+        "nft_buy_offers",
+        "nft_sell_offers",
+        "server_info",
+        "server_state",
+        "tx",
+    }
+)
+
+
+class PooledJsonRpcClient(AsyncJsonRpcClient):
+    """
+    A JSON RPC ledger client that reuses a pool of keep-alive connections.
+
+    The stock AsyncJsonRpcClient opens a new HTTP client, and therefore new
+    connections and TLS handshakes, for every single request.
+
+    Identical concurrent read requests, same method and params, including
+    the ledger they target, share a single in-flight request. Their callers
+    get the same response object, which must not be mutated. The requests
+    that don't pin a ledger read the current one, so with a ledger watcher
+    they are only shared while the validated ledger index is unchanged.
+
+    Args:
+        AsyncJsonRpcClient (xrpl.asyncio.clients.AsyncJsonRpcClient): xrpl-py
+            async JSON RPC client.
+    """
+
+    def __init__(self, url: str, http_client: httpx.AsyncClient) -> None:
+        super().__init__(url)
+        self.http_client = http_client
+        self.single_flight = singleflight.SingleFlight()
+        self.watcher: Optional["LedgerWatcher"] = None
+
+    async def request_impl(self, request: Request) -> Response:
+        """
+        Send a request through the pooled HTTP client.
+
+        Args:
+            request (xrpl.models.requests.request.Request): a rippled request.
+
+        Raises:
+            XRPLRequestFailureException: if the response can't be JSON decoded.
+
+        Returns:
+            xrpl.models.response.Response: The response from the server.
+        """
+        json_rpc = request_to_json_rpc(request)
+        if json_rpc["method"] not in COALESCED_METHODS:
+            return await self._post(json_rpc)
+        key = (
+            json_rpc["method"],
+            json.dumps(json_rpc["params"], sort_keys=True),
+            self.watcher.validated_index if self.watcher is not None else None,
+        )
+        return await self.single_flight.do(key, lambda: self._post(json_rpc))
+
+    async def _post(self, json_rpc: Dict[str, Any]) -> Response:
+        with metrics.track_dependency("ledger", json_rpc["method"]):
+            response = await self.http_client.post(self.url, json=json_rpc)
+        try:
+            return json_to_response(response.json())
+        except json.JSONDecodeError:
+            raise XRPLRequestFailureException(
+                {
+                    "error": response.status_code,
+                    "error_message": response.text,
+                }
+            )
+
+    async def close(self) -> None:
+        """
+        Close every pooled connection.
+        """
+        await self.http_client.aclose()
+
+
+@require_kwargs_on_init
+@dataclass(frozen=True)
+class LedgerAccountNFTs(AccountNFTs):
+    """
+    An AccountNFTs request read from a given ledger, the xrpl-py model
+    doesn't have the ledger_index field.
+    """
+
+    ledger_index: Optional[Union[str, int]] = None
+
+
+async def iter_account_nfts(
+    classic_address: str,
+    client: AsyncJsonRpcClient,
+    limit: Optional[int] = None,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Iterate over every NFT of an account, following the AccountNFTs markers.
+
+    Pages are only requested when the previous one has been consumed, so a
+    caller that stops early never downloads the remaining pages. The first
+    page is read from the latest validated ledger and the next ones from the
+    same ledger, so the markers stay valid and no token is skipped or seen
+    twice when ledgers close during the iteration.
+
+    Args:
+        classic_address (str) : A wallet classic address.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : ledger client.
+        limit (Optional[int]) : The page size, defaults to the LEDGER_PAGE_LIMIT
+            setting.
+
+    Raises:
+        XRPLRequestFailureException: if a page can't be fetched.
+
+    Yields:
+        Dict[str, Any]: A token object returned by AccountNFTs.
+    """
+    page_limit = limit or settings().LEDGER_PAGE_LIMIT
+    marker: Any = None
+    ledger_index: Union[str, int] = "validated"
+    while True:
+        response = await client.request(
+            LedgerAccountNFTs(
+                account=classic_address,
+                limit=page_limit,
+                marker=marker,
+                ledger_index=ledger_index,
+            )
+        )
+        if not response.is_successful():
+            raise XRPLRequestFailureException(response.result)
+        for nft_token in response.result["account_nfts"]:
+            yield nft_token
+        ledger_index = response.result.get("ledger_index", ledger_index)
+        marker = response.result.get("marker")
+        if marker is None:
+            break
+
+
+async def get_account_nfts(
+    classic_address: str,
+    client: AsyncJsonRpcClient,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch every NFT of an account, across all the AccountNFTs pages.
+
+    Args:
+        classic_address (str) : A wallet classic address.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : ledger client.
+        limit (Optional[int]) : The page size.
+
+    Returns:
+        List[Dict[str, Any]]: The token objects returned by AccountNFTs.
+    """
+    return [
+        nft_token
+        async for nft_token in iter_account_nfts(classic_address, client, limit)
+    ]
+
+
+class LedgerWatcher:
+    """
+    A background task that keeps track of the latest validated ledger index.
+
+    Args:
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
+        interval (float) : The number of seconds between two reads.
+    """
+
+    def __init__(self, client: AsyncJsonRpcClient, interval: float) -> None:
+        self.client = client
+        self.interval = interval
+        self.validated_index: Optional[int] = None
+        self.task: Optional["asyncio.Task[None]"] = None
+
+    async def run(self) -> None:
+        """
+        Read the validated ledger index forever, once per interval.
+        """
+        while True:
+            try:
+                self.validated_index = await get_latest_validated_ledger_sequence(
+                    self.client
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                logger.warning("Validated ledger read failed: %s", repr(err))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Start the watcher background task.
+        """
+        self.task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Cancel the watcher background task.
+        """
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+async def init_ledger_client(app: FastAPI) -> None:
+    """
+    Creates a pooled ledger client.
+
+    This function creates a long-lived JSON RPC client, and stores it
+    in the application's state property.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    app_settings = settings()
+
+    http_client = httpx.AsyncClient(
+        timeout=app_settings.LEDGER_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=app_settings.LEDGER_POOL_SIZE,
+            max_keepalive_connections=app_settings.LEDGER_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=app_settings.LEDGER_KEEPALIVE_EXPIRY,
+        ),
+    )
+    app.state.ledger_client = PooledJsonRpcClient(
+        app_settings.json_rpc_url, http_client
+    )
+
+
+async def close_ledger_client(app: FastAPI) -> None:
+    """
+    Closes the pooled ledger client connections.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    ledger_client = getattr(app.state, "ledger_client", None)
+    if ledger_client is not None:
+        await ledger_client.close()
+
+
+async def init_ledger_watcher(app: FastAPI) -> None:
+    """
+    Starts watching the validated ledger index.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    watcher = LedgerWatcher(app.state.ledger_client, settings().LEDGER_WATCH_INTERVAL)
+    watcher.start()
+    app.state.ledger_watcher = watcher
+    if isinstance(app.state.ledger_client, PooledJsonRpcClient):
+        app.state.ledger_client.watcher = watcher
+
+
+async def close_ledger_watcher(app: FastAPI) -> None:
+    """
+    Stops watching the validated ledger index.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    watcher = getattr(app.state, "ledger_watcher", None)
+    if watcher is not None:
+        await watcher.stop()
+
+
+__all__ = [
+    "LedgerAccountNFTs",
+    "LedgerWatcher",
+    "PooledJsonRpcClient",
+    "close_ledger_client",
+    "close_ledger_watcher",
+    "get_account_nfts",
+    "init_ledger_client",
+    "init_ledger_watcher",
+    "iter_account_nfts",
+]
@@ -0,0 +1,182 @@
+"""The utils loopmonitor module."""
+
+import asyncio
+from fastapi import (
+    FastAPI,
+)
+import logging
+import sys
+import threading
+import traceback
+from typing import (
+    Optional,
+)
+
+from app.config import (
+    settings,
+)
+from app.utils import (
+    metrics,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    A background task measuring the event loop scheduling delay, the time a
+    sleeping task waits past its wake up time for the loop to run it again.
+
+    Args:
+        interval (float) : The number of seconds between two samples.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.task: Optional["asyncio.Task[None]"] = None
+
+    async def run(self) -> None:
+        """
+        Sample the event loop lag forever, once per interval.
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            metrics.EVENT_LOOP_LAG.observe(max(loop.time() - scheduled, 0))
+
+    def start(self) -> None:
+        """
+        Start the monitor background task.
+        """
+        self.task = asyncio.get_event_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Cancel the monitor background task.
+        """
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+class BlockingCallDetector:
+    """
+    A thread pinging the event loop, the stack of the loop thread is logged
+    whenever a ping isn't answered within the threshold, that is when a
+    coroutine runs a blocking call.
+
+    A blocked loop is only reported once, the pings resume once it answers.
+
+    Args:
+        loop (asyncio.AbstractEventLoop) : The watched event loop.
+        thread_id (int) : The id of the thread running the loop.
+        threshold (float) : The number of seconds the loop may be blocked.
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, thread_id: int, threshold: float
+    ) -> None:
+        self.loop = loop
+        self.thread_id = thread_id
+        self.threshold = threshold
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def report(self) -> None:
+        """
+        Log the current stack of the loop thread.
+        """
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        logger.warning(
+            "The event loop has been blocked for more than %ss:\n%s",
+            self.threshold,
+            "".join(traceback.format_stack(frame)),
+        )
+
+    def run(self) -> None:
+        """
+        Ping the loop until the detector is stopped.
+        """
+        while not self.stopped.is_set():
+            pong = threading.Event()
+            try:
+                self.loop.call_soon_threadsafe(pong.set)
+            except RuntimeError:
+                # the loop is closed
+                return
+            if not pong.wait(self.threshold):
+                self.report()
+                while not pong.wait(self.threshold) and not self.stopped.is_set():
+                    pass
+            self.stopped.wait(self.threshold)
+
+    def start(self) -> None:
+        """
+        Start pinging the loop.
+        """
+        self.thread = threading.Thread(
+            target=self.run, name="blocking-call-detector", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop pinging the loop.
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+async def init_loop_monitor(app: FastAPI) -> None:
+    """
+    Starts sampling the event loop lag, and in development, detecting the
+    blocking calls.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    app_settings = settings()
+    if app_settings.LOOP_LAG_INTERVAL > 0:
+        monitor = LoopLagMonitor(app_settings.LOOP_LAG_INTERVAL)
+        monitor.start()
+        app.state.loop_monitor = monitor
+    if app_settings.DEBUG == "info" and app_settings.BLOCKING_CALL_THRESHOLD > 0:
+        detector = BlockingCallDetector(
+            asyncio.get_event_loop(),
+            threading.get_ident(),
+            app_settings.BLOCKING_CALL_THRESHOLD,
+        )
+        detector.start()
+        app.state.blocking_call_detector = detector
+
+
+async def close_loop_monitor(app: FastAPI) -> None:
+    """
+    Stops sampling the event loop lag and detecting the blocking calls.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    detector = getattr(app.state, "blocking_call_detector", None)
+    if detector is not None:
+        detector.stop()
+    monitor = getattr(app.state, "loop_monitor", None)
+    if monitor is not None:
+        await monitor.stop()
+
+
+__all__ = [
+    "BlockingCallDetector",
+    "LoopLagMonitor",
+    "close_loop_monitor",
+    "init_loop_monitor",
+]
@@ -0,0 +1,246 @@
+"""The utils metrics module."""
+
+from contextlib import (
+    contextmanager,
+)
+from fastapi import (
+    FastAPI,
+)
+import os
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import (
+    monitoring,
+)
+from starlette.requests import (
+    Request,
+)
+from starlette.responses import (
+    Response,
+)
+from starlette.routing import (
+    Match,
+)
+from starlette.types import (
+    ASGIApp,
+    Message,
+    Receive,
+    Scope,
+    Send,
+)
+import time
+from typing import (
+    Iterator,
+)
+
+from app.utils import (
+    timing,
+)
+
+# set for the uvicorn workers to share their metrics through files
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP requests latency.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled.",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+DEPENDENCY_DURATION = Histogram(
+    "dependency_request_duration_seconds",
+    "Outbound requests latency, per dependency.",
+    ["dependency", "operation"],
+)
+DEPENDENCY_ERRORS = Counter(
+    "dependency_request_errors_total",
+    "Failed outbound requests, per dependency.",
+    ["dependency", "operation"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache reads, per backend and result.",
+    ["backend", "result"],
+)
+CACHE_ERRORS = Counter(
+    "cache_errors_total",
+    "Failed cache operations, per backend.",
+    ["backend", "operation"],
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between the scheduled and actual wake up of the event loop monitor.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+@contextmanager
+def track_dependency(dependency: str, operation: str) -> Iterator[None]:
+    """
+    Time an outbound request, and count it if it fails. The request is also
+    added to the timing spans of the current request.
+
+    Args:
+        dependency (str) : The dependency name, e.g. ledger or ipfs.
+        operation (str) : The request kind, e.g. the JSON RPC method.
+    """
+    start = time.perf_counter()
+    try:
+        with timing.span(f"{dependency}.{operation}"):
+            yield
+    except BaseException:
+        DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+        raise
+    finally:
+        DEPENDENCY_DURATION.labels(dependency, operation).observe(
+            time.perf_counter() - start
+        )
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    A pymongo listener recording the duration of every MongoDB command, for
+    all the ODMantic engines and sessions sharing the Motor client.
+
+    Motor runs the commands in threads with a copy of the caller context, so
+    the listener sees the timing spans of the request that sent them.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        """
+        Ignore started commands, their duration is known once they end.
+        """
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        """
+        Record the duration of a succeeded command.
+        """
+        DEPENDENCY_DURATION.labels("mongodb", event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+        timing.record(f"mongodb.{event.command_name}", event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        """
+        Record the duration of a failed command.
+        """
+        DEPENDENCY_ERRORS.labels("mongodb", event.command_name).inc()
+        DEPENDENCY_DURATION.labels("mongodb", event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+        timing.record(f"mongodb.{event.command_name}", event.duration_micros / 1e6)
+
+
+def route_path(scope: Scope) -> str:
+    """
+    Find the path template of the route handling a request, so the request
+    metrics have a bounded number of labels.
+
+    Args:
+        scope (starlette.types.Scope) : The request scope.
+
+    Returns:
+        str: The route path, "unmatched" if no route handles the request.
+    """
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    An ASGI middleware recording the latency and the number of in-flight
+    requests of every route.
+
+    Args:
+        app (starlette.types.ASGIApp) : The wrapped ASGI application.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        route = route_path(scope)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            REQUEST_DURATION.labels(method, route, str(status)).observe(
+                time.perf_counter() - start
+            )
+
+
+def metrics_response(request: Request) -> Response:
+    """
+    Expose the metrics in the Prometheus text format, aggregated across the
+    uvicorn workers when they share a multiprocess directory.
+
+    Args:
+        request (starlette.requests.Request): current request.
+
+    Returns:
+        starlette.responses.Response: The metrics.
+    """
+    if os.getenv(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore
+    else:
+        registry = REGISTRY
+    return Response(
+        generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST}
+    )
+
+
+async def close_metrics(app: FastAPI) -> None:
+    """
+    Drops the live gauges of the exiting worker process.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    if os.getenv(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore
+
+
+__all__ = [
+    "DEPENDENCY_DURATION",
+    "DEPENDENCY_ERRORS",
+    "EVENT_LOOP_LAG",
+    "MetricsMiddleware",
+    "MongoCommandListener",
+    "REQUESTS_IN_PROGRESS",
+    "REQUEST_DURATION",
+    "close_metrics",
+    "metrics_response",
+    "route_path",
+    "track_dependency",
+]
@@ -0,0 +1,351 @@
+"""The utils pinning module."""
+
+import base64
+from datetime import (
+    datetime,
+)
+from fastapi import (
+    FastAPI,
+    UploadFile,
+)
+import httpx
+from motor.motor_asyncio import (
+    AsyncIOMotorCollection,
+)
+from pymongo.errors import (
+    DuplicateKeyError,
+)
+from typing import (
+    AsyncIterator,
+    Callable,
+    Optional,
+)
+import uuid
+
+from app.config import (
+    settings,
+)
+from app.utils import (
+    cid,
+    metrics,
+)
+
+PINATA_PIN_FILE_URL = f"{settings().PINATA_API_URL}/pinning/pinFileToIPFS"
+IPFS_GATEWAY_URL = settings().IPFS_GATEWAY_URL
+# pinned files are wrapped in this directory, so that their gateway url
+# ends with their file name
+PIN_DIRECTORY = "moerphous"
+PINS_COLLECTION = "pins"
+# one document per image url being minted or minted, keyed by the url
+MINT_CLAIMS_COLLECTION = "mint_claims"
+
+
+class UploadTooLargeError(Exception):
+    """
+    Raised when an upload exceeds the UPLOAD_MAX_BYTES setting.
+    """
+
+
+class PinningError(Exception):
+    """
+    Raised when the pinning service rejects an upload.
+    """
+
+
+async def iter_upload_file(
+    file: UploadFile, chunk_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Iterate over the content of an uploaded file, chunk by chunk, from its
+    beginning.
+
+    Args:
+        file (fastapi.UploadFile) : An uploaded file.
+        chunk_size (Optional[int]) : The chunk size, defaults to the
+            UPLOAD_CHUNK_SIZE setting.
+
+    Yields:
+        bytes: A chunk of the file content.
+    """
+    size = chunk_size or settings().UPLOAD_CHUNK_SIZE
+    await file.seek(0)
+    while True:
+        chunk = await file.read(size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def iter_bytes(content: bytes) -> AsyncIterator[bytes]:
+    """
+    Wrap an in-memory content in a single chunk stream.
+
+    Args:
+        content (bytes) : The content to stream.
+
+    Yields:
+        bytes: The content.
+    """
+    yield content
+
+
+async def iter_base64(
+    data: str, chunk_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Decode a base64 string incrementally, chunk by chunk.
+
+    Only a slice of the encoded string is decoded at a time, so the whole
+    decoded content is never held in memory next to its encoded form.
+
+    Args:
+        data (str) : A base64 encoded string.
+        chunk_size (Optional[int]) : The size of the decoded chunks, defaults
+            to the UPLOAD_CHUNK_SIZE setting.
+
+    Raises:
+        binascii.Error: if the string is not correctly base64 encoded.
+
+    Yields:
+        bytes: A chunk of the decoded content.
+    """
+    # 4 base64 characters decode to 3 bytes
+    step = max((chunk_size or settings().UPLOAD_CHUNK_SIZE) // 3, 1) * 4
+    pending = ""
+    for start in range(0, len(data), step):
+        end = start + step
+        pending += "".join(data[start:end].split())
+        end = len(pending) - len(pending) % 4
+        if end:
+            yield base64.b64decode(pending[:end], validate=True)
+            pending = pending[end:]
+    if pending:
+        yield base64.b64decode(pending, validate=True)
+
+
+class PinataClient:
+    """
+    An async Pinata client that streams uploads to the pinning service.
+
+    The multipart body is generated on the fly from the source chunks, so an
+    upload is never buffered as a whole, and the max size is enforced while
+    streaming. The CID of every pinned file is computed locally and mapped
+    to its url in the pins collection, so identical content is only pinned
+    once.
+
+    Args:
+        http_client (httpx.AsyncClient) : The HTTP client used for pinning.
+        api_key (str) : Pinata api key.
+        api_secret (str) : Pinata api secret.
+        max_bytes (int) : The max size of an upload.
+        pins (motor.motor_asyncio.AsyncIOMotorCollection) : The CID to url
+            mapping collection.
+        claims (motor.motor_asyncio.AsyncIOMotorCollection) : The mint claims
+            collection, keyed by image url.
+    """
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        api_key: str,
+        api_secret: str,
+        max_bytes: int,
+        pins: AsyncIOMotorCollection,
+        claims: AsyncIOMotorCollection,
+    ) -> None:
+        self.http_client = http_client
+        self.headers = {
+            "pinata_api_key": api_key or "",
+            "pinata_secret_api_key": api_secret or "",
+        }
+        self.max_bytes = max_bytes
+        self.pins = pins
+        self.claims = claims
+
+    async def _limited(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > self.max_bytes:
+                raise UploadTooLargeError(
+                    f"The upload exceeds the {self.max_bytes} bytes limit!"
+                )
+            yield chunk
+
+    async def _multipart_body(
+        self, boundary: str, file_name: str, chunks: AsyncIterator[bytes]
+    ) -> AsyncIterator[bytes]:
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; '
+            f'filename="{PIN_DIRECTORY}/{file_name}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        async for chunk in self._limited(chunks):
+            yield chunk
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    async def pin_stream(
+        self, chunks: AsyncIterator[bytes], file_name: Optional[str] = None
+    ) -> str:
+        """
+        Stream a file to the pinning service.
+
+        Args:
+            chunks (AsyncIterator[bytes]) : The file content chunks.
+            file_name (Optional[str]) : The pinned file name, random by default.
+
+        Raises:
+            UploadTooLargeError: if the file exceeds the max upload size.
+            PinningError: if the pinning service rejects the file.
+
+        Returns:
+            str: The IPFS gateway url of the pinned file.
+        """
+        name = file_name or uuid.uuid4().hex
+        boundary = uuid.uuid4().hex
+        with metrics.track_dependency("pinata", "pin"):
+            response = await self.http_client.post(
+                PINATA_PIN_FILE_URL,
+                content=self._multipart_body(boundary, name, chunks),
+                headers={
+                    **self.headers,
+                    "Content-Type": f"multipart/form-data; boundary={boundary}",
+                },
+            )
+            if response.status_code != 200:
+                raise PinningError(response.text)
+        return f"{IPFS_GATEWAY_URL}/{response.json()['IpfsHash']}/{name}"
+
+    async def pin(
+        self,
+        open_chunks: Callable[[], AsyncIterator[bytes]],
+        file_name: Optional[str] = None,
+    ) -> str:
+        """
+        Pin a file unless the same content has already been pinned.
+
+        The content is read twice, once to compute its CID locally and, only
+        if that CID is unknown, once more to upload it.
+
+        Args:
+            open_chunks (Callable[[], AsyncIterator[bytes]]) : A function that
+                returns a new iterator over the file content chunks.
+            file_name (Optional[str]) : The pinned file name, random by default.
+
+        Raises:
+            UploadTooLargeError: if the file exceeds the max upload size.
+            PinningError: if the pinning service rejects the file.
+
+        Returns:
+            str: The IPFS gateway url of the pinned file.
+        """
+        content_cid = await cid.compute_cid(self._limited(open_chunks()))
+        pinned = await self.pins.find_one({"_id": content_cid})
+        if pinned is not None:
+            return pinned["url"]
+        url = await self.pin_stream(open_chunks(), file_name)
+        await self.pins.update_one(
+            {"_id": content_cid},
+            {"$setOnInsert": {"url": url, "pinned_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        # a concurrent upload of the same content may have won the race
+        pinned = await self.pins.find_one({"_id": content_cid})
+        return pinned["url"] if pinned is not None else url
+
+    async def pin_bytes(self, content: bytes, file_name: Optional[str] = None) -> str:
+        """
+        Pin a small in-memory file unless it has already been pinned.
+
+        Args:
+            content (bytes) : The file content.
+            file_name (Optional[str]) : The pinned file name, random by default.
+
+        Returns:
+            str: The IPFS gateway url of the pinned file.
+        """
+        return await self.pin(lambda: iter_bytes(content), file_name)
+
+    async def claim_mint(self, url: str) -> bool:
+        """
+        Atomically claim the minting of an image url, whether it has been
+        pinned by this service or not.
+
+        The content pinned by this service has a single url, since identical
+        content is only pinned once.
+
+        Args:
+            url (str) : The url of the image.
+
+        Returns:
+            bool: False if the url has already been claimed.
+        """
+        try:
+            await self.claims.insert_one({"_id": url, "claimed_at": datetime.utcnow()})
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def release_mint(self, url: str) -> None:
+        """
+        Allow an image url to be minted again.
+
+        Args:
+            url (str) : The url of the image.
+        """
+        await self.claims.delete_one({"_id": url})
+
+    async def close(self) -> None:
+        """
+        Close the underlying HTTP client.
+        """
+        await self.http_client.aclose()
+
+
+async def init_pinning_client(app: FastAPI) -> None:
+    """
+    Creates the Pinata client.
+
+    This function creates a streaming Pinata client backed by the pins
+    collection, and stores it in the application's state property.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    app_settings = settings()
+
+    pins = app.state.engine.database[PINS_COLLECTION]
+    await pins.create_index("url")
+    app.state.pinning_client = PinataClient(
+        httpx.AsyncClient(timeout=app_settings.PINATA_TIMEOUT),
+        app_settings.PINATA_API_KEY,
+        app_settings.PINATA_API_SECRET,
+        app_settings.UPLOAD_MAX_BYTES,
+        pins,
+        app.state.engine.database[MINT_CLAIMS_COLLECTION],
+    )
+
+
+async def close_pinning_client(app: FastAPI) -> None:
+    """
+    Closes the Pinata client connections.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    pinning_client = getattr(app.state, "pinning_client", None)
+    if pinning_client is not None:
+        await pinning_client.close()
+
+
+__all__ = [
+    "PinataClient",
+    "PinningError",
+    "UploadTooLargeError",
+    "close_pinning_client",
+    "init_pinning_client",
+    "iter_base64",
+    "iter_bytes",
+    "iter_upload_file",
+]
@@ -0,0 +1,316 @@
+"""The utils profiling module."""
+
+from collections import (
+    Counter,
+)
+from fastapi import (
+    Header,
+    HTTPException,
+)
+import linecache
+import os
+import secrets
+from starlette.types import (
+    ASGIApp,
+    Message,
+    Receive,
+    Scope,
+    Send,
+)
+import sys
+import threading
+import tracemalloc
+from types import (
+    FrameType,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+import uuid
+
+from app.config import (
+    settings,
+)
+
+PROFILE_HEADER = "x-profile-token"
+
+
+def token_matches(token: Optional[str]) -> bool:
+    """
+    Check a token against the PROFILING_TOKEN setting.
+
+    Args:
+        token (Optional[str]) : The token sent by the client.
+
+    Returns:
+        bool: True if profiling is enabled and the token is valid.
+    """
+    expected = settings().PROFILING_TOKEN
+    return bool(expected and token) and secrets.compare_digest(
+        str(token).encode(), expected.encode()
+    )
+
+
+def verify_profiling_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    """
+    Check the admin token of the profiling routes.
+
+    Args:
+        x_profile_token (Optional[str]) : The X-Profile-Token header.
+
+    Raises:
+        HTTPException: If the token is invalid.
+    """
+    if not token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token!")
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    A profiler sampling the stack of a thread from a background thread, the
+    samples are aggregated as collapsed stacks, the flame graph input format.
+
+    Profiling the event loop thread samples every coroutine it runs, not only
+    the profiled request, and the sync routes running in the thread pool are
+    not sampled.
+
+    Args:
+        thread_id (int) : The id of the sampled thread.
+        interval (float) : The number of seconds between samples.
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter[Tuple[str, ...]] = Counter()
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def sample(self) -> None:
+        """
+        Record the current stack of the sampled thread.
+        """
+        frame: Optional[FrameType] = sys._current_frames().get(self.thread_id)
+        stack: List[str] = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        if stack:
+            self.samples[tuple(reversed(stack))] += 1
+
+    def run(self) -> None:
+        """
+        Sample the thread until the profiler is stopped.
+        """
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def start(self) -> None:
+        """
+        Start sampling.
+        """
+        self.thread = threading.Thread(
+            target=self.run, name="sampling-profiler", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop sampling.
+        """
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def collapsed(self) -> str:
+        """
+        Format the samples as collapsed stacks.
+
+        Returns:
+            str: One "frame;frame;frame count" line per distinct stack.
+        """
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in self.samples.most_common()
+        )
+
+
+class ProfilingMiddleware:
+    """
+    An ASGI middleware profiling the requests sent with a valid
+    X-Profile-Token header. The profile is stored in the application cache
+    backend for PROFILE_TTL seconds, under the id returned in the X-Profile-Id
+    response header. The profile can be fetched from any worker, so requests
+    aren't profiled unless the cache backend is shared by every worker.
+
+    A single request is profiled at a time per worker, the others go through
+    unprofiled.
+
+    Args:
+        app (starlette.types.ASGIApp) : The wrapped ASGI application.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = next(
+            (
+                value.decode("latin-1")
+                for name, value in scope["headers"]
+                if name == PROFILE_HEADER.encode()
+            ),
+            None,
+        )
+        responses = getattr(scope["app"].state, "cache_backend", None)
+        if (
+            token is None
+            or responses is None
+            or not responses.shared
+            or not token_matches(token)
+            or not self.lock.acquire(blocking=False)
+        ):
+            await self.app(scope, receive, send)
+            return
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"x-profile-id", profile_id.encode()),
+                    ],
+                }
+            await send(message)
+
+        app_settings = settings()
+        profiler = SamplingProfiler(
+            threading.get_ident(), app_settings.PROFILING_INTERVAL
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            self.lock.release()
+            await responses.set(
+                f"profile:{profile_id}",
+                profiler.collapsed().encode(),
+                app_settings.PROFILE_TTL,
+            )
+
+
+def _statistic(statistic: Any) -> Dict[str, Any]:
+    frame = statistic.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "line": linecache.getline(frame.filename, frame.lineno).strip(),
+        "size": statistic.size,
+        "count": statistic.count,
+        "size_diff": getattr(statistic, "size_diff", statistic.size),
+        "count_diff": getattr(statistic, "count_diff", statistic.count),
+    }
+
+
+class AllocationTracer:
+    """
+    Takes tracemalloc snapshots of the worker process, and compares each one
+    with the previous one.
+    """
+
+    def __init__(self) -> None:
+        self.previous: Optional[tracemalloc.Snapshot] = None
+
+    def start(self, frames: int) -> None:
+        """
+        Start tracing the allocations.
+
+        Args:
+            frames (int) : The number of frames stored per allocation.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.previous = None
+
+    def stop(self) -> None:
+        """
+        Stop tracing the allocations, and free the traces.
+        """
+        tracemalloc.stop()
+        self.previous = None
+
+    @staticmethod
+    def is_tracing() -> bool:
+        """
+        Check whether the allocations are traced.
+
+        Returns:
+            bool: True once started.
+        """
+        return tracemalloc.is_tracing()
+
+    def snapshot(self, limit: int) -> Dict[str, Any]:
+        """
+        Take a snapshot of the traced allocations, they must be traced.
+
+        Args:
+            limit (int) : The number of lines returned.
+
+        Returns:
+            Dict[str, Any]: The traced memory, the lines allocating the most
+                memory, and the lines whose allocations grew the most since
+                the previous snapshot.
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, linecache.__file__),
+            ]
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        diff = (
+            snapshot.compare_to(self.previous, "lineno")
+            if self.previous is not None
+            else []
+        )
+        self.previous = snapshot
+        return {
+            "pid": os.getpid(),
+            "current": current,
+            "peak": peak,
+            "top": [
+                _statistic(statistic)
+                for statistic in snapshot.statistics("lineno")[:limit]
+            ],
+            "diff": [_statistic(statistic) for statistic in diff[:limit]],
+        }
+
+
+# shared by every request handled by this worker process
+allocations = AllocationTracer()
+
+
+__all__ = [
+    "AllocationTracer",
+    "ProfilingMiddleware",
+    "SamplingProfiler",
+    "allocations",
+    "token_matches",
+    "verify_profiling_token",
+]
@@ -0,0 +1,199 @@
+"""The utils resp module."""
+
+import asyncio
+from typing import (
+    Any,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import (
+    urlparse,
+)
+
+CRLF = b"\r\n"
+
+
+class RESPError(Exception):
+    """
+    Raised when the server answers a command with an error reply.
+    """
+
+
+def encode_command(*args: Union[str, bytes, int, float]) -> bytes:
+    """
+    Encode a command as a RESP array of bulk strings.
+
+    Args:
+        args (Union[str, bytes, int, float]) : The command name and arguments.
+
+    Returns:
+        bytes: The encoded command.
+    """
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        else:
+            data = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """
+    Read a single RESP reply.
+
+    Args:
+        reader (asyncio.StreamReader) : The connection reader.
+
+    Raises:
+        RESPError: if the reply is an error.
+        ConnectionError: if the connection is closed mid-reply.
+
+    Returns:
+        Any: The decoded reply, bulk strings are returned as bytes.
+    """
+    line = await reader.readline()
+    if not line.endswith(CRLF):
+        raise ConnectionError("The RESP connection has been closed!")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode()
+    if prefix == b"-":
+        raise RESPError(payload.decode())
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        count = int(payload)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"Unexpected RESP reply: {line!r}")
+
+
+class RESPClient:
+    """
+    A minimal client for servers speaking the Redis protocol, over a pool of
+    keep-alive connections.
+
+    Args:
+        host (str) : The server host.
+        port (int) : The server port.
+        db (int) : The selected database.
+        password (Optional[str]) : The AUTH password.
+        max_connections (int) : The max number of open connections.
+        timeout (float) : The number of seconds a command can take.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int = 0,
+        password: Optional[str] = None,
+        max_connections: int = 10,
+        timeout: float = 2,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(max_connections)
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RESPClient":
+        """
+        Create a client from a redis:// url.
+
+        Args:
+            url (str) : A url like redis://:password@host:6379/0.
+            kwargs (Any) : The other client arguments.
+
+        Returns:
+            RESPClient: A RESP client.
+        """
+        parsed_url = urlparse(url)
+        return cls(
+            parsed_url.hostname or "localhost",
+            parsed_url.port or 6379,
+            int(parsed_url.path.strip("/") or 0),
+            parsed_url.password,
+            **kwargs,
+        )
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.password:
+                writer.write(encode_command("AUTH", self.password))
+                await read_reply(reader)
+            if self.db:
+                writer.write(encode_command("SELECT", self.db))
+                await read_reply(reader)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def _execute(self, command: bytes) -> Any:
+        connection = self.idle.pop() if self.idle else await self._connect()
+        reader, writer = connection
+        try:
+            writer.write(command)
+            await writer.drain()
+            reply = await read_reply(reader)
+        except RESPError:
+            self.idle.append(connection)
+            raise
+        except BaseException:
+            # the connection state is unknown after a failure or a timeout
+            writer.close()
+            raise
+        self.idle.append(connection)
+        return reply
+
+    async def execute(self, *args: Union[str, bytes, int, float]) -> Any:
+        """
+        Run a command.
+
+        Args:
+            args (Union[str, bytes, int, float]) : The command name and arguments.
+
+        Raises:
+            RESPError: if the server answers with an error.
+            OSError: if the server can't be reached.
+            asyncio.TimeoutError: if the command takes too long.
+
+        Returns:
+            Any: The decoded reply.
+        """
+        async with self.slots:
+            return await asyncio.wait_for(
+                self._execute(encode_command(*args)), self.timeout
+            )
+
+    async def close(self) -> None:
+        """
+        Close every idle connection.
+        """
+        while self.idle:
+            _, writer = self.idle.pop()
+            writer.close()
+
+
+__all__ = [
+    "RESPClient",
+    "RESPError",
+    "encode_command",
+    "read_reply",
+]
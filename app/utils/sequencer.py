@@ -0,0 +1,299 @@
+"""The utils sequencer module."""
+
+import asyncio
+from collections import (
+    defaultdict,
+)
+from typing import (
+    DefaultDict,
+    Dict,
+    List,
+)
+from xrpl.asyncio.account import (
+    get_next_valid_seq_number,
+)
+from xrpl.asyncio.clients import (
+    AsyncJsonRpcClient,
+    XRPLRequestFailureException,
+)
+from xrpl.asyncio.ledger import (
+    get_fee,
+    get_latest_validated_ledger_sequence,
+)
+from xrpl.asyncio.transaction import (
+    XRPLReliableSubmissionException,
+    autofill,
+)
+from xrpl.asyncio.transaction.reliable_submission import (
+    _wait_for_final_transaction_outcome,
+)
+from xrpl.models.requests import (
+    SubmitOnly,
+)
+from xrpl.models.response import (
+    Response,
+)
+from xrpl.models.transactions import (
+    TicketCreate,
+)
+from xrpl.models.transactions.transaction import (
+    Transaction,
+)
+
+from app.utils import (
+    signing,
+)
+
+# preliminary results of a transaction submitted with a stale sequence
+SEQUENCE_ERRORS = ("tefPAST_SEQ", "terPRE_SEQ")
+MAX_ATTEMPTS = 3
+# same validation window as the xrpl-py autofill
+LEDGER_OFFSET = 20
+
+
+async def submit_signed(
+    signed_transaction: signing.SignedTransaction, client: AsyncJsonRpcClient
+) -> str:
+    """
+    Submit a signed transaction.
+
+    Args:
+        signed_transaction (app.utils.signing.SignedTransaction) : A signed
+            transaction.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : ledger client.
+
+    Raises:
+        XRPLRequestFailureException: if the submission is rejected.
+        XRPLReliableSubmissionException: if the transaction is malformed.
+
+    Returns:
+        str: The preliminary engine result.
+    """
+    response = await client.request_impl(SubmitOnly(tx_blob=signed_transaction.tx_blob))
+    if not response.is_successful():
+        raise XRPLRequestFailureException(response.result)
+    engine_result = response.result["engine_result"]
+    if engine_result[:3] == "tem":
+        raise XRPLReliableSubmissionException(response.result["engine_result_message"])
+    return engine_result
+
+
+def consumes_sequence(engine_result: str) -> bool:
+    """
+    Check whether a preliminary result means the sequence has been used.
+
+    Args:
+        engine_result (str) : The preliminary engine result of a submission.
+
+    Returns:
+        bool: True if the transaction has been applied or queued.
+    """
+    return engine_result[:3] in ("tes", "tec") or engine_result == "terQUEUED"
+
+
+class AccountSequencer:
+    """
+    Allocates the sequences of the transactions submitted by each account.
+
+    The next sequence of an account is kept in memory, so only the first
+    submission, and the ones following a sequence error, read it from the
+    ledger. Submissions of an account are serialized up to the preliminary
+    result, waiting for the validation happens outside the lock, so several
+    transactions of an account can be in flight at once.
+    """
+
+    def __init__(self) -> None:
+        self.locks: DefaultDict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.next_sequences: Dict[str, int] = {}
+
+    def invalidate(self, account: str) -> None:
+        """
+        Forget the next sequence of an account, the next submission resyncs it.
+
+        Args:
+            account (str) : A wallet classic address.
+        """
+        self.next_sequences.pop(account, None)
+
+    async def submit(
+        self, transaction: Transaction, seed: str, client: AsyncJsonRpcClient
+    ) -> Response:
+        """
+        Sign a transaction with the next sequence of its account, submit it and
+        wait for its final outcome.
+
+        Args:
+            transaction (xrpl.models.transactions.transaction.Transaction) :
+                An unsigned transaction without sequence.
+            seed (str) : The seed of the transaction account.
+            client (xrpl.asyncio.clients.AsyncJsonRpcClient) : ledger client.
+
+        Raises:
+            XRPLReliableSubmissionException: if the transaction is malformed,
+                fails or is not validated in time.
+
+        Returns:
+            xrpl.models.response.Response: The response from a validated ledger.
+        """
+        account = transaction.account
+        for _ in range(MAX_ATTEMPTS):
+            async with self.locks[account]:
+                if account not in self.next_sequences:
+                    self.next_sequences[account] = await get_next_valid_seq_number(
+                        account, client
+                    )
+                sequence = self.next_sequences[account]
+                signed_transaction = await signing.signer.sign(
+                    await autofill(
+                        Transaction.from_dict(
+                            {**transaction.to_dict(), "sequence": sequence}
+                        ),
+                        client,
+                    ),
+                    seed,
+                )
+                try:
+                    engine_result = await submit_signed(signed_transaction, client)
+                except Exception:
+                    self.invalidate(account)
+                    raise
+                if consumes_sequence(engine_result):
+                    # a TicketCreate also consumes the sequences of its tickets,
+                    # unless it failed with a tec result
+                    tickets = (
+                        transaction.ticket_count
+                        if isinstance(transaction, TicketCreate)
+                        and engine_result == "tesSUCCESS"
+                        else 0
+                    )
+                    self.next_sequences[account] = sequence + 1 + tickets
+                else:
+                    self.invalidate(account)
+            if engine_result not in SEQUENCE_ERRORS:
+                break
+        if engine_result in SEQUENCE_ERRORS:
+            raise XRPLReliableSubmissionException(engine_result)
+        return await _wait_for_final_transaction_outcome(
+            signed_transaction.hash, client, engine_result
+        )
+
+
+# shared by every request handled by this worker process
+sequencer = AccountSequencer()
+
+
+async def create_tickets(
+    account: str, count: int, seed: str, client: AsyncJsonRpcClient
+) -> List[int]:
+    """
+    Reserve sequences with a single TicketCreate transaction.
+
+    Args:
+        account (str) : A wallet classic address.
+        count (int) : The number of tickets, at most 250.
+        seed (str) : The seed of the account.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : ledger client.
+
+    Raises:
+        XRPLReliableSubmissionException: if the tickets can't be created.
+
+    Returns:
+        List[int]: The ticket sequences.
+    """
+    response = await sequencer.submit(
+        TicketCreate(account=account, ticket_count=count), seed, client
+    )
+    if response.result["meta"]["TransactionResult"] != "tesSUCCESS":
+        raise XRPLReliableSubmissionException(
+            response.result["meta"]["TransactionResult"]
+        )
+    first_ticket = response.result["Sequence"] + 1
+    return list(range(first_ticket, first_ticket + count))
+
+
+class TicketedSubmitter:
+    """
+    Signs and submits transactions against tickets, without any account
+    sequence, so they can all be in flight at once.
+
+    The fee and the validation window are read once for the whole batch.
+
+    Args:
+        seed (str) : The seed of the account signing the transactions.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : ledger client.
+        fee (str) : The fee of every transaction in drops.
+        last_ledger_sequence (int) : The last ledger the transactions can be
+            validated in.
+    """
+
+    def __init__(
+        self,
+        seed: str,
+        client: AsyncJsonRpcClient,
+        fee: str,
+        last_ledger_sequence: int,
+    ) -> None:
+        self.seed = seed
+        self.client = client
+        self.fee = fee
+        self.last_ledger_sequence = last_ledger_sequence
+
+    @classmethod
+    async def create(cls, seed: str, client: AsyncJsonRpcClient) -> "TicketedSubmitter":
+        """
+        Create a submitter with the current fee and validation window.
+
+        Args:
+            seed (str) : The seed of the account signing the transactions.
+            client (xrpl.asyncio.clients.AsyncJsonRpcClient) : ledger client.
+
+        Returns:
+            TicketedSubmitter: A ticketed submitter.
+        """
+        fee = await get_fee(client)
+        ledger_sequence = await get_latest_validated_ledger_sequence(client)
+        return cls(seed, client, fee, ledger_sequence + LEDGER_OFFSET)
+
+    async def submit(self, transaction: Transaction, ticket: int) -> Response:
+        """
+        Sign a transaction against a ticket, submit it and wait for its final
+        outcome.
+
+        Args:
+            transaction (xrpl.models.transactions.transaction.Transaction) :
+                An unsigned transaction without sequence.
+            ticket (int) : A ticket sequence of the transaction account.
+
+        Raises:
+            XRPLReliableSubmissionException: if the transaction is malformed,
+                fails or is not validated in time.
+
+        Returns:
+            xrpl.models.response.Response: The response from a validated ledger.
+        """
+        signed_transaction = await signing.signer.sign(
+            Transaction.from_dict(
+                {
+                    **transaction.to_dict(),
+                    "sequence": 0,
+                    "ticket_sequence": ticket,
+                    "fee": self.fee,
+                    "last_ledger_sequence": self.last_ledger_sequence,
+                }
+            ),
+            self.seed,
+        )
+        engine_result = await submit_signed(signed_transaction, self.client)
+        return await _wait_for_final_transaction_outcome(
+            signed_transaction.hash, self.client, engine_result
+        )
+
+
+__all__ = [
+    "AccountSequencer",
+    "TicketedSubmitter",
+    "consumes_sequence",
+    "create_tickets",
+    "sequencer",
+    "submit_signed",
+]
@@ -0,0 +1,221 @@
+"""The utils signing module."""
+
+import asyncio
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+)
+from fastapi import (
+    FastAPI,
+)
+import hashlib
+import multiprocessing
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+from xrpl.core import (
+    keypairs,
+)
+from xrpl.core.binarycodec import (
+    encode,
+    encode_for_signing,
+)
+from xrpl.models.transactions.transaction import (
+    Transaction,
+)
+
+from app.config import (
+    settings,
+)
+from app.utils import (
+    cache,
+    timing,
+)
+
+# prefix of the data hashed into a transaction id
+TRANSACTION_HASH_PREFIX = bytes.fromhex("54584E00")
+
+ResultType = TypeVar("ResultType")
+
+
+class SignedTransaction(NamedTuple):
+    """
+    A signed transaction, ready to be submitted.
+    """
+
+    tx_blob: str
+    hash: str
+
+
+def derive_keypair(seed: str) -> Tuple[str, str]:
+    """
+    Derive the keypair of a seed.
+
+    Args:
+        seed (str) : A wallet seed.
+
+    Returns:
+        Tuple[str, str]: The public and private keys.
+    """
+    return keypairs.derive_keypair(seed)
+
+
+def sign_transaction_json(
+    transaction_json: Dict[str, Any], public_key: str, private_key: str
+) -> SignedTransaction:
+    """
+    Serialize and sign a transaction.
+
+    Args:
+        transaction_json (Dict[str, Any]) : A transaction in its XRPL JSON form.
+        public_key (str) : The signing public key.
+        private_key (str) : The signing private key.
+
+    Returns:
+        SignedTransaction: The signed transaction blob and its hash.
+    """
+    signed_json = {**transaction_json, "SigningPubKey": public_key}
+    signed_json["TxnSignature"] = keypairs.sign(
+        bytes.fromhex(encode_for_signing(signed_json)), private_key
+    )
+    tx_blob = encode(signed_json)
+    transaction_hash = hashlib.sha512(
+        TRANSACTION_HASH_PREFIX + bytes.fromhex(tx_blob)
+    ).digest()[:32]
+    return SignedTransaction(tx_blob, transaction_hash.hex().upper())
+
+
+class TransactionSigner:
+    """
+    Signs transactions in a pool of processes, so the CPU-bound key derivation,
+    serialization and signing never block the event loop.
+
+    The keypairs derived from the wallet seeds are cached by classic address,
+    for a bounded time. Without a started pool, transactions are signed in
+    the calling thread.
+
+    Args:
+        max_size (int) : The max number of cached keypairs.
+        ttl (float) : The number of seconds a keypair stays cached.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.keypairs: cache.TTLCache[Tuple[str, str]] = cache.TTLCache(max_size)
+        self.ttl = ttl
+        self.executor: Optional[Executor] = None
+
+    def start(self, workers: int) -> None:
+        """
+        Start the signing processes.
+
+        Args:
+            workers (int) : The number of signing processes, 0 signs in the
+                calling thread.
+        """
+        if workers > 0:
+            # the server process already runs threads, a forked child could
+            # inherit one of their locks held and hang
+            start_method = (
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(start_method),
+            )
+
+    def shutdown(self) -> None:
+        """
+        Stop the signing processes.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    async def _run(self, function: Callable[..., ResultType], *args: Any) -> ResultType:
+        if self.executor is None:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, function, *args
+        )
+
+    async def keypair(self, classic_address: str, seed: str) -> Tuple[str, str]:
+        """
+        Get the keypair of a wallet.
+
+        Args:
+            classic_address (str) : A wallet classic address.
+            seed (str) : The wallet seed.
+
+        Returns:
+            Tuple[str, str]: The public and private keys.
+        """
+        keypair = self.keypairs.get(classic_address)
+        if keypair is None:
+            with timing.span("signing.keypair"):
+                keypair = await self._run(derive_keypair, seed)
+            self.keypairs.set(classic_address, keypair, time.time() + self.ttl)
+        return keypair
+
+    async def sign(self, transaction: Transaction, seed: str) -> SignedTransaction:
+        """
+        Sign an autofilled transaction.
+
+        Args:
+            transaction (xrpl.models.transactions.transaction.Transaction) :
+                A transaction with its sequence, fee and last ledger sequence.
+            seed (str) : The seed of the transaction account.
+
+        Returns:
+            SignedTransaction: The signed transaction blob and its hash.
+        """
+        with timing.span("signing.sign"):
+            public_key, private_key = await self.keypair(transaction.account, seed)
+            return await self._run(
+                sign_transaction_json, transaction.to_xrpl(), public_key, private_key
+            )
+
+
+# shared by every request handled by this worker process
+signer = TransactionSigner(
+    settings().SIGNING_KEY_CACHE_SIZE, settings().SIGNING_KEY_CACHE_TTL
+)
+
+
+async def init_signing_pool(app: FastAPI) -> None:
+    """
+    Starts the signing processes.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    signer.start(settings().SIGNING_WORKERS)
+
+
+async def close_signing_pool(app: FastAPI) -> None:
+    """
+    Stops the signing processes.
+
+    Args:
+        app (fastapi.FastAPI): fastAPI application.
+    """
+    signer.shutdown()
+
+
+__all__ = [
+    "SignedTransaction",
+    "TransactionSigner",
+    "close_signing_pool",
+    "derive_keypair",
+    "init_signing_pool",
+    "sign_transaction_json",
+    "signer",
+]
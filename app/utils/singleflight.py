@@ -0,0 +1,67 @@
+"""The utils singleflight module."""
+
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    TypeVar,
+)
+
+ResultType = TypeVar("ResultType")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into a single one.
+
+    The first caller of a key starts the call, the callers arriving while it
+    is in flight await the same result, or exception, instead of starting
+    their own. Nothing is cached once the call completes.
+
+    The call runs in its own task, so a cancelled caller doesn't cancel it
+    for the others.
+    """
+
+    def __init__(self) -> None:
+        self.calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def _forget(self, key: Hashable, done: "asyncio.Task[Any]") -> None:
+        if self.calls.get(key) is done:
+            del self.calls[key]
+        # the callers may all have been cancelled
+        if not done.cancelled():
+            done.exception()
+
+    async def do(
+        self, key: Hashable, call: Callable[[], Awaitable[ResultType]]
+    ) -> ResultType:
+        """
+        Run a call, unless an identical one is already in flight.
+
+        Args:
+            key (Hashable) : The identity of the call.
+            call (Callable[[], Awaitable[ResultType]]) : A function starting
+                the call.
+
+        Returns:
+            ResultType: The call result.
+        """
+        task = self.calls.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(call())
+            self.calls[key] = task
+            self.started += 1
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+__all__ = [
+    "SingleFlight",
+]
@@ -0,0 +1,260 @@
+"""The utils timing module."""
+
+from contextlib import (
+    contextmanager,
+)
+from contextvars import (
+    ContextVar,
+)
+import json
+import logging
+import random
+from starlette.types import (
+    ASGIApp,
+    Message,
+    Receive,
+    Scope,
+    Send,
+)
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from app.config import (
+    settings,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """
+    A timed step of a request, and the steps it made.
+
+    Args:
+        name (str) : The step name, e.g. ledger.account_nfts.
+        start (float) : The perf_counter value the step started at.
+        duration (Optional[float]) : The step duration in seconds, None while
+            it runs.
+    """
+
+    __slots__ = ("name", "start", "duration", "children")
+
+    def __init__(
+        self, name: str, start: float, duration: Optional[float] = None
+    ) -> None:
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.children: List["Span"] = []
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        """
+        Convert the span tree into a JSON serializable dict.
+
+        Args:
+            origin (float) : The perf_counter value the offsets are relative to.
+
+        Returns:
+            Dict[str, Any]: The span name, start offset and duration in
+                milliseconds, and children.
+        """
+        span = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": (
+                round(self.duration * 1000, 3) if self.duration is not None else None
+            ),
+        }
+        if self.children:
+            span["children"] = [child.to_dict(origin) for child in self.children]
+        return span
+
+
+# the innermost span of the request being handled, None outside requests
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str) -> Iterator[Optional[Span]]:
+    """
+    Time a step of the current request, as a child of the innermost span.
+
+    Args:
+        name (str) : The step name.
+
+    Returns:
+        Iterator[Optional[Span]]: The span, None outside requests.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, time.perf_counter())
+    parent.children.append(child)
+    token = current_span.set(child)
+    try:
+        yield child
+    finally:
+        child.duration = time.perf_counter() - child.start
+        current_span.reset(token)
+
+
+def record(name: str, duration: float) -> None:
+    """
+    Add a step that just ended to the current request.
+
+    Args:
+        name (str) : The step name.
+        duration (float) : The step duration in seconds.
+    """
+    parent = current_span.get()
+    if parent is not None:
+        parent.children.append(Span(name, time.perf_counter() - duration, duration))
+
+
+def iter_spans(root: Span) -> Iterator[Span]:
+    """
+    Iterate over the descendants of a span, depth first.
+
+    Args:
+        root (Span) : The root span.
+
+    Returns:
+        Iterator[Span]: The descendant spans.
+    """
+    for child in root.children:
+        yield child
+        yield from iter_spans(child)
+
+
+def server_timing(root: Span, total: float) -> str:
+    """
+    Build a Server-Timing header, with the total duration and count of each
+    step name.
+
+    Args:
+        root (Span) : The request span.
+        total (float) : The request duration in seconds.
+
+    Returns:
+        str: The header value.
+    """
+    steps: Dict[str, Tuple[int, float]] = {}
+    for child in iter_spans(root):
+        count, duration = steps.get(child.name, (0, 0.0))
+        steps[child.name] = (
+            count + 1,
+            duration + (child.duration if child.duration is not None else 0.0),
+        )
+    metrics = [f"app;dur={total * 1000:.1f}"]
+    metrics.extend(
+        f'{name};dur={duration * 1000:.1f};desc="x{count}"'
+        for name, (count, duration) in steps.items()
+    )
+    return ", ".join(metrics)
+
+
+class ServerTimingMiddleware:
+    """
+    An ASGI middleware collecting the spans of every request. They are
+    returned in a Server-Timing header, and requests slower than
+    slow_threshold seconds are logged as JSON with their span tree.
+
+    Args:
+        app (starlette.types.ASGIApp) : The wrapped ASGI application.
+        slow_threshold (Optional[float]) : The duration a request is logged
+            from, defaults to the SLOW_REQUEST_THRESHOLD setting.
+        sample_rate (Optional[float]) : The fraction of slow requests logged,
+            defaults to the SLOW_REQUEST_SAMPLE_RATE setting.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        slow_threshold: Optional[float] = None,
+        sample_rate: Optional[float] = None,
+    ) -> None:
+        self.app = app
+        self.slow_threshold = (
+            slow_threshold
+            if slow_threshold is not None
+            else settings().SLOW_REQUEST_THRESHOLD
+        )
+        self.sample_rate = (
+            sample_rate
+            if sample_rate is not None
+            else settings().SLOW_REQUEST_SAMPLE_RATE
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        root = Span("request", time.perf_counter())
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(root, time.perf_counter() - root.start)
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"server-timing", header.encode("latin-1")),
+                    ],
+                }
+            await send(message)
+
+        token = current_span.set(root)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_span.reset(token)
+            root.duration = time.perf_counter() - root.start
+            if root.duration >= self.slow_threshold and (
+                random.random() < self.sample_rate
+            ):
+                self.log_slow_request(scope, status, root)
+
+    @staticmethod
+    def log_slow_request(scope: Scope, status: int, root: Span) -> None:
+        """
+        Log a slow request and its span tree.
+
+        Args:
+            scope (starlette.types.Scope) : The request scope.
+            status (int) : The response status.
+            root (Span) : The request span.
+        """
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope["query_string"].decode("latin-1"),
+                    "status": status,
+                    **root.to_dict(root.start),
+                }
+            )
+        )
+
+
+__all__ = [
+    "ServerTimingMiddleware",
+    "Span",
+    "current_span",
+    "iter_spans",
+    "record",
+    "server_timing",
+    "span",
+]
@@ -0,0 +1,71 @@
+"""The utils txmeta module."""
+
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Optional,
+    Set,
+)
+
+NFTOKEN_PAGE = "NFTokenPage"
+
+
+def _nftoken_ids(fields: Optional[Dict[str, Any]]) -> Set[str]:
+    if not fields:
+        return set()
+    return {nftoken["NFToken"]["NFTokenID"] for nftoken in fields.get("NFTokens", [])}
+
+
+def _nftoken_pages(meta: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    for affected_node in meta.get("AffectedNodes", []):
+        for node_type, node in affected_node.items():
+            if node.get("LedgerEntryType") == NFTOKEN_PAGE:
+                yield {"node_type": node_type, **node}
+
+
+def get_minted_nftoken_id(meta: Dict[str, Any]) -> Optional[str]:
+    """
+    Extract the id of the token minted by a validated NFTokenMint.
+
+    Servers that synthesize the nftoken_id metadata field answer directly,
+    otherwise the token ids of the NFTokenPage nodes before and after the
+    transaction are compared. Tokens moved to another page by a page split
+    appear on both sides, so only the minted one is left.
+
+    Args:
+        meta (Dict[str, Any]) : The metadata of a validated NFTokenMint.
+
+    Returns:
+        Optional[str]: The minted NFTokenID, None if the transaction didn't
+            mint any token.
+    """
+    if meta.get("TransactionResult") != "tesSUCCESS":
+        return None
+    if "nftoken_id" in meta:
+        return meta["nftoken_id"]
+    previous_ids: Set[str] = set()
+    final_ids: Set[str] = set()
+    for page in _nftoken_pages(meta):
+        if page["node_type"] == "CreatedNode":
+            final_ids |= _nftoken_ids(page.get("NewFields"))
+        elif page["node_type"] == "ModifiedNode":
+            final_ids |= _nftoken_ids(page.get("FinalFields"))
+            # PreviousFields only lists the fields the transaction changed
+            previous_fields = page.get("PreviousFields") or {}
+            previous_ids |= _nftoken_ids(
+                previous_fields
+                if "NFTokens" in previous_fields
+                else page.get("FinalFields")
+            )
+        elif page["node_type"] == "DeletedNode":
+            previous_ids |= _nftoken_ids(page.get("FinalFields"))
+    minted_ids = final_ids - previous_ids
+    if len(minted_ids) != 1:
+        return None
+    return minted_ids.pop()
+
+
+__all__ = [
+    "get_minted_nftoken_id",
+]
@@ -3,20 +3,19 @@
 from datetime import (
     timedelta,
 )
+import logging
+from odmantic import (
+    AIOEngine,
+    query,
+)
 from odmantic.session import (
     AIOSession,
 )
-from pinatapy import (
-    PinataPy,
-)
-import requests
-from tempfile import (
-    NamedTemporaryFile,
-)
 from typing import (
     Any,
     Dict,
     List,
+    Optional,
 )
 from xrpl.asyncio.account import (
     get_account_info,
@@ -28,12 +27,8 @@ from xrpl.asyncio.clients import (
 from xrpl.asyncio.wallet import (
     generate_faucet_wallet,
 )
-from xrpl.models.requests import (
-    AccountNFTs,
-)
 from xrpl.utils import (
     drops_to_xrp,
-    hex_to_str,
 )
 
 from app.config import (
@@ -41,27 +36,58 @@ from app.config import (
 )
 from app.nfts import (
     crud as nfts_crud,
+    metadata as nfts_metadata,
 )
 from app.utils import (
+    ipfs,
     jwt,
+    ledger,
+    pinning,
 )
 from app.wallets import (
     models as wallets_models,
     schemas as wallets_schemas,
 )
 
+logger = logging.getLogger(__name__)
+
+
+async def read_profile(
+    nft_metadata: nfts_metadata.NFTMetadata, fetcher: ipfs.IPFSFetcher
+) -> Optional[Dict[str, str]]:
+    """
+    Read the first name and bio of a profile nft, a failed IPFS fetch is
+    logged and handled as an unreadable profile.
+
+    Args:
+        nft_metadata (app.nfts.metadata.NFTMetadata) : The metadata of a
+            profile nft.
+        fetcher (app.utils.ipfs.IPFSFetcher) : IPFS metadata fetcher.
+
+    Returns:
+        Optional[Dict[str, str]]: The first_name and bio, None if they can't
+            be read.
+    """
+    try:
+        return await nfts_metadata.read_profile(nft_metadata, fetcher)
+    except Exception as err:
+        logger.warning("Profile metadata fetch failed: %s", repr(err))
+        return None
+
 
-async def create_faucet_wallet(session: AIOSession) -> Dict[str, Any]:
+async def create_faucet_wallet(
+    session: AIOSession, client: AsyncJsonRpcClient
+) -> Dict[str, Any]:
     """
     A method to insert a wallet in the database given a classic_address
     generated from a faucet wallet.
 
     Args:
         session (odmantic.session.AIOSession) : odmantic session object.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
     Returns:
         Dict[str, Any]: A dict that represents the response object.
     """
-    client = AsyncJsonRpcClient(settings().json_rpc_url)
     wallet = await generate_faucet_wallet(client, debug=True)
     access_token_expires = timedelta(days=30)
     access_token = await jwt.create_access_token(
@@ -89,18 +115,24 @@ async def create_faucet_wallet(session: AIOSession) -> Dict[str, Any]:
     }
 
 
-async def get_wallet_info(classic_address: str, session: AIOSession) -> Dict[str, Any]:
+async def get_wallet_info(
+    classic_address: str,
+    engine: AIOEngine,
+    client: AsyncJsonRpcClient,
+    fetcher: ipfs.IPFSFetcher,
+) -> Dict[str, Any]:
     """
     A method to fetch wallet info.
 
     Args:
         classic_address (str) : A wallet classic address.
-        session (odmantic.session.AIOSession) : odmantic session object.
+        engine (odmantic.AIOEngine) : odmantic read-only engine object.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
+        fetcher (app.utils.ipfs.IPFSFetcher) : IPFS metadata fetcher.
     Returns:
         Dict[str, Any]: A dict that represents the account info object.
     """
-    client = AsyncJsonRpcClient(settings().json_rpc_url)
-    wallet = await session.find_one(
+    wallet = await engine.find_one(
         wallets_models.Wallet, wallets_models.Wallet.classic_address == classic_address
     )
     wallet = wallet.dict()
@@ -108,24 +140,19 @@ async def get_wallet_info(classic_address: str, session: AIOSession) -> Dict[str
     wallet.pop("seed")
     balance = await get_balance(classic_address, client)
     # fetch data from NFTokens
-    response = await client.request(
-        AccountNFTs(
-            account=classic_address,
-        )
-    )
-    account_nfts = response.result["account_nfts"]
     first_name, bio, profile_picture = [
         None,
     ] * 3
-    for nft_token in account_nfts:
-        meta_data_url = hex_to_str(nft_token["URI"])
-        if "png" not in meta_data_url:
-            meta_data = requests.get(url=meta_data_url, timeout=30).text
-            meta_data_array = meta_data.split(",")
-            if len(meta_data_array) == 2:
-                first_name, bio = meta_data_array
-        elif "png" in meta_data_url:
-            profile_picture = meta_data_url[:-4]
+    async for nft_token in ledger.iter_account_nfts(classic_address, client):
+        nft_metadata = nfts_metadata.parse_nft_token(nft_token)
+        if nft_metadata is None:
+            continue
+        if nft_metadata.kind == nfts_metadata.NFTKind.PROFILE:
+            profile = await read_profile(nft_metadata, fetcher)
+            if profile is not None:
+                first_name, bio = profile["first_name"], profile["bio"]
+        elif nft_metadata.kind == nfts_metadata.NFTKind.AVATAR:
+            profile_picture = nft_metadata.fields["image_url"]
     wallet.update(
         {
             "first_name": first_name,
@@ -137,11 +164,33 @@ async def get_wallet_info(classic_address: str, session: AIOSession) -> Dict[str
     return wallet
 
 
+async def set_wallet_profile(
+    classic_address: str, profile: Dict[str, Any], session: AIOSession
+) -> None:
+    """
+    A method to store the leaderboard profile fields of a wallet, the
+    wallet cached by the authentication is dropped so it is read again.
+
+    Args:
+        classic_address (str) : A wallet classic address.
+        profile (Dict[str, Any]) : The profile fields to set.
+        session (odmantic.session.AIOSession) : odmantic session object.
+    """
+    await session.engine.get_collection(wallets_models.Wallet).update_one(
+        {"classic_address": classic_address},
+        {"$set": profile},
+        session=session.get_driver_session(),
+    )
+    jwt.invalidate_wallet(classic_address)
+
+
 async def update_wallet_info(
     wallet_info: wallets_schemas.WalletInfo,
     classic_address: str,
     session: AIOSession,
-    pinata: PinataPy,
+    client: AsyncJsonRpcClient,
+    fetcher: ipfs.IPFSFetcher,
+    pinning_client: pinning.PinataClient,
 ) -> Dict[str, Any]:
     """
     A method to update a wallet first name and bio meta data.
@@ -150,42 +199,60 @@ async def update_wallet_info(
         wallet_info (wallets_schemas.WalletInfo) : wallet info schema.
         classic_address (str) : A wallet classic address.
         session (odmantic.session.AIOSession) : odmantic session object.
-        pinata (pinatapy.PinataPy): A pinatapy object instance.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
+        fetcher (app.utils.ipfs.IPFSFetcher) : IPFS metadata fetcher.
+        pinning_client (app.utils.pinning.PinataClient): A Pinata client.
 
     Returns:
         Dict[str, Any]: A dict that represents the account info object.
     """
-    client = AsyncJsonRpcClient(settings().json_rpc_url)
-    response = await client.request(
-        AccountNFTs(
-            account=classic_address,
+    async for nft_token in ledger.iter_account_nfts(classic_address, client):
+        nft_metadata = nfts_metadata.parse_nft_token(nft_token)
+        # burn it, then mint a new one.
+        if (
+            nft_metadata is not None
+            and nft_metadata.kind == nfts_metadata.NFTKind.PROFILE
+            and await read_profile(nft_metadata, fetcher) is not None
+        ):
+            await nfts_crud.burn_nft_token(
+                classic_address, nft_token["NFTokenID"], session, client
+            )
+            break
+    # mint a new nft given the new first_name and bio, they are only pinned
+    # to IPFS when they don't fit in the token URI
+    try:
+        meta_data = nfts_metadata.encode_metadata(
+            nfts_metadata.NFTKind.PROFILE,
+            first_name=wallet_info.first_name,
+            bio=wallet_info.bio,
+        )
+    except nfts_metadata.MetadataTooLargeError:
+        meta_data = nfts_metadata.encode_metadata(
+            nfts_metadata.NFTKind.PROFILE,
+            metadata_url=await pinning_client.pin_bytes(
+                f"{wallet_info.first_name},{wallet_info.bio}".encode()
+            ),
         )
+    response = await nfts_crud.mint_nft_token(
+        classic_address,
+        meta_data,
+        nfts_metadata.NFTKind.PROFILE,
+        session,
+        client,
     )
-    account_nfts = response.result["account_nfts"]
-    for nft_token in account_nfts:
-        meta_data_url = hex_to_str(nft_token["URI"])
-        # burn it, then mint a new one.
-        if "png" not in meta_data_url:
-            meta_data = requests.get(url=meta_data_url, timeout=30).text
-            meta_data_array = meta_data.split(",")
-            if len(meta_data_array) == 2:
-                await nfts_crud.burn_nft_token(
-                    classic_address, nft_token["NFTokenID"], session
-                )
-                break
-    # mint a new nft given the new first_name and bio
-    temp1 = NamedTemporaryFile(delete=False)
-    with temp1 as file:
-        file.write(f"{wallet_info.first_name},{wallet_info.bio}".encode())
-    result = pinata.pin_file_to_ipfs(temp1.name)
-    meta_data_url = (
-        f"https://ipfs.io/ipfs/{result['IpfsHash']}/{temp1.name.split('/')[-1]}"
+    await set_wallet_profile(
+        classic_address,
+        {"first_name": wallet_info.first_name, "bio": wallet_info.bio},
+        session,
     )
-    return await nfts_crud.mint_nft_token(classic_address, meta_data_url, session)
+    return response
 
 
 async def update_wallet_image(
-    image_url: str, classic_address: str, session: AIOSession
+    image_url: str,
+    classic_address: str,
+    session: AIOSession,
+    client: AsyncJsonRpcClient,
 ) -> Dict[str, Any]:
     """
     A method to update a wallet first name and bio meta data.
@@ -194,80 +261,57 @@ async def update_wallet_image(
         image_url (str) : Image URL to be minted.
         classic_address (str) : A wallet classic address.
         session (odmantic.session.AIOSession) : odmantic session object.
+        client (xrpl.asyncio.clients.AsyncJsonRpcClient) : pooled ledger client.
 
     Returns:
         Dict[str, Any]: A dict that represents the account info object.
     """
-    client = AsyncJsonRpcClient(settings().json_rpc_url)
-    response = await client.request(
-        AccountNFTs(
-            account=classic_address,
-        )
-    )
-    account_nfts = response.result["account_nfts"]
-    for nft_token in account_nfts:
-        meta_data_url = hex_to_str(nft_token["URI"])
+    async for nft_token in ledger.iter_account_nfts(classic_address, client):
+        nft_metadata = nfts_metadata.parse_nft_token(nft_token)
         # burn it, then mint a new one.
-        if "png" in meta_data_url:
+        if (
+            nft_metadata is not None
+            and nft_metadata.kind == nfts_metadata.NFTKind.AVATAR
+        ):
             await nfts_crud.burn_nft_token(
-                classic_address, nft_token["NFTokenID"], session
+                classic_address, nft_token["NFTokenID"], session, client
             )
             break
     # mint a new nft given the image url
-    return await nfts_crud.mint_nft_token(classic_address, image_url, session)
+    response = await nfts_crud.mint_nft_token(
+        classic_address,
+        nfts_metadata.encode_metadata(
+            nfts_metadata.NFTKind.AVATAR, image_url=image_url
+        ),
+        nfts_metadata.NFTKind.AVATAR,
+        session,
+        client,
+    )
+    await set_wallet_profile(classic_address, {"profile_picture": image_url}, session)
+    return response
 
 
-async def get_all_wallet_info(session: AIOSession) -> List[Any]:
+async def get_all_wallet_info(engine: AIOEngine) -> List[Any]:
     """
-    A method to fetch top 9 wallets info.
+    A method to fetch the top wallets info, ranked by their number of listings.
+
+    The nb_items counts are maintained by the catalog sync on every mint and
+    burn, so the ranking is read from the nb_items index.
 
     Args:
-        session (odmantic.session.AIOSession) : odmantic session object.
+        engine (odmantic.AIOEngine) : odmantic read-only engine object.
     Returns:
-        Dict[str, Any]: A list of  dicts that contains all wallets info.
+        List[Any]: A list of dicts that contains the top wallets info.
     """
-    client = AsyncJsonRpcClient(settings().json_rpc_url)
-    all_registered_wallets = await session.find(wallets_models.Wallet)
+    top_wallets = await engine.find(
+        wallets_models.Wallet,
+        sort=query.desc(wallets_models.Wallet.nb_items),
+        limit=settings().LEADERBOARD_SIZE,
+    )
     results = []
-    for wallet in all_registered_wallets:
-        wallet = wallet.dict()
+    for wallet_obj in top_wallets:
+        wallet = wallet_obj.dict()
         wallet["id"] = str(wallet["id"])
         wallet.pop("seed")
-        response = await client.request(
-            AccountNFTs(
-                account=wallet["classic_address"],
-            )
-        )
-        account_nfts = response.result["account_nfts"]
-        first_name, bio, profile_picture = [
-            None,
-        ] * 3
-        total_nfts = 0
-        for nft_token in account_nfts:
-            meta_data_url = hex_to_str(nft_token["URI"])
-            if "png" not in meta_data_url:
-                try:
-                    meta_data = requests.get(url=meta_data_url, timeout=30).text
-                    meta_data_array = meta_data.split(",")
-                except Exception:
-                    meta_data_array = meta_data.split(",")[1:4]
-                    meta_data_array[2] = meta_data_array[2].split(":")[0]
-                if len(meta_data_array) == 2:
-                    first_name, bio = meta_data_array
-                elif len(meta_data_array) in [3, 5]:
-                    total_nfts += 1
-            elif "png" in meta_data_url:
-                profile_picture = meta_data_url[:-4]
-        wallet.update(
-            {
-                "first_name": first_name,
-                "profile_picture": profile_picture,
-                "nb_items": total_nfts,
-            }
-        )
         results.append(wallet)
-    results = sorted(
-        results, key=lambda wallet_dict: wallet_dict["nb_items"], reverse=True
-    )
-    # return top 9
-    return results[:9]
+    return results
@@ -23,6 +23,10 @@ class Wallet(Model):
     classic_address: str = Field(index=True)
     seed: str = Field(index=True)
     wallet_status: int = Field(default=1)
+    nb_items: int = Field(default=0, index=True)
+    first_name: Optional[str] = Field(default=None)
+    bio: Optional[str] = Field(default=None)
+    profile_picture: Optional[str] = Field(default=None)
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
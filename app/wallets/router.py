@@ -4,32 +4,32 @@ from fastapi import (
     APIRouter,
     Depends,
     File,
+    Response,
     UploadFile,
 )
+import httpx
+from odmantic import (
+    AIOEngine,
+)
 from odmantic.session import (
     AIOSession,
 )
-import os
-from pinatapy import (
-    PinataPy,
-)
-from tempfile import (
-    NamedTemporaryFile,
-)
 from typing import (
     Any,
     Dict,
 )
+from xrpl.asyncio.clients import (
+    AsyncJsonRpcClient,
+)
 
 from app.auth import (
     schemas as auth_schemas,
 )
-from app.config import (
-    settings,
-)
 from app.utils import (
     dependencies,
+    ipfs,
     jwt,
+    pinning,
 )
 from app.wallets import (
     crud as wallets_crud,
@@ -37,7 +37,6 @@ from app.wallets import (
 )
 
 router = APIRouter(prefix="/api/v1")
-pinata = PinataPy(settings().PINATA_API_KEY, settings().PINATA_API_SECRET)
 
 
 @router.get(
@@ -46,12 +45,16 @@ pinata = PinataPy(settings().PINATA_API_KEY, settings().PINATA_API_SECRET)
 )
 async def get_wallet_info(
     current_wallet: Any = Depends(jwt.get_current_active_wallet),
-    session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    engine: AIOEngine = Depends(dependencies.get_db_read_engine),
+    client: AsyncJsonRpcClient = Depends(dependencies.get_ledger_client),
+    fetcher: ipfs.IPFSFetcher = Depends(dependencies.get_ipfs_fetcher),
 ) -> Dict[str, Any]:
     """
     Get wallet info given a token provided in a request header.
     """
-    wallet = await wallets_crud.get_wallet_info(current_wallet.classic_address, session)
+    wallet = await wallets_crud.get_wallet_info(
+        current_wallet.classic_address, engine, client, fetcher
+    )
     return {
         "wallet": wallet,
         "status_code": 200,
@@ -72,11 +75,12 @@ async def get_wallet_info(
 )
 async def create_faucet_wallet(
     session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    client: AsyncJsonRpcClient = Depends(dependencies.get_ledger_client),
 ) -> Dict[str, Any]:
     """
     Generate a faucet wallet.
     """
-    results = await wallets_crud.create_faucet_wallet(session)
+    results = await wallets_crud.create_faucet_wallet(session, client)
     return results
 
 
@@ -89,37 +93,51 @@ async def create_faucet_wallet(
             "model": auth_schemas.ResponseSchema,
             "description": "A response object that contains info about" " a wallet.",
         },
+        400: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates something went wrong!",
+        },
+        413: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the image is too large!",
+        },
+        502: {
+            "model": auth_schemas.ResponseSchema,
+            "description": "A response object that indicates the image"
+            " couldn't be pinned!",
+        },
     },
 )
 async def upload_author_image(
+    response: Response,
     file: UploadFile = File(...),
     current_wallet: Any = Depends(jwt.get_current_active_wallet),
     session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    client: AsyncJsonRpcClient = Depends(dependencies.get_ledger_client),
+    pinning_client: pinning.PinataClient = Depends(dependencies.get_pinning_client),
 ) -> Dict[str, Any]:
     """
     Upload an image to IPFS.
     """
     try:
-        file_bytes = file.file.read()
-        temp = NamedTemporaryFile(delete=False)
-        with temp as temp_file:
-            temp_file.write(file_bytes)
-        result = pinata.pin_file_to_ipfs(temp.name)
-        image_url = (
-            f"https://ipfs.io/ipfs/{result['IpfsHash']}/{temp.name.split('/')[-1]}.png"
-        )
+        image_url = await pinning_client.pin(lambda: pinning.iter_upload_file(file))
+    except pinning.UploadTooLargeError as err:
+        response.status_code = 413
+        return {"status_code": 413, "message": str(err)}
+    except (pinning.PinningError, httpx.HTTPError):
+        response.status_code = 502
+        return {"status_code": 502, "message": "The image couldn't be pinned!"}
+    try:
         await wallets_crud.update_wallet_image(
-            image_url, current_wallet.classic_address, session
+            image_url, current_wallet.classic_address, session, client
         )
-        return {
-            "status_code": 200,
-            "message": "Profile picture has been uploaded successfully!",
-        }
-
     except Exception as err:
+        response.status_code = 400
         return {"status_code": 400, "message": str(err)}
-    finally:
-        os.remove(temp.name)
+    return {
+        "status_code": 200,
+        "message": "Profile picture has been uploaded successfully!",
+    }
 
 
 @router.put(
@@ -137,12 +155,20 @@ async def update_wallet_info(
     wallet_info: wallets_schemas.WalletInfo,
     current_wallet: Any = Depends(jwt.get_current_active_wallet),
     session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    client: AsyncJsonRpcClient = Depends(dependencies.get_ledger_client),
+    fetcher: ipfs.IPFSFetcher = Depends(dependencies.get_ipfs_fetcher),
+    pinning_client: pinning.PinataClient = Depends(dependencies.get_pinning_client),
 ) -> Dict[str, Any]:
     """
     An endpoint for updating users personel info.
     """
     await wallets_crud.update_wallet_info(
-        wallet_info, current_wallet.classic_address, session, pinata
+        wallet_info,
+        current_wallet.classic_address,
+        session,
+        client,
+        fetcher,
+        pinning_client,
     )
     return {
         "status_code": 200,
@@ -153,16 +179,17 @@ async def update_wallet_info(
 @router.get(
     "/wallet/all",
     name="wallet:get-all-info",
+    response_model=wallets_schemas.WalletsObjectSchema,
 )
 async def get_all_wallets_info(
-    session: AIOSession = Depends(dependencies.get_db_transactional_session),
+    engine: AIOEngine = Depends(dependencies.get_db_read_engine),
 ) -> Dict[str, Any]:
     """
-    Get all wallets info.
+    Get the top wallets info.
     """
-    wallet = await wallets_crud.get_all_wallet_info(session)
+    wallets = await wallets_crud.get_all_wallet_info(engine)
     return {
-        "wallets": wallet,
+        "wallets": wallets,
         "status_code": 200,
         "message": "Welcome to Moerphous.",
     }
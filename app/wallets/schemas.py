@@ -7,6 +7,7 @@ from pydantic import (
 from typing import (
     Any,
     Dict,
+    List,
     Optional,
 )
 
@@ -58,6 +59,34 @@ class WalletTokenObjectSchema(BaseModel):
     message: str = Field(..., example="Welcome to Moerphous.")
 
 
+class WalletsObjectSchema(BaseModel):
+    """
+    A Pydantic class that defines the schema of the top wallets leaderboard.
+
+    The ranking is read from the catalog, the ledger failures of an account
+    are logged by the catalog sync rather than reported per request.
+    """
+
+    wallets: List[Dict[str, Any]] = Field(
+        ...,
+        example=[
+            {
+                "id": "63a1f0c2e4b0a1b2c3d4e5f6",
+                "classic_address": "rBtXmAdEYcno9LWRnAGfT9qBxCeDvuVRZo",
+                "wallet_status": 1,
+                "nb_items": 12,
+                "first_name": "First name.",
+                "bio": "Bio.",
+                "profile_picture": "IPFS url of the profile picture.",
+                "created_at": "2022-12-20T17:00:00",
+                "updated_at": "2022-12-20T17:00:00",
+            }
+        ],
+    )
+    status_code: int = Field(..., example=200)
+    message: str = Field(..., example="Welcome to Moerphous.")
+
+
 class WalletInfo(BaseModel):
     """
     A Pydantic class that defines the users schema for the updating user info.
@@ -0,0 +1,200 @@
+"""Run the benchmarks, e.g. python -m benchmarks --wallets 20 --nfts 50."""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+from xrpl.wallet import (
+    Wallet,
+)
+
+from benchmarks import (
+    services,
+    stats,
+)
+
+# the harness registers these names, listed here so it is only imported once
+# the application settings are set
+SCENARIOS = (
+    "auth.login",
+    "wallet.get",
+    "wallet.all",
+    "nft.get-all",
+    "nft.get-wallet-nfts",
+    "jobs.get",
+    "wallet.info",
+    "wallet.image",
+    "nft.upload-image",
+    "nft.mint-offer",
+    "nft.upload-mint-nft",
+    "nft.upload-mint-nft-binary",
+    "nft.mint-batch",
+)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse the command line.
+
+    Args:
+        argv (Optional[List[str]]) : The arguments, sys.argv by default.
+
+    Returns:
+        argparse.Namespace: The benchmark options.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark every router against local stand-ins of the"
+        " XRPL JSON RPC, IPFS gateway, Pinata and MongoDB.",
+    )
+    parser.add_argument("--wallets", type=int, default=10)
+    parser.add_argument("--nfts", type=int, default=20, help="listings per wallet")
+    parser.add_argument(
+        "--requests", type=int, default=200, help="requests per read scenario"
+    )
+    parser.add_argument(
+        "--write-requests", type=int, default=20, help="requests per write scenario"
+    )
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="comma separated scenarios, among " + ", ".join(SCENARIOS),
+    )
+    parser.add_argument("--image-size", type=int, default=16 * 1024)
+    parser.add_argument(
+        "--ledger-latency", type=float, default=0.0, help="seconds per JSON RPC call"
+    )
+    parser.add_argument(
+        "--ipfs-latency", type=float, default=0.0, help="seconds per gateway fetch"
+    )
+    parser.add_argument(
+        "--pinata-latency", type=float, default=0.0, help="seconds per pin"
+    )
+    parser.add_argument(
+        "--mongo-latency", type=float, default=0.0, help="seconds per command"
+    )
+    parser.add_argument(
+        "--ledger-close", type=float, default=1.0, help="seconds between ledgers"
+    )
+    parser.add_argument("--save", metavar="PATH", help="save the run as a baseline")
+    parser.add_argument(
+        "--compare", metavar="PATH", help="compare the p95 with a baseline"
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="tolerated p95 increase over the baseline, e.g. 0.2 for 20%%",
+    )
+    args = parser.parse_args(argv)
+    args.scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+def configure(urls: Dict[str, str]) -> None:
+    """
+    Point the application settings at the stand-in services.
+
+    Args:
+        urls (Dict[str, str]) : The service settings.
+    """
+    os.environ.update(urls)
+    os.environ["MONGODB_DATABASE"] = "xrpl"
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-of-32-bytes!")
+    os.environ.setdefault("PINATA_API_KEY", "benchmark")
+    os.environ.setdefault("PINATA_API_SECRET", "benchmark")
+    os.environ.setdefault("CACHE_BACKEND", "memory")
+    os.environ.setdefault("DEBUG", "")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmarks.
+
+    Args:
+        argv (Optional[List[str]]) : The arguments, sys.argv by default.
+
+    Returns:
+        int: The exit code, 1 if a scenario regressed.
+    """
+    args = parse_args(argv)
+    # the slow requests and the job failures would flood the report
+    logging.getLogger("app").setLevel(logging.ERROR)
+    stand_ins = services.Services(
+        services.Latencies(
+            args.ledger_latency,
+            args.ipfs_latency,
+            args.pinata_latency,
+            args.mongo_latency,
+        ),
+        args.ledger_close,
+    )
+    configure(stand_ins.start())
+    try:
+        from app.main import (
+            get_app,
+        )
+        from benchmarks import (
+            harness,
+        )
+
+        wallets = [Wallet.create() for _ in range(args.wallets)]
+        stand_ins.load(harness.build_fixtures(wallets, args.nfts, args.image_size))
+
+        def on_result(name: str, summary: Dict[str, Any]) -> None:
+            print(f"{name}: p95 {summary['p95']}ms", file=sys.stderr, flush=True)
+
+        results = asyncio.run(
+            harness.run(
+                get_app(),
+                wallets,
+                args.scenarios,
+                args.requests,
+                args.write_requests,
+                args.concurrency,
+                args.warmup,
+                args.image_size,
+                on_result,
+            )
+        )
+    finally:
+        counts = stand_ins.stop()
+    print(stats.format_report(results))
+    print(f"\nstand-in requests: {json.dumps(counts, sort_keys=True)}")
+    if args.save:
+        stats.save_baseline(
+            args.save,
+            {
+                "options": {
+                    name: value
+                    for name, value in vars(args).items()
+                    if name not in ("save", "compare", "max_regression")
+                },
+                "results": results,
+            },
+        )
+    if args.compare:
+        comparison = stats.compare(
+            results, stats.load_baseline(args.compare)["results"], args.max_regression
+        )
+        print("\n" + "\n".join(comparison))
+        if any(line.startswith("REGRESSION") for line in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""The benchmarks fake_ipfs module."""
+
+import asyncio
+import hashlib
+from starlette.datastructures import (
+    UploadFile,
+)
+from starlette.requests import (
+    Request,
+)
+from starlette.responses import (
+    JSONResponse,
+    Response,
+)
+from starlette.types import (
+    Receive,
+    Scope,
+    Send,
+)
+from typing import (
+    Dict,
+)
+
+
+def content_id(content: bytes) -> str:
+    """
+    Build a stand-in CID of a content, it is stable but not a real CIDv0.
+
+    Args:
+        content (bytes) : The pinned content.
+
+    Returns:
+        str: The content id.
+    """
+    return "Qm" + hashlib.sha256(content).hexdigest()[:44]
+
+
+class FakeIPFS:
+    """
+    An ASGI app standing in for the IPFS gateway, under /ipfs, and for the
+    Pinata pinning API, under /pinning. Pinned files are kept in memory and
+    served by the gateway, unknown CIDs are answered with default_size bytes.
+
+    Args:
+        gateway_latency (float) : The number of seconds every gateway request
+            waits.
+        pinning_latency (float) : The number of seconds every pin waits.
+        default_size (int) : The size of the content of unknown CIDs.
+    """
+
+    def __init__(
+        self,
+        gateway_latency: float = 0,
+        pinning_latency: float = 0,
+        default_size: int = 4096,
+    ) -> None:
+        self.gateway_latency = gateway_latency
+        self.pinning_latency = pinning_latency
+        self.default_size = default_size
+        self.files: Dict[str, bytes] = {}
+        self.requests = {"fetch": 0, "pin": 0}
+
+    def pin(self, content: bytes) -> str:
+        """
+        Pin a content.
+
+        Args:
+            content (bytes) : The pinned content.
+
+        Returns:
+            str: The content id.
+        """
+        cid = content_id(content)
+        self.files[cid] = content
+        return cid
+
+    async def fetch(self, request: Request) -> Response:
+        """
+        Serve a pinned file, the path inside the CID is ignored.
+        """
+        self.requests["fetch"] += 1
+        if self.gateway_latency:
+            await asyncio.sleep(self.gateway_latency)
+        cid = request.url.path.split("/")[2]
+        content = self.files.get(cid, b"\x00" * self.default_size)
+        return Response(content, media_type="application/octet-stream")
+
+    async def pin_file(self, request: Request) -> Response:
+        """
+        Pin the file of a pinFileToIPFS request.
+        """
+        self.requests["pin"] += 1
+        if self.pinning_latency:
+            await asyncio.sleep(self.pinning_latency)
+        form = await request.form()
+        upload: UploadFile = form["file"]  # type: ignore
+        content = await upload.read()
+        return JSONResponse(
+            {
+                "IpfsHash": self.pin(content),
+                "PinSize": len(content),
+                "Timestamp": "2022-12-01T00:00:00.000Z",
+            }
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(scope, receive)
+        if request.url.path.startswith("/ipfs/"):
+            response = await self.fetch(request)
+        elif request.url.path == "/pinning/pinFileToIPFS":
+            response = await self.pin_file(request)
+        else:
+            response = JSONResponse({"error": "Not found"}, status_code=404)
+        await response(scope, receive, send)
+
+
+__all__ = [
+    "FakeIPFS",
+    "content_id",
+]
@@ -0,0 +1,315 @@
+"""The benchmarks fake_ledger module."""
+
+import asyncio
+import hashlib
+import itertools
+from starlette.requests import (
+    Request,
+)
+from starlette.responses import (
+    JSONResponse,
+)
+from starlette.types import (
+    Receive,
+    Scope,
+    Send,
+)
+import time
+from typing import (
+    Any,
+    Dict,
+    List,
+    Set,
+)
+from xrpl.core.addresscodec import (
+    decode_classic_address,
+)
+from xrpl.core.binarycodec import (
+    decode,
+)
+
+# prefix of the data hashed into a transaction id
+TRANSACTION_HASH_PREFIX = bytes.fromhex("54584E00")
+# the first validated ledger index
+GENESIS_INDEX = 1000
+MAX_PAGE_SIZE = 400
+# the JSON RPC methods answered by the ledger
+METHODS = frozenset(("account_info", "account_nfts", "fee", "ledger", "submit", "tx"))
+
+
+class Account:
+    """
+    The ledger state of an account.
+
+    Args:
+        address (str) : The account classic address.
+        balance (int) : The account balance in drops.
+    """
+
+    def __init__(self, address: str, balance: int) -> None:
+        self.address = address
+        self.balance = balance
+        self.sequence = 1
+        self.tickets: Set[int] = set()
+        self.nfts: List[Dict[str, Any]] = []
+
+
+class FakeLedger:
+    """
+    An ASGI app answering the XRPL JSON RPC methods used by the application:
+    account_info, account_nfts, fee, ledger, submit and tx.
+
+    Submitted transactions are applied at once, without checking their
+    signature, and are validated in the next ledger. Ledgers close every
+    close_interval seconds.
+
+    Args:
+        latency (float) : The number of seconds every request waits.
+        close_interval (float) : The number of seconds between two ledgers.
+        balance (int) : The balance in drops of the accounts created on use.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0,
+        close_interval: float = 1,
+        balance: int = 1000_000_000,
+    ) -> None:
+        self.latency = latency
+        self.close_interval = close_interval
+        self.balance = balance
+        self.started = time.monotonic()
+        self.accounts: Dict[str, Account] = {}
+        self.transactions: Dict[str, Dict[str, Any]] = {}
+        self.serials = itertools.count(1)
+        self.requests: Dict[str, int] = {}
+
+    @property
+    def ledger_index(self) -> int:
+        """
+        The latest validated ledger index.
+        """
+        return GENESIS_INDEX + int(
+            (time.monotonic() - self.started) / self.close_interval
+        )
+
+    def account(self, address: str) -> Account:
+        """
+        Get an account, it is created on first use.
+
+        Args:
+            address (str) : The account classic address.
+
+        Returns:
+            Account: The account state.
+        """
+        if address not in self.accounts:
+            self.accounts[address] = Account(address, self.balance)
+        return self.accounts[address]
+
+    def mint(self, address: str, taxon: int, uri: str, flags: int = 8) -> str:
+        """
+        Add an nft to an account.
+
+        Args:
+            address (str) : The issuer classic address.
+            taxon (int) : The nft taxon.
+            uri (str) : The hex encoded nft URI.
+            flags (int) : The nft flags, transferable by default.
+
+        Returns:
+            str: The NFTokenID.
+        """
+        serial = next(self.serials)
+        nftoken_id = (
+            f"{flags:04X}0000{decode_classic_address(address).hex().upper()}"
+            f"{taxon:08X}{serial:08X}"
+        )
+        self.account(address).nfts.append(
+            {
+                "Flags": flags,
+                "Issuer": address,
+                "NFTokenID": nftoken_id,
+                "NFTokenTaxon": taxon,
+                "URI": uri,
+                "nft_serial": serial,
+            }
+        )
+        return nftoken_id
+
+    def account_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        account = self.account(params["account"])
+        return {
+            "account_data": {
+                "Account": account.address,
+                "Balance": str(account.balance),
+                "Flags": 0,
+                "LedgerEntryType": "AccountRoot",
+                "OwnerCount": len(account.nfts) // 32 + len(account.tickets),
+                "Sequence": account.sequence,
+                "TicketCount": len(account.tickets),
+            },
+            "ledger_index": self.ledger_index,
+            "validated": True,
+        }
+
+    def account_nfts(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        account = self.account(params["account"])
+        limit = min(int(params.get("limit") or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        start = int(params.get("marker") or 0)
+        end = start + limit
+        result: Dict[str, Any] = {
+            "account": account.address,
+            "account_nfts": account.nfts[start:end],
+            "ledger_index": self.ledger_index,
+            "validated": True,
+        }
+        if end < len(account.nfts):
+            result["marker"] = str(end)
+        return result
+
+    def fee(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "current_ledger_size": "10",
+            "current_queue_size": "0",
+            "drops": {
+                "base_fee": "10",
+                "median_fee": "5000",
+                "minimum_fee": "10",
+                "open_ledger_fee": "10",
+            },
+            "expected_ledger_size": "1000",
+            "ledger_current_index": self.ledger_index + 1,
+            "levels": {
+                "median_level": "128000",
+                "minimum_level": "256",
+                "open_ledger_level": "256",
+                "reference_level": "256",
+            },
+            "max_queue_size": "20000",
+        }
+
+    def ledger(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        ledger_index = self.ledger_index
+        return {
+            "ledger": {"closed": True, "ledger_index": str(ledger_index)},
+            "ledger_hash": hashlib.sha256(str(ledger_index).encode()).hexdigest(),
+            "ledger_index": ledger_index,
+            "validated": True,
+        }
+
+    def apply(self, transaction: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply a transaction to the accounts.
+
+        Args:
+            transaction (Dict[str, Any]) : A decoded transaction.
+
+        Returns:
+            Dict[str, Any]: The transaction metadata, its TransactionResult
+                starts with tef or ter if it hasn't been applied.
+        """
+        account = self.account(transaction["Account"])
+        sequence = transaction.get("Sequence", 0)
+        if sequence == 0:
+            ticket = transaction.get("TicketSequence")
+            if ticket not in account.tickets:
+                return {"TransactionResult": "tefNO_TICKET"}
+            account.tickets.discard(ticket)
+        elif sequence < account.sequence:
+            return {"TransactionResult": "tefPAST_SEQ"}
+        elif sequence > account.sequence:
+            return {"TransactionResult": "terPRE_SEQ"}
+        else:
+            account.sequence += 1
+        account.balance -= int(transaction.get("Fee", "10"))
+        meta: Dict[str, Any] = {
+            "AffectedNodes": [],
+            "TransactionIndex": 0,
+            "TransactionResult": "tesSUCCESS",
+        }
+        transaction_type = transaction["TransactionType"]
+        if transaction_type == "NFTokenMint":
+            meta["nftoken_id"] = self.mint(
+                account.address,
+                transaction["NFTokenTaxon"],
+                transaction.get("URI", ""),
+                transaction.get("Flags", 0),
+            )
+        elif transaction_type == "NFTokenBurn":
+            account.nfts = [
+                nft
+                for nft in account.nfts
+                if nft["NFTokenID"] != transaction["NFTokenID"]
+            ]
+        elif transaction_type == "NFTokenCreateOffer":
+            meta["offer_id"] = (
+                hashlib.sha256(
+                    f"{account.address}:{sequence}:{transaction['NFTokenID']}".encode()
+                )
+                .hexdigest()
+                .upper()
+            )
+        elif transaction_type == "TicketCreate":
+            count = transaction["TicketCount"]
+            account.tickets.update(range(account.sequence, account.sequence + count))
+            account.sequence += count
+        return meta
+
+    def submit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        tx_blob = params["tx_blob"]
+        transaction = decode(tx_blob)
+        transaction_hash = (
+            hashlib.sha512(TRANSACTION_HASH_PREFIX + bytes.fromhex(tx_blob))
+            .hexdigest()[:64]
+            .upper()
+        )
+        meta = self.apply(transaction)
+        engine_result = meta["TransactionResult"]
+        if engine_result == "tesSUCCESS":
+            self.transactions[transaction_hash] = {
+                **transaction,
+                "hash": transaction_hash,
+                "meta": meta,
+                # validated once the current ledger closes
+                "ledger_index": self.ledger_index + 1,
+            }
+        return {
+            "accepted": engine_result == "tesSUCCESS",
+            "applied": engine_result == "tesSUCCESS",
+            "engine_result": engine_result,
+            "engine_result_code": 0 if engine_result == "tesSUCCESS" else -1,
+            "engine_result_message": engine_result,
+            "tx_blob": tx_blob,
+            "tx_json": {**transaction, "hash": transaction_hash},
+        }
+
+    def tx(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        transaction = self.transactions.get(params["transaction"])
+        if transaction is None:
+            return {"error": "txnNotFound", "status": "error"}
+        return {
+            **transaction,
+            "validated": transaction["ledger_index"] <= self.ledger_index,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(scope, receive)
+        json_rpc = await request.json()
+        method = json_rpc.get("method", "")
+        params = (json_rpc.get("params") or [{}])[0]
+        self.requests[method] = self.requests.get(method, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        handler = getattr(self, method, None) if method in METHODS else None
+        if handler is None:
+            result: Dict[str, Any] = {"error": "unknownCmd", "status": "error"}
+        else:
+            result = {"status": "success", **handler(params)}
+        await JSONResponse({"result": result})(scope, receive, send)
+
+
+__all__ = [
+    "Account",
+    "FakeLedger",
+]
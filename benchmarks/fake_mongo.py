@@ -0,0 +1,837 @@
+"""The benchmarks fake_mongo module."""
+
+import asyncio
+import bson
+from bson import (
+    ObjectId,
+)
+import copy
+from datetime import (
+    datetime,
+)
+import itertools
+import re
+import struct
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+OP_REPLY = 1
+OP_QUERY = 2004
+OP_MSG = 2013
+HEADER = struct.Struct("<iiii")
+MAX_WIRE_VERSION = 17
+
+
+class CommandError(Exception):
+    """
+    Raised when a command can't be run, it is answered with ok: 0.
+    """
+
+    def __init__(self, message: str, code: int = 2) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def _type_rank(value: Any) -> int:
+    # the bson comparison order of the types used by the application
+    if value is None:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def sort_key(value: Any) -> Tuple[int, Any]:
+    """
+    Build a key sorting values in the bson comparison order.
+
+    Args:
+        value (Any) : A document value.
+
+    Returns:
+        Tuple[int, Any]: The sort key.
+    """
+    rank = _type_rank(value)
+    if rank in (4, 5, 10):
+        return rank, str(value)
+    return rank, value
+
+
+def get_path(document: Dict[str, Any], path: str) -> List[Any]:
+    """
+    Read the values at a dotted path, arrays are traversed.
+
+    Args:
+        document (Dict[str, Any]) : A document.
+        path (str) : A dotted field path.
+
+    Returns:
+        List[Any]: The values found, empty if the path is missing.
+    """
+    values: List[Any] = [document]
+    for part in path.split("."):
+        found = []
+        for value in values:
+            if isinstance(value, dict) and part in value:
+                found.append(value[part])
+            elif isinstance(value, list):
+                found.extend(
+                    item[part]
+                    for item in value
+                    if isinstance(item, dict) and part in item
+                )
+        values = found
+    return values
+
+
+def _compare(operator: str, value: Any, operand: Any) -> bool:
+    if _type_rank(value) != _type_rank(operand):
+        return False
+    if operator == "$gt":
+        return bool(value > operand)
+    if operator == "$gte":
+        return bool(value >= operand)
+    if operator == "$lt":
+        return bool(value < operand)
+    return bool(value <= operand)
+
+
+def _equals(values: List[Any], operand: Any) -> bool:
+    if not values:
+        return operand is None
+    for value in values:
+        if value == operand and _type_rank(value) == _type_rank(operand):
+            return True
+        if isinstance(value, list) and operand in value:
+            return True
+    return False
+
+
+def _match_operator(values: List[Any], operator: str, operand: Any) -> bool:
+    if operator == "$eq":
+        return _equals(values, operand)
+    if operator == "$ne":
+        return not _equals(values, operand)
+    if operator == "$in":
+        return any(_equals(values, item) for item in operand)
+    if operator == "$nin":
+        return not any(_equals(values, item) for item in operand)
+    if operator in ("$gt", "$gte", "$lt", "$lte"):
+        return any(_compare(operator, value, operand) for value in values)
+    if operator == "$exists":
+        return bool(values) == bool(operand)
+    if operator == "$not":
+        return not _match_value(values, operand)
+    if operator == "$regex":
+        return any(
+            isinstance(value, str) and re.search(operand, value) for value in values
+        )
+    raise CommandError(f"unknown operator: {operator}")
+
+
+def _match_value(values: List[Any], condition: Any) -> bool:
+    if (
+        isinstance(condition, dict)
+        and condition
+        and next(iter(condition)).startswith("$")
+    ):
+        return all(
+            _match_operator(values, operator, operand)
+            for operator, operand in condition.items()
+            if operator != "$options"
+        )
+    return _equals(values, condition)
+
+
+def matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """
+    Check a document against a query filter.
+
+    Args:
+        document (Dict[str, Any]) : A document.
+        query (Dict[str, Any]) : A query filter.
+
+    Returns:
+        bool: True if the document matches.
+    """
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(document, sub_query) for sub_query in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, sub_query) for sub_query in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(document, sub_query) for sub_query in condition):
+                return False
+        elif not _match_value(get_path(document, key), condition):
+            return False
+    return True
+
+
+def _set_path(document: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        document = document.setdefault(part, {})
+    document[parts[-1]] = value
+
+
+def _unset_path(document: Dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    for part in parts[:-1]:
+        document = document.get(part, {})
+    document.pop(parts[-1], None)
+
+
+def apply_update(
+    document: Dict[str, Any], update: Dict[str, Any], inserting: bool
+) -> Dict[str, Any]:
+    """
+    Apply an update document, or a replacement, to a document.
+
+    Args:
+        document (Dict[str, Any]) : The updated document.
+        update (Dict[str, Any]) : An update or replacement document.
+        inserting (bool) : True if the document is being upserted.
+
+    Returns:
+        Dict[str, Any]: The new document.
+    """
+    if not any(key.startswith("$") for key in update):
+        return {"_id": document["_id"], **copy.deepcopy(update)}
+    document = copy.deepcopy(document)
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            if operator == "$set" or (operator == "$setOnInsert" and inserting):
+                _set_path(document, path, copy.deepcopy(value))
+            elif operator == "$unset":
+                _unset_path(document, path)
+            elif operator == "$inc":
+                current = get_path(document, path)
+                _set_path(document, path, (current[0] if current else 0) + value)
+            elif operator == "$push":
+                current = get_path(document, path)
+                _set_path(document, path, [*(current[0] if current else []), value])
+            elif operator != "$setOnInsert":
+                raise CommandError(f"unknown update operator: {operator}")
+    return document
+
+
+def _upserted_document(query: Dict[str, Any]) -> Dict[str, Any]:
+    document: Dict[str, Any] = {}
+    for key, condition in query.items():
+        if key.startswith("$"):
+            continue
+        if isinstance(condition, dict) and "$eq" in condition:
+            _set_path(document, key, condition["$eq"])
+        elif not (
+            isinstance(condition, dict) and next(iter(condition), "").startswith("$")
+        ):
+            _set_path(document, key, condition)
+    return document
+
+
+def sort_documents(
+    documents: List[Dict[str, Any]], sort: Dict[str, int]
+) -> List[Dict[str, Any]]:
+    """
+    Sort documents by a sort specification.
+
+    Args:
+        documents (List[Dict[str, Any]]) : The documents.
+        sort (Dict[str, int]) : The fields and their direction, 1 or -1.
+
+    Returns:
+        List[Dict[str, Any]]: The sorted documents.
+    """
+    for path, direction in reversed(list(sort.items())):
+        documents = sorted(
+            documents,
+            key=lambda document: sort_key(next(iter(get_path(document, path)), None)),
+            reverse=direction < 0,
+        )
+    return documents
+
+
+def project(
+    document: Dict[str, Any], projection: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Apply a projection to a document.
+
+    Args:
+        document (Dict[str, Any]) : A document.
+        projection (Optional[Dict[str, Any]]) : The included or excluded fields.
+
+    Returns:
+        Dict[str, Any]: The projected document.
+    """
+    if not projection:
+        return document
+    included = {key for key, value in projection.items() if value and key != "_id"}
+    if included:
+        projected = {key: document[key] for key in included if key in document}
+        if projection.get("_id", 1) and "_id" in document:
+            projected["_id"] = document["_id"]
+        return projected
+    return {key: value for key, value in document.items() if projection.get(key, 1)}
+
+
+class Collection:
+    """
+    An in-memory collection, documents are kept in insertion order.
+    """
+
+    def __init__(self) -> None:
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[str, Any]] = {
+            "_id_": {"v": 2, "key": {"_id": 1}, "name": "_id_"}
+        }
+
+    def find(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Find the documents matching a query.
+
+        Args:
+            query (Dict[str, Any]) : A query filter.
+
+        Returns:
+            List[Dict[str, Any]]: The matching documents.
+        """
+        document_id = query.get("_id")
+        if document_id is not None and not isinstance(document_id, dict):
+            document = self.documents.get(document_id)
+            return (
+                [document] if document is not None and matches(document, query) else []
+            )
+        return [
+            document for document in self.documents.values() if matches(document, query)
+        ]
+
+    def insert(self, document: Dict[str, Any]) -> None:
+        """
+        Insert a document.
+
+        Args:
+            document (Dict[str, Any]) : The new document, an _id is added if
+                it has none.
+
+        Raises:
+            CommandError: if the _id already exists.
+        """
+        document.setdefault("_id", ObjectId())
+        if document["_id"] in self.documents:
+            raise CommandError("E11000 duplicate key error", 11000)
+        self.documents[document["_id"]] = document
+
+    def update(
+        self, query: Dict[str, Any], update: Dict[str, Any], multi: bool, upsert: bool
+    ) -> Dict[str, Any]:
+        """
+        Update the documents matching a query.
+
+        Args:
+            query (Dict[str, Any]) : A query filter.
+            update (Dict[str, Any]) : An update or replacement document.
+            multi (bool) : False to update the first matching document only.
+            upsert (bool) : True to insert a document when none matches.
+
+        Returns:
+            Dict[str, Any]: The number of matched and modified documents, and
+                the upserted _id if any.
+        """
+        found = self.find(query)
+        if not multi:
+            found = found[:1]
+        modified = 0
+        for document in found:
+            updated = apply_update(document, update, False)
+            if updated != document:
+                modified += 1
+                self.documents[document["_id"]] = updated
+        result: Dict[str, Any] = {"n": len(found), "nModified": modified}
+        if not found and upsert:
+            document = _upserted_document(query)
+            document.setdefault("_id", ObjectId())
+            document = apply_update(document, update, True)
+            self.insert(document)
+            result.update({"n": 1, "upserted": document["_id"]})
+        return result
+
+    def delete(self, query: Dict[str, Any], limit: int) -> int:
+        """
+        Delete the documents matching a query.
+
+        Args:
+            query (Dict[str, Any]) : A query filter.
+            limit (int) : 1 to delete the first matching document only, 0 for all.
+
+        Returns:
+            int: The number of deleted documents.
+        """
+        found = self.find(query)
+        if limit:
+            found = found[:limit]
+        for document in found:
+            del self.documents[document["_id"]]
+        return len(found)
+
+
+def _group(
+    documents: List[Dict[str, Any]], spec: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    groups: Dict[Any, Dict[str, Any]] = {}
+    for document in documents:
+        key_spec = spec["_id"]
+        key = (
+            next(iter(get_path(document, key_spec[1:])), None)
+            if isinstance(key_spec, str) and key_spec.startswith("$")
+            else key_spec
+        )
+        group = groups.setdefault(str(key), {"_id": key})
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            if set(accumulator) != {"$sum"}:
+                raise CommandError(f"unsupported accumulator: {accumulator}")
+            operand = accumulator["$sum"]
+            if isinstance(operand, str) and operand.startswith("$"):
+                operand = next(iter(get_path(document, operand[1:])), 0)
+            group[field] = group.get(field, 0) + operand
+    return list(groups.values())
+
+
+def run_pipeline(
+    documents: List[Dict[str, Any]], pipeline: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Run the aggregation stages the application uses.
+
+    Args:
+        documents (List[Dict[str, Any]]) : The collection documents.
+        pipeline (List[Dict[str, Any]]) : The pipeline stages.
+
+    Returns:
+        List[Dict[str, Any]]: The output documents.
+    """
+    for stage in pipeline:
+        ((name, spec),) = stage.items()
+        if name == "$match":
+            documents = [document for document in documents if matches(document, spec)]
+        elif name == "$sort":
+            documents = sort_documents(documents, spec)
+        elif name == "$skip":
+            documents = documents[spec:]
+        elif name == "$limit":
+            documents = documents[:spec]
+        elif name == "$project":
+            documents = [project(document, spec) for document in documents]
+        elif name == "$group":
+            documents = _group(documents, spec)
+        elif name == "$count":
+            documents = [{spec: len(documents)}] if documents else []
+        else:
+            raise CommandError(f"unsupported stage: {name}")
+    return documents
+
+
+class FakeMongo:
+    """
+    An in-memory server speaking enough of the MongoDB wire protocol for the
+    application through pymongo: the handshake, CRUD commands, cursors, the
+    count and find aggregations, and indexes, which are recorded only.
+
+    It reports itself as a standalone server, so sessions work and
+    transactions don't.
+
+    Args:
+        latency (float) : The number of seconds every command waits.
+    """
+
+    def __init__(self, latency: float = 0) -> None:
+        self.latency = latency
+        self.databases: Dict[str, Dict[str, Collection]] = {}
+        self.cursors: Dict[int, Tuple[str, List[Dict[str, Any]]]] = {}
+        self.cursor_ids = itertools.count(1)
+        self.request_ids = itertools.count(1)
+        self.commands = 0
+        self.server: Optional[asyncio.base_events.Server] = None
+        self.writers: Set[asyncio.StreamWriter] = set()
+
+    @property
+    def port(self) -> int:
+        """
+        The port the server listens on.
+        """
+        assert self.server is not None
+        return int(self.server.sockets[0].getsockname()[1])
+
+    def collection(self, database: str, name: str) -> Collection:
+        """
+        Get a collection, it is created on first use.
+
+        Args:
+            database (str) : The database name.
+            name (str) : The collection name.
+
+        Returns:
+            Collection: The collection.
+        """
+        return self.databases.setdefault(database, {}).setdefault(name, Collection())
+
+    def _cursor(
+        self, namespace: str, documents: List[Dict[str, Any]], batch_size: Optional[int]
+    ) -> Dict[str, Any]:
+        size = batch_size if batch_size else 101
+        cursor_id = 0
+        if len(documents) > size:
+            cursor_id = next(self.cursor_ids)
+            self.cursors[cursor_id] = (namespace, documents[size:])
+        return {
+            "cursor": {
+                "id": bson.int64.Int64(cursor_id),
+                "ns": namespace,
+                "firstBatch": documents[:size],
+            },
+            "ok": 1.0,
+        }
+
+    def hello(self) -> Dict[str, Any]:
+        """
+        Answer the handshake and the monitoring checks.
+
+        Returns:
+            Dict[str, Any]: A standalone server description.
+        """
+        return {
+            "ismaster": True,
+            "isWritablePrimary": True,
+            "maxBsonObjectSize": 16 * 1024 * 1024,
+            "maxMessageSizeBytes": 48000000,
+            "maxWriteBatchSize": 100000,
+            "localTime": datetime.utcnow(),
+            "logicalSessionTimeoutMinutes": 30,
+            "connectionId": next(self.request_ids),
+            "minWireVersion": 0,
+            "maxWireVersion": MAX_WIRE_VERSION,
+            "readOnly": False,
+            "ok": 1.0,
+        }
+
+    def run_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a command.
+
+        Args:
+            command (Dict[str, Any]) : The command document, with the kind 1
+                sections merged in.
+
+        Returns:
+            Dict[str, Any]: The command reply.
+        """
+        name = next(iter(command))
+        handler: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = getattr(
+            self, f"cmd_{name.lower()}", None
+        )
+        if handler is None:
+            raise CommandError(f"no such command: '{name}'", 59)
+        return handler(command)
+
+    def cmd_hello(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        return self.hello()
+
+    cmd_ismaster = cmd_hello
+
+    def cmd_ping(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        return {"ok": 1.0}
+
+    cmd_endsessions = cmd_ping
+    cmd_killcursors = cmd_ping
+
+    def cmd_buildinfo(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        return {"version": "6.0.0", "versionArray": [6, 0, 0, 0], "ok": 1.0}
+
+    def cmd_insert(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["insert"])
+        for document in command.get("documents", []):
+            collection.insert(document)
+        return {"n": len(command.get("documents", [])), "ok": 1.0}
+
+    def cmd_update(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["update"])
+        matched, modified, upserted = 0, 0, []
+        for index, statement in enumerate(command.get("updates", [])):
+            result = collection.update(
+                statement.get("q", {}),
+                statement["u"],
+                statement.get("multi", False),
+                statement.get("upsert", False),
+            )
+            matched += result["n"]
+            modified += result["nModified"]
+            if "upserted" in result:
+                upserted.append({"index": index, "_id": result["upserted"]})
+        reply: Dict[str, Any] = {"n": matched, "nModified": modified, "ok": 1.0}
+        if upserted:
+            reply["upserted"] = upserted
+        return reply
+
+    def cmd_delete(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["delete"])
+        deleted = sum(
+            collection.delete(statement.get("q", {}), statement.get("limit", 0))
+            for statement in command.get("deletes", [])
+        )
+        return {"n": deleted, "ok": 1.0}
+
+    def cmd_find(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["find"])
+        documents = collection.find(command.get("filter", {}))
+        if command.get("sort"):
+            documents = sort_documents(documents, command["sort"])
+        del documents[: command.get("skip", 0)]
+        if command.get("limit"):
+            documents = documents[: abs(command["limit"])]
+        documents = [
+            project(document, command.get("projection")) for document in documents
+        ]
+        batch_size = command.get("batchSize")
+        if command.get("singleBatch"):
+            batch_size = len(documents) or 1
+        return self._cursor(
+            f"{command['$db']}.{command['find']}", documents, batch_size
+        )
+
+    def cmd_aggregate(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["aggregate"])
+        documents = run_pipeline(
+            list(collection.documents.values()), command.get("pipeline", [])
+        )
+        return self._cursor(
+            f"{command['$db']}.{command['aggregate']}",
+            documents,
+            command.get("cursor", {}).get("batchSize"),
+        )
+
+    def cmd_getmore(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        cursor_id = int(command["getMore"])
+        namespace, documents = self.cursors.pop(cursor_id, ("", []))
+        size = command.get("batchSize") or len(documents)
+        if len(documents) > size:
+            self.cursors[cursor_id] = (namespace, documents[size:])
+        else:
+            cursor_id = 0
+        return {
+            "cursor": {
+                "id": bson.int64.Int64(cursor_id),
+                "ns": namespace,
+                "nextBatch": documents[:size],
+            },
+            "ok": 1.0,
+        }
+
+    def cmd_count(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["count"])
+        return {"n": len(collection.find(command.get("query", {}))), "ok": 1.0}
+
+    def cmd_findandmodify(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["findAndModify"])
+        found = collection.find(command.get("query", {}))
+        if command.get("sort"):
+            found = sort_documents(found, command["sort"])
+        before = found[0] if found else None
+        if command.get("remove"):
+            if before is not None:
+                collection.delete({"_id": before["_id"]}, 1)
+            return {
+                "value": before,
+                "lastErrorObject": {"n": int(bool(before))},
+                "ok": 1.0,
+            }
+        query = (
+            {"_id": before["_id"]} if before is not None else command.get("query", {})
+        )
+        result = collection.update(
+            query, command.get("update", {}), False, command.get("upsert", False)
+        )
+        after_id = before["_id"] if before is not None else result.get("upserted")
+        after = collection.documents.get(after_id) if after_id is not None else None
+        value = after if command.get("new") else before
+        if value is not None:
+            value = project(value, command.get("fields"))
+        return {
+            "value": value,
+            "lastErrorObject": {
+                "n": result["n"],
+                "updatedExisting": before is not None,
+            },
+            "ok": 1.0,
+        }
+
+    def cmd_createindexes(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["createIndexes"])
+        before = len(collection.indexes)
+        for index in command.get("indexes", []):
+            collection.indexes[index["name"]] = {"v": 2, **index}
+        return {
+            "numIndexesBefore": before,
+            "numIndexesAfter": len(collection.indexes),
+            "ok": 1.0,
+        }
+
+    def cmd_dropindexes(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["dropIndexes"])
+        collection.indexes.pop(str(command.get("index")), None)
+        return {"ok": 1.0}
+
+    def cmd_listindexes(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        collection = self.collection(command["$db"], command["listIndexes"])
+        return self._cursor(
+            f"{command['$db']}.{command['listIndexes']}",
+            list(collection.indexes.values()),
+            None,
+        )
+
+    def cmd_drop(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        self.databases.get(command["$db"], {}).pop(command["drop"], None)
+        return {"ok": 1.0}
+
+    def cmd_dropdatabase(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        self.databases.pop(command["$db"], None)
+        return {"ok": 1.0}
+
+    def _reply(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        self.commands += 1
+        try:
+            return self.run_command(command)
+        except CommandError as err:
+            return {"ok": 0.0, "errmsg": str(err), "code": err.code}
+
+    @staticmethod
+    def _parse_msg(body: bytes) -> Dict[str, Any]:
+        (flags,) = struct.unpack_from("<I", body)
+        offset, end = 4, len(body) - (4 if flags & 1 else 0)
+        command: Dict[str, Any] = {}
+        sequences: Dict[str, List[Dict[str, Any]]] = {}
+        while offset < end:
+            kind = body[offset]
+            offset += 1
+            (size,) = struct.unpack_from("<i", body, offset)
+            section = body[offset:][:size]
+            if kind == 0:
+                command = bson.decode(section)
+            else:
+                identifier, documents = section[4:].split(b"\x00", 1)
+                sequences[identifier.decode()] = bson.decode_all(documents)
+            offset += size
+        command.update(sequences)
+        return command
+
+    def _encode(self, op_code: int, response_to: int, payload: bytes) -> bytes:
+        return (
+            HEADER.pack(
+                HEADER.size + len(payload), next(self.request_ids), response_to, op_code
+            )
+            + payload
+        )
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Answer the messages of a connection until it is closed.
+
+        Args:
+            reader (asyncio.StreamReader) : The connection reader.
+            writer (asyncio.StreamWriter) : The connection writer.
+        """
+        self.writers.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                length, request_id, _, op_code = HEADER.unpack(header)
+                body = await reader.readexactly(length - HEADER.size)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if op_code == OP_MSG:
+                    reply = self._reply(self._parse_msg(body))
+                    writer.write(
+                        self._encode(
+                            OP_MSG,
+                            request_id,
+                            struct.pack("<IB", 0, 0) + bson.encode(reply),
+                        )
+                    )
+                elif op_code == OP_QUERY:
+                    # the legacy handshake, sent before the wire version is known
+                    name_end = body.index(b"\x00", 4)
+                    # skip the name terminator, numberToSkip and numberToReturn
+                    query: Dict[str, Any] = bson.decode_all(body[name_end:][9:])[0]
+                    query.setdefault("$db", body[4:name_end].decode().split(".")[0])
+                    reply = self._reply(query)
+                    writer.write(
+                        self._encode(
+                            OP_REPLY,
+                            request_id,
+                            struct.pack("<iqii", 0, 0, 0, 1) + bson.encode(reply),
+                        )
+                    )
+                else:
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        Start listening.
+
+        Args:
+            host (str) : The listened host.
+            port (int) : The listened port, a free one by default.
+        """
+        self.server = await asyncio.start_server(self.handle, host, port)
+
+    async def stop(self) -> None:
+        """
+        Stop listening.
+        """
+        if self.server is not None:
+            self.server.close()
+            for writer in list(self.writers):
+                writer.close()
+            await self.server.wait_closed()
+
+
+__all__ = [
+    "Collection",
+    "CommandError",
+    "FakeMongo",
+    "apply_update",
+    "matches",
+    "run_pipeline",
+]
@@ -0,0 +1,482 @@
+"""The benchmarks harness module.
+
+It imports the application, so the settings pointing it at the stand-in
+services must be set before it is imported.
+"""
+
+import asyncio
+import base64
+from fastapi import (
+    FastAPI,
+)
+import httpx
+import os
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Tuple,
+)
+from xrpl.utils import (
+    str_to_hex,
+)
+from xrpl.wallet import (
+    Wallet,
+)
+
+from app.nfts import (
+    indexer as nfts_indexer,
+    metadata as nfts_metadata,
+)
+from app.utils import (
+    pinning,
+)
+from app.wallets import (
+    models as wallets_models,
+)
+from benchmarks import (
+    fake_ipfs,
+    services,
+    stats,
+)
+
+API = "/api/v1"
+
+
+class Account(NamedTuple):
+    """
+    A seeded wallet.
+
+    Args:
+        wallet (xrpl.wallet.Wallet) : The wallet keys.
+        token (str) : A valid access token of the wallet.
+        job_id (str) : The id of a mint job of the wallet.
+    """
+
+    wallet: Wallet
+    token: str
+    job_id: str
+
+
+class Context(NamedTuple):
+    """
+    The state shared by the scenarios.
+
+    Args:
+        accounts (List[Account]) : The seeded wallets.
+        image_size (int) : The size of the uploaded images.
+    """
+
+    accounts: List[Account]
+    image_size: int
+
+    def account(self, index: int) -> Account:
+        """
+        Get the wallet sending a request, the requests are spread evenly.
+
+        Args:
+            index (int) : The request index.
+
+        Returns:
+            Account: A seeded wallet.
+        """
+        return self.accounts[index % len(self.accounts)]
+
+
+Scenario = Callable[[httpx.AsyncClient, Context, int], Awaitable[httpx.Response]]
+
+
+def _headers(account: Account) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {account.token}"}
+
+
+def _image(context: Context) -> bytes:
+    # random, so every upload is pinned and minted as a new nft
+    return os.urandom(context.image_size)
+
+
+def _picture_url() -> str:
+    return f"{pinning.IPFS_GATEWAY_URL}/{fake_ipfs.content_id(os.urandom(16))}"
+
+
+async def auth_login(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.post(
+        f"{API}/auth/login",
+        json={"classic_address": context.account(index).wallet.classic_address},
+    )
+
+
+async def wallet_get(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.get(f"{API}/wallet", headers=_headers(context.account(index)))
+
+
+async def wallet_all(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.get(f"{API}/wallet/all")
+
+
+async def wallet_info(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.put(
+        f"{API}/wallet/info",
+        json={"first_name": f"Name {index}", "bio": f"Bio {index}."},
+        headers=_headers(context.account(index)),
+    )
+
+
+async def wallet_image(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.put(
+        f"{API}/wallet/image",
+        files={"file": ("avatar.png", _image(context), "image/png")},
+        headers=_headers(context.account(index)),
+    )
+
+
+async def nft_get_all(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.get(f"{API}/nft/get-all")
+
+
+async def nft_get_wallet_nfts(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.get(
+        f"{API}/nft/get-wallet-nfts", headers=_headers(context.account(index))
+    )
+
+
+async def nft_upload_image(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.post(
+        f"{API}/nft/upload-image",
+        files={"file": ("image.png", _image(context), "image/png")},
+        headers=_headers(context.account(index)),
+    )
+
+
+async def nft_mint_offer(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.post(
+        f"{API}/nft/mint-offer",
+        json={"picture": _picture_url(), "title": f"NFT {index}", "price": "10"},
+        headers=_headers(context.account(index)),
+    )
+
+
+async def nft_upload_mint(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.post(
+        f"{API}/nft/upload-mint-nft",
+        json={
+            "picture": base64.b64encode(_image(context)).decode(),
+            "author_avatar": _picture_url(),
+            "title": f"NFT {index}",
+            "price": "10",
+        },
+        headers=_headers(context.account(index)),
+    )
+
+
+async def nft_upload_mint_binary(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.post(
+        f"{API}/nft/upload-mint-nft/binary",
+        data={"author_avatar": _picture_url(), "title": f"NFT {index}", "price": "10"},
+        files={"file": ("image.png", _image(context), "image/png")},
+        headers=_headers(context.account(index)),
+    )
+
+
+async def nft_mint_batch(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.post(
+        f"{API}/nft/mint-batch",
+        json={
+            "author_avatar": _picture_url(),
+            "items": [
+                {"picture": _picture_url(), "title": f"NFT {index}", "price": "10"}
+                for _ in range(3)
+            ],
+        },
+        headers=_headers(context.account(index)),
+    )
+
+
+async def jobs_get(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    account = context.account(index)
+    return await client.get(f"{API}/jobs/{account.job_id}", headers=_headers(account))
+
+
+# the read scenarios, run --requests times
+READ_SCENARIOS: Dict[str, Scenario] = {
+    "auth.login": auth_login,
+    "wallet.get": wallet_get,
+    "wallet.all": wallet_all,
+    "nft.get-all": nft_get_all,
+    "nft.get-wallet-nfts": nft_get_wallet_nfts,
+    "jobs.get": jobs_get,
+}
+# the scenarios pinning files or submitting transactions, run --write-requests
+# times, the faucet wallet creation is left out as it needs the testnet faucet
+WRITE_SCENARIOS: Dict[str, Scenario] = {
+    "wallet.info": wallet_info,
+    "wallet.image": wallet_image,
+    "nft.upload-image": nft_upload_image,
+    "nft.mint-offer": nft_mint_offer,
+    "nft.upload-mint-nft": nft_upload_mint,
+    "nft.upload-mint-nft-binary": nft_upload_mint_binary,
+    "nft.mint-batch": nft_mint_batch,
+}
+SCENARIOS: Dict[str, Scenario] = {**READ_SCENARIOS, **WRITE_SCENARIOS}
+
+
+def build_fixtures(
+    wallets: List[Wallet], nfts: int, image_size: int
+) -> services.Fixtures:
+    """
+    Build the ledger nfts and the IPFS files of the seeded wallets.
+
+    Every wallet holds an avatar, a profile and nfts listings. Half of the
+    profiles are minted inline, the others point at a pinned metadata file.
+
+    Args:
+        wallets (List[xrpl.wallet.Wallet]) : The seeded wallets.
+        nfts (int) : The number of listings per wallet.
+        image_size (int) : The size of the pinned images.
+
+    Returns:
+        benchmarks.services.Fixtures: The initial state of the services.
+    """
+    files: List[bytes] = []
+    tokens: List[Tuple[str, int, str]] = []
+
+    def pin(content: bytes, name: str) -> str:
+        files.append(content)
+        return f"{pinning.IPFS_GATEWAY_URL}/{fake_ipfs.content_id(content)}/{name}"
+
+    def mint(address: str, kind: nfts_metadata.NFTKind, **fields: Any) -> None:
+        meta_data = nfts_metadata.encode_metadata(kind, **fields)
+        tokens.append((address, nfts_metadata.TAXONS[kind], str_to_hex(meta_data)))
+
+    for index, wallet in enumerate(wallets):
+        address = wallet.classic_address
+        avatar_url = pin(os.urandom(image_size), "avatar.png")
+        mint(address, nfts_metadata.NFTKind.AVATAR, image_url=avatar_url)
+        if index % 2:
+            metadata_url = pin(f"Name {index},Bio {index}.".encode(), "profile.txt")
+            mint(address, nfts_metadata.NFTKind.PROFILE, metadata_url=metadata_url)
+        else:
+            mint(
+                address,
+                nfts_metadata.NFTKind.PROFILE,
+                first_name=f"Name {index}",
+                bio=f"Bio {index}.",
+            )
+        for item in range(nfts):
+            mint(
+                address,
+                nfts_metadata.NFTKind.LISTING,
+                author_avatar=avatar_url,
+                image_url=pin(os.urandom(image_size), "image.png"),
+                title=f"NFT {item}",
+                price=str(item + 1),
+            )
+    return services.Fixtures(tokens, files)
+
+
+def failed(response: httpx.Response) -> bool:
+    """
+    Check whether a request failed, the routes answering errors in the body
+    status_code with a 200 are counted as failed.
+
+    Args:
+        response (httpx.Response) : The response.
+
+    Returns:
+        bool: True if the request failed.
+    """
+    if response.status_code >= 400:
+        return True
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    status_code = body.get("status_code") if isinstance(body, dict) else None
+    return status_code is not None and int(status_code) >= 400
+
+
+async def seed(
+    app: FastAPI, client: httpx.AsyncClient, wallets: List[Wallet]
+) -> List[Account]:
+    """
+    Register the seeded wallets, log them in, queue a mint job per wallet and
+    sync the catalog with the ledger.
+
+    Args:
+        app (fastapi.FastAPI) : The started application.
+        client (httpx.AsyncClient) : A client of the application.
+        wallets (List[xrpl.wallet.Wallet]) : The seeded wallets.
+
+    Returns:
+        List[Account]: The seeded wallets, with their tokens and job ids.
+    """
+    await app.state.engine.save_all(
+        [
+            wallets_models.Wallet(
+                classic_address=wallet.classic_address, seed=wallet.seed
+            )
+            for wallet in wallets
+        ]
+    )
+    accounts = []
+    for wallet in wallets:
+        response = await client.post(
+            f"{API}/auth/login", json={"classic_address": wallet.classic_address}
+        )
+        token = response.json()["access_token"]
+        response = await client.post(
+            f"{API}/nft/mint-offer",
+            json={"picture": _picture_url(), "title": "NFT", "price": "10"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        accounts.append(Account(wallet, token, response.json()["job_id"]))
+        await nfts_indexer.sync_account(
+            app.state.engine,
+            app.state.ledger_client,
+            wallet.classic_address,
+            app.state.ipfs_fetcher,
+        )
+    return accounts
+
+
+async def run_scenario(
+    scenario: Scenario,
+    client: httpx.AsyncClient,
+    context: Context,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> stats.ScenarioStats:
+    """
+    Send the requests of a scenario from concurrent workers.
+
+    Args:
+        scenario (Scenario) : The scenario.
+        client (httpx.AsyncClient) : A client of the application.
+        context (Context) : The seeded state.
+        requests (int) : The number of measured requests.
+        concurrency (int) : The number of requests in flight.
+        warmup (int) : The number of requests sent before measuring.
+
+    Returns:
+        benchmarks.stats.ScenarioStats: The scenario summary.
+    """
+    for index in range(warmup):
+        await scenario(client, context, index)
+    indexes = iter(range(requests))
+    durations: List[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in indexes:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, context, warmup + index)
+                error = failed(response)
+            except Exception:
+                error = True
+            durations.append(time.perf_counter() - started)
+            errors += error
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats.ScenarioStats.from_durations(
+        durations, errors, time.perf_counter() - started
+    )
+
+
+async def run(
+    app: FastAPI,
+    wallets: List[Wallet],
+    scenarios: List[str],
+    requests: int,
+    write_requests: int,
+    concurrency: int,
+    warmup: int,
+    image_size: int,
+    on_result: Callable[[str, Dict[str, Any]], None],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Start the application, seed it, and run the scenarios one after another.
+
+    Args:
+        app (fastapi.FastAPI) : The application.
+        wallets (List[xrpl.wallet.Wallet]) : The wallets to seed.
+        scenarios (List[str]) : The names of the scenarios to run.
+        requests (int) : The number of requests of the read scenarios.
+        write_requests (int) : The number of requests of the write scenarios.
+        concurrency (int) : The number of requests in flight.
+        warmup (int) : The number of requests sent before measuring.
+        image_size (int) : The size of the uploaded images.
+        on_result (Callable[[str, Dict[str, Any]], None]) : Called with each
+            scenario summary once it has run.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The summaries by scenario.
+    """
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://benchmark") as client:
+            context = Context(await seed(app, client, wallets), image_size)
+            results = {}
+            for name in scenarios:
+                summary = (
+                    await run_scenario(
+                        SCENARIOS[name],
+                        client,
+                        context,
+                        write_requests if name in WRITE_SCENARIOS else requests,
+                        concurrency,
+                        warmup,
+                    )
+                ).to_dict()
+                results[name] = summary
+                on_result(name, summary)
+    finally:
+        await app.router.shutdown()
+    return results
+
+
+__all__ = [
+    "Account",
+    "Context",
+    "READ_SCENARIOS",
+    "SCENARIOS",
+    "WRITE_SCENARIOS",
+    "build_fixtures",
+    "failed",
+    "run",
+    "run_scenario",
+    "seed",
+]
@@ -0,0 +1,183 @@
+"""The benchmarks services module."""
+
+import asyncio
+import multiprocessing
+from multiprocessing.connection import (
+    Connection,
+)
+import socket
+from starlette.types import (
+    ASGIApp,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+import uvicorn
+
+from benchmarks import (
+    fake_ipfs,
+    fake_ledger,
+    fake_mongo,
+)
+
+
+class Latencies(NamedTuple):
+    """
+    The latencies injected in the stand-in services, in seconds.
+
+    Args:
+        ledger (float) : Added to every XRPL JSON RPC request.
+        ipfs (float) : Added to every IPFS gateway request.
+        pinata (float) : Added to every Pinata pin.
+        mongodb (float) : Added to every MongoDB command.
+    """
+
+    ledger: float = 0
+    ipfs: float = 0
+    pinata: float = 0
+    mongodb: float = 0
+
+
+class Fixtures(NamedTuple):
+    """
+    The initial state of the stand-in services.
+
+    Args:
+        nfts (List[Tuple[str, int, str]]) : The issuer, taxon and hex URI of
+            the nfts of the ledger.
+        files (List[bytes]) : The files pinned to the IPFS gateway.
+    """
+
+    nfts: List[Tuple[str, int, str]]
+    files: List[bytes]
+
+
+async def _serve_http(app: ASGIApp) -> Tuple[uvicorn.Server, "asyncio.Task[None]", str]:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app, log_level="warning", lifespan="off", access_log=False, backlog=4096
+        )
+    )
+    # the signals are handled by the benchmark process
+    server.install_signal_handlers = lambda: None  # type: ignore
+    task = asyncio.get_event_loop().create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+async def _run(
+    latencies: Latencies, close_interval: float, connection: Connection
+) -> None:
+    loop = asyncio.get_event_loop()
+    ledger = fake_ledger.FakeLedger(latencies.ledger, close_interval)
+    ipfs = fake_ipfs.FakeIPFS(latencies.ipfs, latencies.pinata)
+    mongo = fake_mongo.FakeMongo(latencies.mongodb)
+    await mongo.start()
+    ledger_server, ledger_task, ledger_url = await _serve_http(ledger)
+    ipfs_server, ipfs_task, ipfs_url = await _serve_http(ipfs)
+    connection.send(
+        {
+            "XRPL_JSON_RPC_URL": ledger_url,
+            "PINATA_API_URL": ipfs_url,
+            "IPFS_GATEWAY_URL": f"{ipfs_url}/ipfs",
+            "MONGODB_URL": f"mongodb://127.0.0.1:{mongo.port}/xrpl",
+        }
+    )
+    fixtures: Fixtures = await loop.run_in_executor(None, connection.recv)
+    for issuer, taxon, uri in fixtures.nfts:
+        ledger.mint(issuer, taxon, uri)
+    for content in fixtures.files:
+        ipfs.pin(content)
+    connection.send(len(fixtures.nfts))
+    # block until the benchmark is over
+    await loop.run_in_executor(None, connection.recv)
+    connection.send(
+        {
+            "ledger": dict(ledger.requests),
+            "ipfs": dict(ipfs.requests),
+            "mongodb": {"commands": mongo.commands},
+        }
+    )
+    ledger_server.should_exit = True
+    ipfs_server.should_exit = True
+    await asyncio.gather(ledger_task, ipfs_task)
+    await mongo.stop()
+
+
+def _main(latencies: Latencies, close_interval: float, connection: Connection) -> None:
+    asyncio.run(_run(latencies, close_interval, connection))
+
+
+class Services:
+    """
+    Runs the XRPL, IPFS, Pinata and MongoDB stand-ins in a child process, so
+    their work isn't measured as the application's.
+
+    Args:
+        latencies (Latencies) : The injected latencies.
+        close_interval (float) : The number of seconds between two ledgers.
+    """
+
+    def __init__(self, latencies: Latencies, close_interval: float) -> None:
+        self.latencies = latencies
+        self.close_interval = close_interval
+        self.connection: Optional[Connection] = None
+        self.process: Optional[Any] = None
+
+    def start(self) -> Dict[str, str]:
+        """
+        Start the services.
+
+        Returns:
+            Dict[str, str]: The settings pointing the application at them.
+        """
+        context = multiprocessing.get_context("spawn")
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_main,
+            args=(self.latencies, self.close_interval, child_connection),
+            daemon=True,
+        )
+        self.process.start()
+        urls: Dict[str, str] = self.connection.recv()
+        return urls
+
+    def load(self, fixtures: Fixtures) -> None:
+        """
+        Load the initial state of the services.
+
+        Args:
+            fixtures (Fixtures) : The ledger nfts and the pinned files.
+        """
+        assert self.connection is not None
+        self.connection.send(fixtures)
+        self.connection.recv()
+
+    def stop(self) -> Dict[str, Any]:
+        """
+        Stop the services.
+
+        Returns:
+            Dict[str, Any]: The number of requests each service received.
+        """
+        assert self.connection is not None and self.process is not None
+        self.connection.send("stop")
+        counts: Dict[str, Any] = self.connection.recv()
+        self.process.join(10)
+        return counts
+
+
+__all__ = [
+    "Fixtures",
+    "Latencies",
+    "Services",
+]
@@ -0,0 +1,175 @@
+"""The benchmarks stats module."""
+
+import json
+import math
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(durations: List[float], rank: float) -> float:
+    """
+    Compute a nearest-rank percentile.
+
+    Args:
+        durations (List[float]) : The sorted durations.
+        rank (float) : The percentile, between 0 and 100.
+
+    Returns:
+        float: The percentile, 0 without durations.
+    """
+    if not durations:
+        return 0.0
+    index = max(math.ceil(rank / 100 * len(durations)) - 1, 0)
+    return durations[index]
+
+
+class ScenarioStats(NamedTuple):
+    """
+    The summary of the requests of a scenario.
+
+    Args:
+        requests (int) : The number of measured requests.
+        errors (int) : The number of failed requests.
+        elapsed (float) : The wall clock seconds of the scenario.
+        durations (List[float]) : The sorted request durations in seconds.
+    """
+
+    requests: int
+    errors: int
+    elapsed: float
+    durations: List[float]
+
+    @classmethod
+    def from_durations(
+        cls, durations: List[float], errors: int, elapsed: float
+    ) -> "ScenarioStats":
+        """
+        Summarize the requests of a scenario.
+
+        Args:
+            durations (List[float]) : The request durations in seconds.
+            errors (int) : The number of failed requests.
+            elapsed (float) : The wall clock seconds of the scenario.
+
+        Returns:
+            ScenarioStats: The scenario summary.
+        """
+        return cls(len(durations), errors, elapsed, sorted(durations))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the summary to milliseconds and requests per second.
+
+        Returns:
+            Dict[str, Any]: The summary, as saved in baselines.
+        """
+        summary: Dict[str, Any] = {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput": round(self.requests / self.elapsed, 2)
+            if self.elapsed
+            else 0.0,
+            "mean": round(sum(self.durations) / self.requests * 1000, 3)
+            if self.requests
+            else 0.0,
+            "max": round(self.durations[-1] * 1000, 3) if self.durations else 0.0,
+        }
+        for rank in PERCENTILES:
+            summary[f"p{rank}"] = round(percentile(self.durations, rank) * 1000, 3)
+        return summary
+
+
+def format_report(results: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Format the scenario summaries as a table.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]) : The summaries by scenario.
+
+    Returns:
+        str: The report, the durations are in milliseconds.
+    """
+    columns = ("requests", "errors", "throughput", "p50", "p95", "p99", "mean", "max")
+    width = max([len("scenario"), *map(len, results)])
+    lines = ["scenario".ljust(width) + "".join(f"{column:>12}" for column in columns)]
+    for name, summary in results.items():
+        lines.append(
+            name.ljust(width) + "".join(f"{summary[column]:>12}" for column in columns)
+        )
+    return "\n".join(lines)
+
+
+def save_baseline(path: str, baseline: Dict[str, Any]) -> None:
+    """
+    Save a benchmark run as a baseline.
+
+    Args:
+        path (str) : The baseline JSON file.
+        baseline (Dict[str, Any]) : The run parameters and summaries.
+    """
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    """
+    Load a baseline saved by save_baseline.
+
+    Args:
+        path (str) : The baseline JSON file.
+
+    Returns:
+        Dict[str, Any]: The run parameters and summaries.
+    """
+    with open(path) as file:
+        baseline: Dict[str, Any] = json.load(file)
+    return baseline
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    max_regression: float,
+) -> List[str]:
+    """
+    Compare the p95 of each scenario with a baseline.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]) : The summaries by scenario.
+        baseline (Dict[str, Dict[str, Any]]) : The baseline summaries by
+            scenario.
+        max_regression (float) : The tolerated p95 increase, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: One line per scenario, the regressions start with
+            "REGRESSION".
+    """
+    lines = []
+    for name, summary in results.items():
+        if name not in baseline:
+            lines.append(f"{name}: not in the baseline")
+            continue
+        before, after = baseline[name]["p95"], summary["p95"]
+        change = (after - before) / before if before else 0.0
+        line = f"{name}: p95 {before}ms -> {after}ms ({change:+.1%})"
+        if change > max_regression:
+            line = f"REGRESSION {line}"
+        lines.append(line)
+    return lines
+
+
+__all__ = [
+    "ScenarioStats",
+    "compare",
+    "format_report",
+    "load_baseline",
+    "percentile",
+    "save_baseline",
+]
@@ -0,0 +1,20 @@
+"""The tests helpers module."""
+
+import asyncio
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+)
+
+
+def run(test: Callable[..., Coroutine[Any, Any, None]], *args: Any) -> None:
+    """
+    Run an async test in a new event loop.
+
+    Args:
+        test (Callable[..., Coroutine[Any, Any, None]]) : The test coroutine
+            function.
+        args (Any) : The arguments of the test.
+    """
+    asyncio.run(test(*args))
@@ -0,0 +1,204 @@
+"""The cache backends tests."""
+
+import asyncio
+from contextlib import (
+    asynccontextmanager,
+)
+from prometheus_client import (
+    REGISTRY,
+)
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from app.utils import (
+    cache,
+    resp,
+)
+from tests.helpers import (
+    run,
+)
+
+
+class RESPStandIn:
+    """
+    A local server speaking enough of the Redis protocol for the cache
+    backend: GET, SET with PX, DEL, AUTH, SELECT and PING.
+    """
+
+    def __init__(self, password: Optional[str] = None) -> None:
+        self.password = password
+        self.values: Dict[bytes, Tuple[bytes, float]] = {}
+        self.commands: List[List[bytes]] = []
+        self.server: Optional[asyncio.Server] = None
+
+    @property
+    def port(self) -> int:
+        assert self.server is not None
+        port: int = self.server.sockets[0].getsockname()[1]
+        return port
+
+    def reply(self, command: List[bytes]) -> bytes:
+        name = command[0].upper()
+        if name == b"AUTH":
+            if command[1].decode() != self.password:
+                return b"-WRONGPASS invalid password\r\n"
+            return b"+OK\r\n"
+        if name in (b"SELECT", b"PING"):
+            return b"+OK\r\n"
+        if name == b"GET":
+            value, expires_at = self.values.get(command[1], (b"", 0.0))
+            if expires_at <= time.time():
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == b"SET":
+            ttl = float("inf")
+            if len(command) == 5 and command[3].upper() == b"PX":
+                ttl = int(command[4]) / 1000
+            self.values[command[1]] = (command[2], time.time() + ttl)
+            return b"+OK\r\n"
+        if name == b"DEL":
+            return b":%d\r\n" % int(self.values.pop(command[1], None) is not None)
+        return b"-ERR unknown command\r\n"
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        while True:
+            try:
+                command = await resp.read_reply(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                break
+            self.commands.append(command)
+            writer.write(self.reply(command))
+            await writer.drain()
+        writer.close()
+
+    async def __aenter__(self) -> "RESPStandIn":
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def counters(backend: str) -> Dict[str, float]:
+    samples = {
+        "hits": ("cache_requests_total", {"backend": backend, "result": "hit"}),
+        "misses": ("cache_requests_total", {"backend": backend, "result": "miss"}),
+        "errors": ("cache_errors_total", None),
+    }
+    values = {}
+    for name, (metric, labels) in samples.items():
+        if labels is None:
+            values[name] = sum(
+                sample.value
+                for family in REGISTRY.collect()
+                for sample in family.samples
+                if sample.name == metric and sample.labels.get("backend") == backend
+            )
+        else:
+            values[name] = REGISTRY.get_sample_value(metric, labels) or 0.0
+    return values
+
+
+def increments(before: Dict[str, float], backend: str) -> Dict[str, float]:
+    return {name: value - before[name] for name, value in counters(backend).items()}
+
+
+def test_encode_command() -> None:
+    assert resp.encode_command("SET", "key", b"\r\n", 10) == (
+        b"*4\r\n$3\r\nSET\r\n$3\r\nkey\r\n$2\r\n\r\n\r\n$2\r\n10\r\n"
+    )
+
+
+def test_memory_backend_counts_hits_and_misses() -> None:
+    async def test() -> None:
+        backend = cache.MemoryCacheBackend(max_size=2)
+        before = counters("memory")
+        assert await backend.get("missing") is None
+        await backend.set("key", b"value")
+        assert await backend.get("key") == b"value"
+        await backend.set("expired", b"value", ttl=-1)
+        assert await backend.get("expired") is None
+        await backend.delete("key")
+        assert await backend.get("key") is None
+        assert increments(before, "memory") == {"hits": 1, "misses": 3, "errors": 0}
+        assert not backend.shared
+
+    run(test)
+
+
+@asynccontextmanager
+async def redis_backend(
+    password: Optional[str] = None,
+) -> AsyncIterator[Tuple[RESPStandIn, cache.RedisCacheBackend]]:
+    async with RESPStandIn(password) as stand_in:
+        client = resp.RESPClient(
+            "127.0.0.1", stand_in.port, db=2, password=password, timeout=1
+        )
+        backend = cache.RedisCacheBackend(client, "test:")
+        try:
+            yield stand_in, backend
+        finally:
+            await backend.close()
+
+
+def test_redis_backend_against_stand_in() -> None:
+    async def test() -> None:
+        async with redis_backend("secret") as (stand_in, backend):
+            before = counters("redis")
+            assert await backend.get("key") is None
+            await backend.set("key", b"\x00binary\r\nvalue")
+            assert await backend.get("key") == b"\x00binary\r\nvalue"
+            await backend.set("short", b"value", ttl=0.05)
+            assert await backend.get("short") == b"value"
+            await asyncio.sleep(0.1)
+            assert await backend.get("short") is None
+            await backend.delete("key")
+            assert await backend.get("key") is None
+            assert increments(before, "redis") == {
+                "hits": 2,
+                "misses": 3,
+                "errors": 0,
+            }
+            assert backend.shared
+            # the connection is authenticated, selected, then reused
+            assert stand_in.commands[:2] == [[b"AUTH", b"secret"], [b"SELECT", b"2"]]
+            assert [b"SET", b"test:short", b"value", b"PX", b"50"] in stand_in.commands
+            assert len(backend.client.idle) == 1
+
+    run(test)
+
+
+def test_redis_backend_counts_unreachable_server_as_miss() -> None:
+    async def test() -> None:
+        async with RESPStandIn() as stand_in:
+            port = stand_in.port
+        backend = cache.RedisCacheBackend(
+            resp.RESPClient("127.0.0.1", port, timeout=1), "test:"
+        )
+        before = counters("redis")
+        await backend.set("key", b"value")
+        assert await backend.get("key") is None
+        assert increments(before, "redis") == {"hits": 0, "misses": 1, "errors": 2}
+
+    run(test)
+
+
+def test_resp_client_from_url() -> None:
+    client = resp.RESPClient.from_url("redis://:secret@cache.local:6380/3")
+    assert (client.host, client.port, client.db, client.password) == (
+        "cache.local",
+        6380,
+        3,
+        "secret",
+    )
@@ -0,0 +1,133 @@
+"""The cid module tests."""
+
+import pytest
+
+import asyncio
+import hashlib
+from typing import (
+    AsyncIterator,
+    List,
+    Tuple,
+)
+
+from app.utils import (
+    cid,
+)
+
+# a reference dag-pb encoding, built top down the way the go-ipfs balanced
+# layout fills its nodes
+Reference = Tuple[bytes, int, int]
+
+
+def varint(value: int) -> bytes:
+    encoded = b""
+    while True:
+        byte, value = value & 0x7F, value >> 7
+        if not value:
+            return encoded + bytes([byte])
+        encoded += bytes([byte | 0x80])
+
+
+def length_delimited(tag: int, value: bytes) -> bytes:
+    return bytes([tag]) + varint(len(value)) + value
+
+
+def reference_node(children: List[Reference], data: bytes, size: int) -> Reference:
+    unixfs = b"\x08\x02" + (length_delimited(0x12, data) if data else b"")
+    unixfs += b"\x18" + varint(size)
+    unixfs += b"".join(b"\x20" + varint(child[2]) for child in children)
+    block = b"".join(
+        length_delimited(
+            0x12,
+            length_delimited(0x0A, child[0])
+            + length_delimited(0x12, b"")
+            + b"\x18"
+            + varint(child[1]),
+        )
+        for child in children
+    )
+    block += length_delimited(0x0A, unixfs)
+    multihash = b"\x12\x20" + hashlib.sha256(block).digest()
+    return multihash, len(block) + sum(child[1] for child in children), size
+
+
+def reference_cid(content: bytes) -> str:
+    chunks = [
+        content[start : start + cid.CHUNK_SIZE]  # noqa: E203
+        for start in range(0, len(content), cid.CHUNK_SIZE)
+    ] or [b""]
+    leaves = [reference_node([], chunk, len(chunk)) for chunk in chunks]
+
+    def fill(leaves: List[Reference], depth: int) -> Reference:
+        if depth == 0:
+            return leaves[0]
+        width = cid.MAX_LINKS ** (depth - 1)
+        children = [
+            fill(leaves[start : start + width], depth - 1)  # noqa: E203
+            for start in range(0, len(leaves), width)
+        ]
+        return reference_node(children, b"", sum(child[2] for child in children))
+
+    depth = 0
+    while cid.MAX_LINKS**depth < len(leaves):
+        depth += 1
+    return cid._base58(fill(leaves, depth)[0])
+
+
+def compute(content: bytes, read_size: int) -> str:
+    async def chunks() -> AsyncIterator[bytes]:
+        for start in range(0, len(content), read_size):
+            yield content[start : start + read_size]  # noqa: E203
+
+    return asyncio.run(cid.compute_cid(chunks()))
+
+
+def pattern(size: int) -> bytes:
+    block = bytes(range(251))
+    return (block * (size // len(block) + 1))[:size]
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (b"", "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH"),
+        (b"hello world", "Qmf412jQZiuVUtdgnB36FXFX7xg5V6KEbSJ4dpQuhkLyfD"),
+    ],
+)
+def test_known_cids(content: bytes, expected: str) -> None:
+    assert compute(content, 4) == expected
+    assert reference_cid(content) == expected
+
+
+@pytest.mark.parametrize(
+    "size",
+    [
+        cid.CHUNK_SIZE,
+        cid.CHUNK_SIZE + 1,
+        3 * cid.CHUNK_SIZE + 1000,
+        # the first file needing a second level of parents
+        cid.MAX_LINKS * cid.CHUNK_SIZE + 1,
+    ],
+)
+def test_large_files(size: int) -> None:
+    content = pattern(size)
+    expected = reference_cid(content)
+    assert compute(content, 100000) == expected
+    assert compute(content, 3 * cid.CHUNK_SIZE) == expected
+
+
+@pytest.mark.parametrize("leaves", [5, 16, 17, 64, 65])
+def test_multi_level_dags(monkeypatch: pytest.MonkeyPatch, leaves: int) -> None:
+    # small chunks and fan out keep the deep dags quick to build
+    monkeypatch.setattr(cid, "CHUNK_SIZE", 16)
+    monkeypatch.setattr(cid, "MAX_LINKS", 4)
+    content = pattern(16 * leaves - 3)
+    assert compute(content, 7) == reference_cid(content)
+
+
+def test_builder_reuse() -> None:
+    builder = cid.CIDBuilder()
+    builder.update(b"hello ")
+    assert builder.cid() == compute(b"hello ", 6)
+    builder.update(b"world")
+    assert builder.cid() == "Qmf412jQZiuVUtdgnB36FXFX7xg5V6KEbSJ4dpQuhkLyfD"
@@ -0,0 +1,230 @@
+"""The etag middleware tests."""
+
+import pytest
+
+import asyncio
+import httpx
+from starlette.applications import (
+    Starlette,
+)
+from starlette.datastructures import (
+    Headers,
+)
+from starlette.middleware import (
+    Middleware,
+)
+from starlette.requests import (
+    Request,
+)
+from starlette.responses import (
+    JSONResponse,
+)
+from starlette.routing import (
+    Route,
+)
+from starlette.types import (
+    Scope,
+)
+from types import (
+    SimpleNamespace,
+)
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Optional,
+)
+
+from app.utils import (
+    cache,
+    etag,
+)
+from tests.helpers import (
+    run,
+)
+
+TOKEN = "Bearer valid"
+
+
+class Backend:
+    """
+    The state served by the wrapped application.
+    """
+
+    def __init__(self) -> None:
+        self.value = "first"
+        self.status_code = 200
+        self.calls = 0
+        self.authorized = True
+
+    async def items(self, request: Request) -> JSONResponse:
+        self.calls += 1
+        return JSONResponse({"value": self.value}, status_code=self.status_code)
+
+    async def private(self, request: Request) -> JSONResponse:
+        self.calls += 1
+        if request.headers.get("authorization") != TOKEN or not self.authorized:
+            return JSONResponse({"detail": "Unauthorized Wallet!"}, status_code=401)
+        return JSONResponse({"value": self.value})
+
+    async def authorize(self, scope: Scope) -> bool:
+        return Headers(scope=scope).get("authorization") == TOKEN and self.authorized
+
+
+def build(backend: Backend) -> Starlette:
+    app = Starlette(
+        routes=[Route("/items", backend.items), Route("/private", backend.private)],
+        middleware=[
+            Middleware(
+                etag.ConditionalGetMiddleware,
+                paths=["/items"],
+                authenticated_paths=["/private"],
+                authorize=backend.authorize,
+                stale_ttl=30,
+            )
+        ],
+    )
+    app.state.cache_backend = cache.MemoryCacheBackend(max_size=16)
+    app.state.ledger_watcher = SimpleNamespace(validated_index=1)
+    return app
+
+
+def serve(
+    test: Callable[[Backend, Starlette, httpx.AsyncClient], Coroutine[Any, Any, None]]
+) -> None:
+    async def main() -> None:
+        backend = Backend()
+        app = build(backend)
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            await test(backend, app, client)
+
+    run(main)
+
+
+async def wait_for_calls(backend: Backend, calls: int) -> None:
+    for _ in range(100):
+        if backend.calls >= calls:
+            # let the refresh store the rebuilt response
+            await asyncio.sleep(0.01)
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("The response hasn't been refreshed!")
+
+
+@pytest.mark.parametrize(
+    "if_none_match, etag_value, expected",
+    [
+        (None, '"1-abc"', False),
+        ("", '"1-abc"', False),
+        ("*", '"1-abc"', True),
+        ('"1-abc"', '"1-abc"', True),
+        ('W/"1-abc"', '"1-abc"', True),
+        ('"0-def", "1-abc"', '"1-abc"', True),
+        ('"1-abd"', '"1-abc"', False),
+    ],
+)
+def test_etag_matches(
+    if_none_match: Optional[str], etag_value: str, expected: bool
+) -> None:
+    assert etag.etag_matches(if_none_match, etag_value) is expected
+
+
+def test_cached_response_and_not_modified() -> None:
+    async def test(backend: Backend, app: Starlette, client: httpx.AsyncClient) -> None:
+        response = await client.get("/items")
+        assert response.status_code == 200
+        assert response.json() == {"value": "first"}
+        tag = response.headers["etag"]
+        response = await client.get("/items", headers={"If-None-Match": tag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == tag
+        response = await client.get("/items")
+        assert response.status_code == 200
+        assert response.json() == {"value": "first"}
+        assert backend.calls == 1
+
+    serve(test)
+
+
+def test_stale_while_revalidate() -> None:
+    async def test(backend: Backend, app: Starlette, client: httpx.AsyncClient) -> None:
+        tag = (await client.get("/items")).headers["etag"]
+        # a new ledger that didn't change the body keeps the ETag
+        app.state.ledger_watcher.validated_index = 2
+        response = await client.get("/items", headers={"If-None-Match": tag})
+        assert response.status_code == 304
+        await wait_for_calls(backend, 2)
+        response = await client.get("/items", headers={"If-None-Match": tag})
+        assert response.status_code == 304
+        assert backend.calls == 2
+        # the stale body is served while it is rebuilt
+        backend.value = "second"
+        app.state.ledger_watcher.validated_index = 3
+        response = await client.get("/items")
+        assert response.json() == {"value": "first"}
+        await wait_for_calls(backend, 3)
+        response = await client.get("/items", headers={"If-None-Match": tag})
+        assert response.status_code == 200
+        assert response.json() == {"value": "second"}
+        assert response.headers["etag"] != tag
+        assert backend.calls == 3
+
+    serve(test)
+
+
+def test_failed_refresh_evicts_the_response() -> None:
+    async def test(backend: Backend, app: Starlette, client: httpx.AsyncClient) -> None:
+        await client.get("/items")
+        backend.status_code = 500
+        app.state.ledger_watcher.validated_index = 2
+        assert (await client.get("/items")).status_code == 200
+        await wait_for_calls(backend, 2)
+        assert (await client.get("/items")).status_code == 500
+        assert backend.calls == 3
+
+    serve(test)
+
+
+def test_errors_are_not_cached() -> None:
+    async def test(backend: Backend, app: Starlette, client: httpx.AsyncClient) -> None:
+        backend.status_code = 500
+        assert (await client.get("/items")).status_code == 500
+        assert (await client.get("/items")).status_code == 500
+        assert backend.calls == 2
+
+    serve(test)
+
+
+def test_authenticated_path_is_authorized_before_serving_the_cache() -> None:
+    async def test(backend: Backend, app: Starlette, client: httpx.AsyncClient) -> None:
+        headers: Dict[str, str] = {"Authorization": TOKEN}
+        response = await client.get("/private", headers=headers)
+        assert response.status_code == 200
+        tag = response.headers["etag"]
+        assert (await client.get("/private", headers=headers)).status_code == 200
+        assert backend.calls == 1
+        # never served to another Authorization header
+        response = await client.get("/private", headers={"Authorization": "Bearer x"})
+        assert response.status_code == 401
+        # nor once the token is rejected, even with a current ETag
+        backend.authorized = False
+        response = await client.get(
+            "/private", headers={**headers, "If-None-Match": tag}
+        )
+        assert response.status_code == 401
+        assert backend.calls == 3
+        # the rejected response has been evicted
+        backend.authorized = True
+        assert (await client.get("/private", headers=headers)).status_code == 200
+        assert backend.calls == 4
+
+    serve(test)
+
+
+def test_authenticated_paths_require_authorize() -> None:
+    with pytest.raises(ValueError):
+        etag.ConditionalGetMiddleware(
+            Starlette(), paths=[], authenticated_paths=["/private"]
+        )
@@ -0,0 +1,86 @@
+"""The ipfs module tests."""
+
+import pytest
+
+import asyncio
+import httpx
+import os
+import pathlib
+from typing import (
+    List,
+)
+
+from app.utils import (
+    ipfs,
+)
+from tests.helpers import (
+    run,
+)
+
+URL = "https://gateway.local/ipfs/QmCID/metadata.json"
+
+
+def test_memory_tier_evicts_the_least_recently_used_contents() -> None:
+    async def test() -> None:
+        metadata_cache = ipfs.MetadataCache(max_bytes=10)
+        await metadata_cache.set("a", b"aaaa")
+        await metadata_cache.set("b", b"bbbb")
+        assert await metadata_cache.get("a") == b"aaaa"
+        await metadata_cache.set("c", b"cccc")
+        assert list(metadata_cache.entries) == ["a", "c"]
+        assert metadata_cache.size == 8
+        assert await metadata_cache.get("b") is None
+        # a content over the budget is never kept in memory
+        await metadata_cache.set("d", b"d" * 11)
+        assert list(metadata_cache.entries) == ["a", "c"]
+        assert await metadata_cache.get("d") is None
+
+    run(test)
+
+
+def test_disk_tier_contents_are_promoted_to_memory(tmp_path: pathlib.Path) -> None:
+    async def test() -> None:
+        directory = str(tmp_path / "ipfs")
+        await ipfs.MetadataCache(max_bytes=10, directory=directory).set("a", b"aaaa")
+        # a new process only finds the content on disk
+        metadata_cache = ipfs.MetadataCache(max_bytes=10, directory=directory)
+        assert metadata_cache.entries == {}
+        assert await metadata_cache.get("a") == b"aaaa"
+        assert list(metadata_cache.entries) == ["a"]
+        assert metadata_cache.size == 4
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        assert await metadata_cache.get("a") == b"aaaa"
+
+    run(test)
+
+
+@pytest.mark.parametrize("directory", [False, True])
+def test_concurrent_fetches_share_a_single_download(
+    directory: bool, tmp_path: pathlib.Path
+) -> None:
+    async def test() -> None:
+        downloads: List[str] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            downloads.append(str(request.url))
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, content=b'{"name": "nft"}')
+
+        metadata_cache = ipfs.MetadataCache(
+            max_bytes=1024, directory=str(tmp_path) if directory else None
+        )
+        fetcher = ipfs.IPFSFetcher(
+            httpx.AsyncClient(transport=httpx.MockTransport(handler)), metadata_cache
+        )
+        try:
+            contents = await asyncio.gather(*(fetcher.fetch(URL) for _ in range(5)))
+            assert contents == [b'{"name": "nft"}'] * 5
+            assert downloads == [URL]
+            # the content is then served from the cache
+            assert await fetcher.fetch_text(URL) == '{"name": "nft"}'
+            assert downloads == [URL]
+        finally:
+            await fetcher.close()
+
+    run(test)
@@ -0,0 +1,103 @@
+"""The ledger module tests."""
+
+import asyncio
+import httpx
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+from xrpl.asyncio.clients import (
+    AsyncJsonRpcClient,
+)
+from xrpl.models.requests import (
+    ServerInfo,
+)
+from xrpl.models.requests.request import (
+    Request,
+)
+from xrpl.models.response import (
+    Response,
+    ResponseStatus,
+)
+
+from app.utils import (
+    ledger,
+)
+from tests.helpers import (
+    run,
+)
+
+
+class AccountNFTsStandIn(AsyncJsonRpcClient):
+    """
+    A ledger serving the AccountNFTs pages of an account, while a new ledger
+    closes after every page.
+    """
+
+    def __init__(self, nft_count: int) -> None:
+        super().__init__("http://ledger.local")
+        self.nfts = [{"NFTokenID": f"{index:064X}"} for index in range(nft_count)]
+        self.validated_index = 100
+        self.params: List[Dict[str, Any]] = []
+
+    async def request_impl(self, request: Request) -> Response:
+        params = request.to_dict()
+        self.params.append(params)
+        ledger_index = params["ledger_index"]
+        if ledger_index == "validated":
+            ledger_index = self.validated_index
+        self.validated_index += 1
+        start = params.get("marker") or 0
+        end = start + params["limit"]
+        result: Dict[str, Any] = {
+            "account_nfts": self.nfts[start:end],
+            "ledger_index": ledger_index,
+            "validated": True,
+        }
+        if end < len(self.nfts):
+            result["marker"] = end
+        return Response(status=ResponseStatus.SUCCESS, result=result)
+
+
+def test_iter_account_nfts_reads_a_single_ledger() -> None:
+    async def test() -> None:
+        client = AccountNFTsStandIn(5)
+        nft_tokens = await ledger.get_account_nfts("rAccount", client, limit=2)
+        assert nft_tokens == client.nfts
+        assert [params["ledger_index"] for params in client.params] == [
+            "validated",
+            100,
+            100,
+        ]
+        assert [params.get("marker") for params in client.params] == [None, 2, 4]
+
+    run(test)
+
+
+def test_coalesced_requests_are_keyed_by_the_validated_ledger() -> None:
+    async def test() -> None:
+        calls: List[bytes] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.read())
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"result": {"status": "success"}})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            client = ledger.PooledJsonRpcClient("http://ledger.local", http)
+            client.watcher = ledger.LedgerWatcher(client, interval=1)
+            client.watcher.validated_index = 1
+            first = asyncio.ensure_future(client.request(ServerInfo()))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(client.request(ServerInfo()))
+            await asyncio.sleep(0)
+            # a request made once a new ledger is validated isn't shared
+            client.watcher.validated_index = 2
+            third = asyncio.ensure_future(client.request(ServerInfo()))
+            responses = await asyncio.gather(first, second, third)
+            assert responses[0] is responses[1]
+            assert responses[2] is not responses[0]
+            assert len(calls) == 2
+
+    run(test)
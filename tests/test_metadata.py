@@ -0,0 +1,114 @@
+"""The nfts metadata module tests."""
+
+import pytest
+
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+from xrpl.utils import (
+    str_to_hex,
+)
+
+from app.nfts import (
+    metadata as nfts_metadata,
+)
+
+IMAGE_URL = "https://ipfs.io/ipfs/QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG/tmp"
+AVATAR_URL = "https://ipfs.io/ipfs/QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH/a"
+
+
+def token(meta_data: str, taxon: int = nfts_metadata.LEGACY_TAXON) -> Dict[str, Any]:
+    return {"NFTokenTaxon": taxon, "URI": str_to_hex(meta_data)}
+
+
+def test_parse_legacy_listing() -> None:
+    nft_metadata = nfts_metadata.parse_nft_token(
+        token(f"{AVATAR_URL},{IMAGE_URL},My title,10")
+    )
+    assert nft_metadata == nfts_metadata.NFTMetadata(
+        nfts_metadata.NFTKind.LISTING,
+        0,
+        {
+            "author_avatar": AVATAR_URL,
+            "image_url": IMAGE_URL,
+            "title": "My title",
+            "price": "10",
+        },
+    )
+
+
+@pytest.mark.parametrize("image_url", [IMAGE_URL, f"{IMAGE_URL}.png"])
+def test_parse_legacy_listing_without_author_avatar(image_url: str) -> None:
+    nft_metadata = nfts_metadata.parse_nft_token(token(f"{image_url},My title,10"))
+    assert nft_metadata == nfts_metadata.NFTMetadata(
+        nfts_metadata.NFTKind.LISTING,
+        0,
+        {
+            "author_avatar": None,
+            "image_url": image_url,
+            "title": "My title",
+            "price": "10",
+        },
+    )
+
+
+def test_parse_legacy_avatar() -> None:
+    nft_metadata = nfts_metadata.parse_nft_token(token(f"{AVATAR_URL}.png"))
+    assert nft_metadata == nfts_metadata.NFTMetadata(
+        nfts_metadata.NFTKind.AVATAR, 0, {"image_url": AVATAR_URL}
+    )
+
+
+def test_parse_legacy_profile() -> None:
+    nft_metadata = nfts_metadata.parse_nft_token(token(IMAGE_URL))
+    assert nft_metadata == nfts_metadata.NFTMetadata(
+        nfts_metadata.NFTKind.PROFILE,
+        0,
+        {"first_name": None, "bio": None, "metadata_url": IMAGE_URL},
+    )
+
+
+@pytest.mark.parametrize("meta_data", ["", "hello", "a,b", "a,b,c,d,e"])
+def test_parse_legacy_foreign_token(meta_data: str) -> None:
+    assert nfts_metadata.parse_nft_token(token(meta_data)) is None
+
+
+@pytest.mark.parametrize(
+    "kind, fields",
+    [
+        (
+            nfts_metadata.NFTKind.LISTING,
+            {
+                "author_avatar": AVATAR_URL,
+                "image_url": IMAGE_URL,
+                "title": "Titre, été",
+                "price": "10",
+            },
+        ),
+        (nfts_metadata.NFTKind.AVATAR, {"image_url": AVATAR_URL}),
+        (
+            nfts_metadata.NFTKind.PROFILE,
+            {"first_name": "Jane", "bio": "Bio, with a comma.", "metadata_url": None},
+        ),
+    ],
+)
+def test_versioned_round_trip(
+    kind: nfts_metadata.NFTKind, fields: Dict[str, Optional[str]]
+) -> None:
+    meta_data = nfts_metadata.encode_metadata(kind, **fields)
+    assert "https://" not in meta_data
+    nft_metadata = nfts_metadata.parse_nft_token(
+        token(meta_data, nfts_metadata.TAXONS[kind])
+    )
+    assert nft_metadata == nfts_metadata.NFTMetadata(
+        kind, nfts_metadata.METADATA_VERSION, fields
+    )
+
+
+def test_encode_metadata_too_large() -> None:
+    with pytest.raises(nfts_metadata.MetadataTooLargeError):
+        nfts_metadata.encode_metadata(
+            nfts_metadata.NFTKind.PROFILE, first_name="a" * 300, bio=""
+        )
@@ -0,0 +1,38 @@
+"""The pinning module tests."""
+
+import pytest
+
+import asyncio
+import base64
+import binascii
+from typing import (
+    List,
+)
+
+from app.utils import (
+    pinning,
+)
+
+
+def decode(data: str, chunk_size: int) -> bytes:
+    async def collect() -> List[bytes]:
+        return [chunk async for chunk in pinning.iter_base64(data, chunk_size)]
+
+    return b"".join(asyncio.run(collect()))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+def test_iter_base64(chunk_size: int) -> None:
+    content = bytes(range(256)) * 3 + b"end"
+    encoded = base64.b64encode(content).decode()
+    assert decode(encoded, chunk_size) == content
+    # line breaks are ignored
+    lines = [encoded[start:][:76] for start in range(0, len(encoded), 76)]
+    wrapped = "\n".join(lines)
+    assert decode(wrapped, chunk_size) == content
+
+
+@pytest.mark.parametrize("data", ["aGVsbG8*", "aGVs!G8=", "aGVsbG8=aGVsbG8="])
+def test_iter_base64_rejects_invalid_characters(data: str) -> None:
+    with pytest.raises(binascii.Error):
+        decode(data, 1024)
@@ -0,0 +1,234 @@
+"""The sequencer module tests."""
+
+import pytest
+
+import asyncio
+from typing import (
+    Any,
+    Dict,
+    List,
+)
+from xrpl.asyncio.clients import (
+    AsyncJsonRpcClient,
+)
+from xrpl.asyncio.transaction import (
+    XRPLReliableSubmissionException,
+)
+from xrpl.core.binarycodec import (
+    decode,
+)
+from xrpl.models.requests.request import (
+    Request,
+)
+from xrpl.models.response import (
+    Response,
+    ResponseStatus,
+)
+from xrpl.models.transactions import (
+    AccountSet,
+    TicketCreate,
+)
+from xrpl.wallet import (
+    Wallet,
+)
+
+from app.utils import (
+    sequencer,
+)
+from tests.helpers import (
+    run,
+)
+
+WALLET = Wallet.create()
+
+
+class LedgerStandIn(AsyncJsonRpcClient):
+    """
+    A ledger answering the requests of the sequencer: it applies the
+    submissions carrying the account sequence, rejects the others with a
+    sequence error, and validates the applied transactions at once.
+
+    Args:
+        sequence (int) : The next sequence of the account.
+    """
+
+    def __init__(self, sequence: int) -> None:
+        super().__init__("http://ledger.local")
+        self.sequence = sequence
+        # forced preliminary results of the next submissions
+        self.results: List[str] = []
+        self.requests: List[str] = []
+        self.submitted: List[int] = []
+        self.transactions: Dict[str, Dict[str, Any]] = {}
+
+    def engine_result(self, transaction: Dict[str, Any]) -> str:
+        if self.results:
+            return self.results.pop(0)
+        if transaction["Sequence"] < self.sequence:
+            return "tefPAST_SEQ"
+        if transaction["Sequence"] > self.sequence:
+            return "terPRE_SEQ"
+        return "tesSUCCESS"
+
+    def submit(self, tx_blob: str) -> Dict[str, Any]:
+        transaction = decode(tx_blob)
+        self.submitted.append(transaction["Sequence"])
+        engine_result = self.engine_result(transaction)
+        if sequencer.consumes_sequence(engine_result):
+            self.sequence = transaction["Sequence"] + 1
+            if engine_result == "tesSUCCESS":
+                self.sequence += transaction.get("TicketCount", 0)
+        return {
+            "engine_result": engine_result,
+            "engine_result_message": engine_result,
+            "tx_json": transaction,
+        }
+
+    async def request_impl(self, request: Request) -> Response:
+        method = request.method.value
+        self.requests.append(method)
+        if method == "account_info":
+            result: Dict[str, Any] = {"account_data": {"Sequence": self.sequence}}
+        elif method == "fee":
+            result = {"drops": {"open_ledger_fee": "10"}}
+        elif method == "ledger":
+            result = {"ledger_index": 100}
+        elif method == "submit":
+            result = self.submit(request.to_dict()["tx_blob"])
+        else:
+            raise NotImplementedError(method)
+        return Response(status=ResponseStatus.SUCCESS, result=result)
+
+
+@pytest.fixture(autouse=True)
+def validate_at_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def wait(
+        transaction_hash: str, client: LedgerStandIn, prelim_result: str
+    ) -> Response:
+        return Response(
+            status=ResponseStatus.SUCCESS,
+            result={
+                "hash": transaction_hash,
+                "Sequence": client.submitted[-1],
+                "validated": True,
+                "meta": {"TransactionResult": prelim_result},
+            },
+        )
+
+    monkeypatch.setattr(sequencer, "_wait_for_final_transaction_outcome", wait)
+
+
+def account_set() -> AccountSet:
+    return AccountSet(account=WALLET.classic_address)
+
+
+def test_sequences_are_allocated_in_memory() -> None:
+    async def test(
+        account_sequencer: sequencer.AccountSequencer, ledger: LedgerStandIn
+    ) -> None:
+        for _ in range(3):
+            response = await account_sequencer.submit(
+                account_set(), WALLET.seed, ledger
+            )
+            assert response.result["meta"]["TransactionResult"] == "tesSUCCESS"
+        await asyncio.gather(
+            *(
+                account_sequencer.submit(account_set(), WALLET.seed, ledger)
+                for _ in range(5)
+            )
+        )
+        assert ledger.submitted == list(range(10, 18))
+        assert ledger.requests.count("account_info") == 1
+        assert account_sequencer.next_sequences[WALLET.classic_address] == 18
+
+    run(test, sequencer.AccountSequencer(), LedgerStandIn(10))
+
+
+@pytest.mark.parametrize("ledger_sequence", [12, 8])
+def test_sequence_errors_resync(ledger_sequence: int) -> None:
+    async def test(
+        account_sequencer: sequencer.AccountSequencer, ledger: LedgerStandIn
+    ) -> None:
+        await account_sequencer.submit(account_set(), WALLET.seed, ledger)
+        # another process used the next sequences, or a queued transaction
+        # has been dropped
+        ledger.sequence = ledger_sequence
+        response = await account_sequencer.submit(account_set(), WALLET.seed, ledger)
+        assert response.result["meta"]["TransactionResult"] == "tesSUCCESS"
+        assert ledger.submitted == [10, 11, ledger_sequence]
+        assert ledger.requests.count("account_info") == 2
+        assert (
+            account_sequencer.next_sequences[WALLET.classic_address]
+            == ledger_sequence + 1
+        )
+
+    run(test, sequencer.AccountSequencer(), LedgerStandIn(10))
+
+
+def test_sequence_errors_give_up_after_max_attempts() -> None:
+    async def test(
+        account_sequencer: sequencer.AccountSequencer, ledger: LedgerStandIn
+    ) -> None:
+        ledger.results = ["terPRE_SEQ"] * sequencer.MAX_ATTEMPTS
+        with pytest.raises(XRPLReliableSubmissionException, match="terPRE_SEQ"):
+            await account_sequencer.submit(account_set(), WALLET.seed, ledger)
+        assert len(ledger.submitted) == sequencer.MAX_ATTEMPTS
+        assert WALLET.classic_address not in account_sequencer.next_sequences
+
+    run(test, sequencer.AccountSequencer(), LedgerStandIn(10))
+
+
+def test_failed_submission_invalidates_the_sequence() -> None:
+    async def test(
+        account_sequencer: sequencer.AccountSequencer, ledger: LedgerStandIn
+    ) -> None:
+        ledger.results = ["temMALFORMED"]
+        with pytest.raises(XRPLReliableSubmissionException):
+            await account_sequencer.submit(account_set(), WALLET.seed, ledger)
+        assert WALLET.classic_address not in account_sequencer.next_sequences
+
+    run(test, sequencer.AccountSequencer(), LedgerStandIn(10))
+
+
+@pytest.mark.parametrize(
+    "engine_result, next_sequence", [("tesSUCCESS", 15), ("tecDIR_FULL", 11)]
+)
+def test_ticket_create_consumes_the_ticket_sequences(
+    engine_result: str, next_sequence: int
+) -> None:
+    async def test(
+        account_sequencer: sequencer.AccountSequencer, ledger: LedgerStandIn
+    ) -> None:
+        ledger.results = [engine_result]
+        await account_sequencer.submit(
+            TicketCreate(account=WALLET.classic_address, ticket_count=4),
+            WALLET.seed,
+            ledger,
+        )
+        assert account_sequencer.next_sequences[WALLET.classic_address] == (
+            next_sequence
+        )
+        assert ledger.sequence == next_sequence
+        await account_sequencer.submit(account_set(), WALLET.seed, ledger)
+        assert ledger.submitted == [10, next_sequence]
+        assert ledger.requests.count("account_info") == 1
+
+    run(test, sequencer.AccountSequencer(), LedgerStandIn(10))
+
+
+def test_create_tickets(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def test(
+        account_sequencer: sequencer.AccountSequencer, ledger: LedgerStandIn
+    ) -> None:
+        monkeypatch.setattr(sequencer, "sequencer", account_sequencer)
+        tickets = await sequencer.create_tickets(
+            WALLET.classic_address, 3, WALLET.seed, ledger
+        )
+        assert tickets == [11, 12, 13]
+        ledger.results = ["tecDIR_FULL"]
+        with pytest.raises(XRPLReliableSubmissionException, match="tecDIR_FULL"):
+            await sequencer.create_tickets(
+                WALLET.classic_address, 3, WALLET.seed, ledger
+            )
+
+    run(test, sequencer.AccountSequencer(), LedgerStandIn(10))
@@ -0,0 +1,133 @@
+"""The singleflight module tests."""
+
+import pytest
+
+import asyncio
+import functools
+from typing import (
+    List,
+)
+
+from app.utils import (
+    singleflight,
+)
+from tests.helpers import (
+    run,
+)
+
+
+class Upstream:
+    """
+    A slow upstream counting its requests, released by the test.
+    """
+
+    def __init__(self) -> None:
+        self.requests: List[str] = []
+        self.release = asyncio.Event()
+        self.error: Exception = RuntimeError("upstream failed")
+        self.fail = False
+
+    async def fetch(self, key: str) -> str:
+        self.requests.append(key)
+        await self.release.wait()
+        if self.fail:
+            raise self.error
+        return f"value of {key}"
+
+
+def test_concurrent_calls_share_one_request() -> None:
+    async def test() -> None:
+        flight = singleflight.SingleFlight()
+        upstream = Upstream()
+        callers = [
+            asyncio.ensure_future(
+                flight.do(key, functools.partial(upstream.fetch, key))
+            )
+            for key in ("a", "a", "a", "b")
+        ]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        assert await asyncio.gather(*callers) == [
+            "value of a",
+            "value of a",
+            "value of a",
+            "value of b",
+        ]
+        assert upstream.requests == ["a", "b"]
+        assert (flight.started, flight.coalesced) == (2, 2)
+        assert flight.calls == {}
+        # nothing is cached once the call completes
+        assert await flight.do("a", lambda: upstream.fetch("a")) == "value of a"
+        assert upstream.requests == ["a", "b", "a"]
+
+    run(test)
+
+
+def test_cancelled_caller_does_not_cancel_the_others() -> None:
+    async def test() -> None:
+        flight = singleflight.SingleFlight()
+        upstream = Upstream()
+        first = asyncio.ensure_future(flight.do("a", lambda: upstream.fetch("a")))
+        second = asyncio.ensure_future(flight.do("a", lambda: upstream.fetch("a")))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        upstream.release.set()
+        assert await second == "value of a"
+        assert first.cancelled()
+        assert upstream.requests == ["a"]
+
+    run(test)
+
+
+def test_every_caller_cancelled() -> None:
+    async def test() -> None:
+        flight = singleflight.SingleFlight()
+        upstream = Upstream()
+        caller = asyncio.ensure_future(flight.do("a", lambda: upstream.fetch("a")))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0)
+        # the call still completes, and is then forgotten
+        upstream.release.set()
+        await asyncio.sleep(0.01)
+        assert flight.calls == {}
+
+    run(test)
+
+
+def test_error_reaches_every_caller_and_is_not_cached() -> None:
+    async def test() -> None:
+        flight = singleflight.SingleFlight()
+        upstream = Upstream()
+        upstream.fail = True
+        callers = [
+            asyncio.ensure_future(flight.do("a", lambda: upstream.fetch("a")))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        assert results == [upstream.error] * 3
+        assert upstream.requests == ["a"]
+        assert flight.calls == {}
+        upstream.fail = False
+        assert await flight.do("a", lambda: upstream.fetch("a")) == "value of a"
+        assert upstream.requests == ["a", "a"]
+
+    run(test)
+
+
+def test_error_without_waiters_is_retrieved() -> None:
+    async def test() -> None:
+        flight = singleflight.SingleFlight()
+        upstream = Upstream()
+        upstream.fail = True
+        caller = asyncio.ensure_future(flight.do("a", lambda: upstream.fetch("a")))
+        await asyncio.sleep(0)
+        caller.cancel()
+        upstream.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+    run(test)
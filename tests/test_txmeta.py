@@ -0,0 +1,45 @@
+"""The txmeta module tests."""
+
+import pytest
+
+import json
+from pathlib import (
+    Path,
+)
+from typing import (
+    Any,
+    Dict,
+)
+
+from app.utils import (
+    txmeta,
+)
+
+CASES = json.loads(
+    (Path(__file__).parent / "fixtures" / "nftoken_mint_meta.json").read_text()
+)
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_get_minted_nftoken_id(case: Dict[str, Any]) -> None:
+    assert txmeta.get_minted_nftoken_id(case["meta"]) == case["nftoken_id"]
+
+
+def test_get_minted_nftoken_id_ignores_other_ledger_entries() -> None:
+    meta = {
+        "AffectedNodes": [
+            {
+                "CreatedNode": {
+                    "LedgerEntryType": "NFTokenOffer",
+                    "LedgerIndex": "0" * 64,
+                    "NewFields": {"NFTokenID": "1" * 64, "Amount": "1000000"},
+                }
+            }
+        ],
+        "TransactionResult": "tesSUCCESS",
+    }
+    assert txmeta.get_minted_nftoken_id(meta) is None
+
+
+def test_get_minted_nftoken_id_without_affected_nodes() -> None:
+    assert txmeta.get_minted_nftoken_id({"TransactionResult": "tesSUCCESS"}) is None